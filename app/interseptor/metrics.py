@@ -0,0 +1,39 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import time
+
+from app.utils.metrics import http_in_flight, http_latency, http_requests
+
+
+class MetricsMiddleware:
+    """요청별 지연 시간 / 상태 코드 / 동시 처리 수 기록 (순수 ASGI)
+
+    라벨은 실제 경로가 아니라 라우트 템플릿(/api/doc/jobs/{job_id})을 써서 라벨 수가 늘어나지 않게 한다.
+    """
+
+    def __init__(self, app: ASGIApp, skip_paths=("/metrics",)):
+        self.app = app
+        self.skip_paths = frozenset(skip_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        http_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_in_flight.dec()
+            # 라우팅이 끝나면 scope 에 매칭된 route 가 남는다 (429 로 막혔거나 404 면 없음)
+            route = getattr(scope.get("route"), "path", None) or "<unmatched>"
+            method = scope["method"]
+            http_latency.observe(time.perf_counter() - started, method, route)
+            http_requests.inc(method, route, str(status["code"]))
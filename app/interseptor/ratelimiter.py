@@ -1,33 +1,162 @@
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import JSONResponse
-from collections import defaultdict
+from starlette.types import ASGIApp, Receive, Scope, Send
+import math
+import os
+import sqlite3
 import time
 
-# 요청 기록 저장소 (IP별)
-request_log = defaultdict(list)
+from app.utils.metrics import rate_limit_rejects, rate_limit_store_errors
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, max_requests: int = 60, window_sec: int = 60):
-        super().__init__(app)
+
+class MemoryBucketStore:
+    """프로세스 메모리 토큰 버킷 저장소 (키별 [남은 토큰, 마지막 갱신 시각])"""
+
+    def __init__(self):
+        self.buckets = {}
+
+    def take(self, key, capacity: float, rate: float, now: float):
+        """토큰 1개 소비 시도. (허용 여부, 재시도까지 남은 초) 반환 - O(1)"""
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = [capacity, now]
+        else:
+            bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+
+        if bucket[0] >= 1.0:
+            bucket[0] -= 1.0
+            return True, 0.0
+        return False, (1.0 - bucket[0]) / rate
+
+    def evict_idle(self, idle_before: float):
+        """마지막 요청 이후 버킷이 가득 찼을 키 제거 (제거해도 동작은 동일)"""
+        stale = [key for key, (_, last) in self.buckets.items() if last < idle_before]
+        for key in stale:
+            del self.buckets[key]
+
+
+class SQLiteBucketStore:
+    """워커 간 공유 토큰 버킷 저장소 (로컬 SQLite WAL 파일)
+
+    같은 노드의 모든 uvicorn 워커가 하나의 파일을 트랜잭션으로 갱신하므로 한도가 전역으로 적용된다.
+    이벤트 루프에서 동기로 호출되므로 잠금 대기는 busy_timeout_sec(기본 5ms)까지만 하고,
+    그래도 잠금을 못 잡거나 갱신에 실패하면 요청을 막지 않는다 (fail-open, rate_limit_store_errors_total 로 집계).
+    """
+
+    def __init__(self, path: str, busy_timeout_sec: float = 0.005):
+        self.path = path
+        self.busy_timeout_sec = busy_timeout_sec
+        self._conn = None
+        self._pid = None
+
+    def _connection(self):
+        # fork 된 워커는 부모의 커넥션을 쓰지 않고 새로 연다
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout_sec, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_bucket ("
+                "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def take(self, key, capacity: float, rate: float, now: float):
+        bucket_key = "|".join(key)
+        try:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT tokens, updated FROM rate_bucket WHERE key = ?", (bucket_key,)).fetchone()
+                tokens = capacity if row is None else min(capacity, row[0] + max(0.0, now - row[1]) * rate)
+                allowed = tokens >= 1.0
+                if allowed:
+                    tokens -= 1.0
+                conn.execute(
+                    "INSERT INTO rate_bucket (key, tokens, updated) VALUES (?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                    (bucket_key, tokens, now)
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error:
+            rate_limit_store_errors.inc()
+            return True, 0.0
+
+        if allowed:
+            return True, 0.0
+        return False, (1.0 - tokens) / rate
+
+    def evict_idle(self, idle_before: float):
+        try:
+            self._connection().execute("DELETE FROM rate_bucket WHERE updated < ?", (idle_before,))
+        except sqlite3.Error:
+            rate_limit_store_errors.inc()
+
+
+class RateLimitMiddleware:
+    """IP별 토큰 버킷 Rate Limiter (순수 ASGI 미들웨어)
+
+    route_limits 로 경로 prefix 별 한도를 따로 줄 수 있다. 예) {"/api/doc/parse": (10, 60)}
+    store 에 SQLiteBucketStore 를 넘기면 여러 워커가 한도를 공유한다.
+    exempt_paths 의 경로(예: /metrics 스크레이프)는 한도를 적용하지 않는다.
+    clock 은 현재 시각(초) 함수 (테스트에서 바꿔 끼움).
+    """
+
+    def __init__(self, app: ASGIApp, max_requests: int = 60, window_sec: int = 60,
+                 route_limits: dict = None, evict_interval_sec: float = 60.0, store=None,
+                 exempt_paths=(), clock=time.time):
+        self.app = app
+        self.clock = clock
         self.max_requests = max_requests
         self.window_sec = window_sec
+        self.evict_interval_sec = evict_interval_sec
+        self.store = store if store is not None else MemoryBucketStore()
+        self.exempt_paths = frozenset(exempt_paths)
+
+        # 긴 prefix 가 먼저 매칭되도록 정렬
+        limits = {prefix: (float(m), m / w) for prefix, (m, w) in (route_limits or {}).items()}
+        self.route_limits = sorted(limits.items(), key=lambda kv: len(kv[0]), reverse=True)
+        self.default_limit = (float(max_requests), max_requests / window_sec)
+        self.max_window_sec = max([window_sec] + [w for _, w in (route_limits or {}).values()])
+        self._next_evict = clock() + evict_interval_sec
         print('RateLimitMiddleware', self)
-    async def dispatch(self, request: Request, call_next):
-        client_ip = request.client.host
-        now = time.time()
 
-        # 해당 IP의 요청 기록 중 유효 시간 내 요청만 필터링
-        request_log[client_ip] = [
-            ts for ts in request_log[client_ip] if now - ts < self.window_sec
-        ]
+    def _limit_for(self, path: str):
+        for prefix, limit in self.route_limits:
+            if path.startswith(prefix):
+                return prefix, limit
+        return "*", self.default_limit
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
+        now = self.clock()
 
-        if len(request_log[client_ip]) >= self.max_requests:
-            return JSONResponse(
+        # 유휴 키 주기적 정리
+        if now >= self._next_evict:
+            self._next_evict = now + self.evict_interval_sec
+            self.store.evict_idle(now - self.max_window_sec)
+
+        scope_key, (capacity, rate) = self._limit_for(scope["path"])
+        allowed, retry_after = self.store.take((client_ip, scope_key), capacity, rate, now)
+
+        if not allowed:
+            rate_limit_rejects.inc(scope_key)
+            response = JSONResponse(
                 status_code=429,
-                content={"detail": "Too many requests. Please slow down."}
+                content={"detail": "Too many requests. Please slow down."},
+                headers={"Retry-After": str(math.ceil(retry_after))}
             )
-        
-        # 요청 기록 추가 후 다음 미들웨어로 넘김
-        request_log[client_ip].append(now)
-        return await call_next(request)
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
@@ -0,0 +1,173 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from urllib.parse import unquote_plus
+import atexit
+import json
+import os
+import queue
+import random
+import re
+import threading
+import time
+
+# 기록에서 빼는 헤더 (인증/세션 정보)
+SECRET_HEADERS = frozenset({
+    "authorization", "proxy-authorization", "cookie", "set-cookie", "x-admin-token", "x-api-key",
+    "x-naver-client-id", "x-naver-client-secret",
+})
+# 재생에 의미 없는 헤더
+SKIP_HEADERS = frozenset({"host", "content-length", "connection", "accept-encoding"})
+SECRET_KEY_RE = re.compile(r"pass(word)?|secret|token|api[_-]?key|authorization|credential", re.IGNORECASE)
+MASK = "***"
+
+
+def mask_secrets(value):
+    """JSON 본문에서 이름이 비밀값처럼 보이는 키의 값을 가린다"""
+    if isinstance(value, dict):
+        return {k: MASK if SECRET_KEY_RE.search(str(k)) else mask_secrets(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [mask_secrets(v) for v in value]
+    return value
+
+
+def mask_query(query: str) -> str:
+    """쿼리스트링에서 이름이 비밀값처럼 보이는 파라미터의 값을 가린다 (나머지는 원래 인코딩 그대로)"""
+    if not query:
+        return query
+    parts = []
+    for part in query.split("&"):
+        name, sep, _ = part.partition("=")
+        parts.append(f"{name}={MASK}" if sep and SECRET_KEY_RE.search(unquote_plus(name)) else part)
+    return "&".join(parts)
+
+
+def is_json_content_type(content_type: str) -> bool:
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return media_type == "application/json" or media_type.endswith("+json")
+
+
+class _JsonlWriter:
+    """별도 스레드에서 한 줄씩 append (요청 처리 루프에서는 큐에 넣기만 함)
+
+    O_APPEND 로 한 줄을 한 번의 write 로 쓰므로 여러 워커가 같은 파일에 기록해도 줄이 섞이지 않는다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._queue: "queue.Queue" = queue.Queue(maxsize=10000)
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name="request-recorder", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def put(self, record: dict):
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            # 디스크가 밀리면 기록을 버리고 요청은 막지 않는다
+            self.dropped += 1
+
+    def _run(self):
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            while True:
+                record = self._queue.get()
+                if record is None:
+                    return
+                line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+                os.write(fd, line.encode("utf-8"))
+        finally:
+            os.close(fd)
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+
+
+class RequestRecorderMiddleware:
+    """요청을 JSONL 로 기록 (재생 도구 bench/replay.py 입력)
+
+    한 줄 형식: {"ts", "method", "path", "query", "headers", "body" | "bodySize", "status", "durationMs"}
+    - 인증 관련 헤더는 빼고, JSON 본문의 키와 쿼리 파라미터 중 비밀값처럼 보이는 것은 가린다
+    - 본문 내용은 JSON 만 남긴다. JSON 이 아니거나(폼, 멀티파트, 바이너리) max_body_bytes 를 넘으면
+      크기만 남긴다 (재생 시 같은 크기의 임의 바이트)
+    - sample_rate 로 일부 요청만 기록할 수 있다
+    """
+
+    def __init__(self, app: ASGIApp, path: str, sample_rate: float = 1.0, max_body_bytes: int = 64 * 1024,
+                 skip_paths=("/metrics", "/healthz", "/readyz")):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.max_body_bytes = max_body_bytes
+        self.skip_paths = frozenset(skip_paths)
+        self.writer = _JsonlWriter(path)
+        print("RequestRecorderMiddleware", path)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if (scope["type"] != "http" or scope["path"] in self.skip_paths
+                or (self.sample_rate < 1.0 and random.random() >= self.sample_rate)):
+            await self.app(scope, receive, send)
+            return
+
+        content_type = ""
+        for raw_name, raw_value in scope["headers"]:
+            if raw_name.lower() == b"content-type":
+                content_type = raw_value.decode("latin-1")
+        keep_body = is_json_content_type(content_type)
+        chunks = []
+        size = {"body": 0}
+        status = {"code": 500}
+
+        async def receive_wrapper() -> Message:
+            message = await receive()
+            if message["type"] == "http.request":
+                body = message.get("body", b"")
+                size["body"] += len(body)
+                if keep_body and size["body"] <= self.max_body_bytes:
+                    chunks.append(body)
+            return message
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        ts = time.time()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            self.writer.put(self._record(scope, ts, keep_body, chunks, size["body"], status["code"],
+                                          duration_ms))
+
+    def _record(self, scope: Scope, ts: float, keep_body: bool, chunks, body_size: int, status: int,
+                duration_ms: float) -> dict:
+        headers = {}
+        for raw_name, raw_value in scope["headers"]:
+            name = raw_name.decode("latin-1").lower()
+            if name not in SECRET_HEADERS and name not in SKIP_HEADERS:
+                headers[name] = raw_value.decode("latin-1")
+
+        record = {
+            "ts": round(ts, 6),
+            "method": scope["method"],
+            "path": scope["path"],
+            "query": mask_query(scope.get("query_string", b"").decode("latin-1")),
+            "headers": headers,
+        }
+        if body_size:
+            body = None
+            if keep_body and body_size <= self.max_body_bytes:
+                try:
+                    body = json.dumps(mask_secrets(json.loads(b"".join(chunks))), ensure_ascii=False)
+                except ValueError:
+                    # JSON 이라면서 파싱이 안 되면 비밀값을 가릴 수 없으므로 내용은 남기지 않는다
+                    pass
+            if body is None:
+                record["bodySize"] = body_size
+            else:
+                record["body"] = body
+        record["status"] = status
+        record["durationMs"] = round(duration_ms, 2)
+        return record
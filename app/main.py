@@ -1,20 +1,79 @@
+from contextlib import asynccontextmanager
+import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.interseptor.ratelimiter import RateLimitMiddleware
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+from app.interseptor.ratelimiter import RateLimitMiddleware, SQLiteBucketStore
+from app.interseptor.metrics import MetricsMiddleware
+from app.interseptor.recorder import RequestRecorderMiddleware
+from app.utils import metrics
+from app.utils.jsonutil import FastJSONResponse
+from app.utils.commonutil import get_salesforce_token
+from app.utils.httpclient import open_clients, close_clients, warm_client
+from app.services.scheduler import PeriodicTask
+from app.services.catalog import catalog_store
+from app.services.warmup import warmup
 
 from app.routes.interfaceData import router as interfaceData
 from app.routes.healthCheck import router as healthCheck
-from app.routes.publicApiData import router as publicApiData
-from app.routes.awsToy import router as awsToy
+from app.routes.publicApiData import router as publicApiData, ingest_all, SUBWAY_URL, NEWS_URL, MOVIE_URL
+from app.routes.awsToy import router as awsToy, doc_jobs, UPSTAGE_URL
+from app.routes.bulkData import router as bulkData
+from app.services.bulkloads import bulk_loads
 
-import os
+routers = [interfaceData, healthCheck, publicApiData, awsToy, bulkData]
+
+# 공공데이터 주기 수집 (INGEST_INTERVAL_SEC > 0 일 때만, 노드당 한 워커만 실행)
+INGEST_INTERVAL_SEC = float(os.getenv("INGEST_INTERVAL_SEC", "0"))
+ingest_scheduler = PeriodicTask(
+    "ingest-all", INGEST_INTERVAL_SEC, ingest_all,
+    lock_path=os.getenv("INGEST_LOCK_FILE", "/tmp/sideprj-ingest.lock"),
+)
+
+# 워커별 지표 스냅샷 저장 (METRICS_DIR 지정 시 /metrics 가 모든 워커 합계를 보여줌)
+async def flush_metrics():
+    metrics.flush()
+
+metrics_flusher = PeriodicTask("metrics-flush", metrics.METRICS_FLUSH_SEC, flush_metrics)
 
-TIMEOUT_SEC = float(os.getenv("TIMEOUT_SEC", "5.0"))
+# 기동 warm-up: 첫 요청이 치르던 비용을 lifespan 에서 동시에 미리 치른다 (끝나야 /readyz 가 200)
+async def warm_salesforce():
+    token_data = await get_salesforce_token()
+    if token_data.get("instance_url"):
+        await warm_client("salesforce", token_data["instance_url"])
 
-routers = [interfaceData, healthCheck, publicApiData, awsToy]
+async def warm_catalog():
+    # 카탈로그 읽기와 인덱스 생성(reload 에서 함께 수행)은 CPU/파일 작업이라 스레드에서
+    await run_in_threadpool(catalog_store.ensure_loaded)
 
-# FastAPI 앱 객체 생성
-app = FastAPI()
+if os.getenv("WARMUP_ENABLED", "1") == "1":
+    warmup.add("catalog", warm_catalog, required=True)
+    warmup.add("salesforce", warm_salesforce)
+    for name, url in (("subway", SUBWAY_URL), ("news", NEWS_URL), ("movie", MOVIE_URL), ("upstage", UPSTAGE_URL)):
+        if url:
+            warmup.add(f"pool:{name}", lambda name=name, url=url: warm_client(name, url))
+
+# 앱 수명주기: 업스트림 커넥션 풀 열기/닫기, warm-up 은 백그라운드로 (기동을 막지 않음)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await open_clients()
+    warmup.start()
+    await doc_jobs.start()
+    if INGEST_INTERVAL_SEC > 0:
+        ingest_scheduler.start()
+    if metrics.METRICS_DIR:
+        metrics_flusher.start()
+    yield
+    await warmup.stop()
+    await metrics_flusher.stop()
+    await ingest_scheduler.stop()
+    await bulk_loads.stop()
+    await doc_jobs.stop()
+    await close_clients()
+
+# FastAPI 앱 객체 생성 (기본 응답은 orjson 렌더링)
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
 # CORS 설정
 app.add_middleware(
@@ -25,8 +84,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# ✅ Rate Limiting 인터셉터 등록
-app.add_middleware(RateLimitMiddleware, max_requests=30, window_sec=60)
+# ✅ Rate Limiting 인터셉터 등록 (RATE_LIMIT_DB 지정 시 워커 간 한도 공유)
+RATE_LIMIT_DB = os.getenv("RATE_LIMIT_DB")
+RATE_LIMIT_MAX_REQUESTS = int(os.getenv("RATE_LIMIT_MAX_REQUESTS", "30"))
+RATE_LIMIT_WINDOW_SEC = int(os.getenv("RATE_LIMIT_WINDOW_SEC", "60"))
+rate_limit_store = SQLiteBucketStore(RATE_LIMIT_DB) if RATE_LIMIT_DB else None
+app.add_middleware(RateLimitMiddleware, max_requests=RATE_LIMIT_MAX_REQUESTS, window_sec=RATE_LIMIT_WINDOW_SEC, store=rate_limit_store,
+                   exempt_paths=("/metrics", "/healthz", "/readyz"))
+
+# 요청 기록 (REQUEST_RECORD_PATH 지정 시에만, bench/replay.py 로 재생)
+REQUEST_RECORD_PATH = os.getenv("REQUEST_RECORD_PATH")
+if REQUEST_RECORD_PATH:
+    app.add_middleware(
+        RequestRecorderMiddleware,
+        path=REQUEST_RECORD_PATH,
+        sample_rate=float(os.getenv("REQUEST_RECORD_SAMPLE", "1.0")),
+        max_body_bytes=int(os.getenv("REQUEST_RECORD_MAX_BODY", str(64 * 1024))),
+    )
+
+# 요청 지표 수집 (가장 바깥에서 감싸 rate limit 으로 막힌 요청도 집계)
+app.add_middleware(MetricsMiddleware)
+
+# Prometheus 스크레이프 엔드포인트
+# 지표 dict 는 이벤트 루프 스레드에서 락 없이 갱신되므로 render 도 루프에서 (sync def 면 스레드풀에서 돌며 순회 중 변경될 수 있음)
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 # 디버깅용 루트 엔드포인트
 @app.get("/")
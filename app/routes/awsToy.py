@@ -5,16 +5,41 @@ from typing import Any, Dict, List, Tuple, Union
 from datetime import datetime, timezone
 
 import re
-import difflib
-import sqlite3
 import json
-import requests
+import hashlib
+import hmac
 import os
+import time
+import uuid
+
+from app.utils.httpclient import get_client
+from app.utils.metrics import observe_upstream, outcome_of
+from app.utils.diskcache import DiskLRUCache
+from app.utils.multipart import BodyTooLarge, build_multipart_frame, stream_multipart
+from app.services.matcher import normalize_value_text, get_matcher_index
+from app.services.catalog import CatalogNotReady, catalog_store
+from app.services.docjobs import DocJobManager
+from starlette.concurrency import run_in_threadpool
 
 router = APIRouter()
 
-TIMEOUT_SEC = float(os.getenv("TIMEOUT_SEC", "5.0"))
+CATALOG_ADMIN_TOKEN = os.getenv("CATALOG_ADMIN_TOKEN")
+# /api/similarity/batch 한 요청의 최대 항목 수 (항목당 수~수십 ms 의 CPU 작업)
+SIMILARITY_BATCH_MAX_ITEMS = int(os.getenv("SIMILARITY_BATCH_MAX_ITEMS", "500"))
+UPSTAGE_URL = os.getenv("UPSTAGE_URL", "https://api.upstage.ai/v1/document-digitization")
+DOC_PARSE_MAX_BYTES = int(os.getenv("DOC_PARSE_MAX_BYTES", str(50 * 1024 * 1024)))
+DOC_PARSE_CACHE_DB = os.getenv("DOC_PARSE_CACHE_DB", "docparse_cache.db")
+DOC_PARSE_CACHE_MAX_BYTES = int(os.getenv("DOC_PARSE_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
 
+DOC_JOB_DB = os.getenv("DOC_JOB_DB", "docjobs.db")
+DOC_JOB_DIR = os.getenv("DOC_JOB_DIR", "docjobs")
+DOC_JOB_WORKERS = int(os.getenv("DOC_JOB_WORKERS", "4"))
+DOC_JOB_UPSTAGE_CONCURRENCY = int(os.getenv("DOC_JOB_UPSTAGE_CONCURRENCY", "2"))
+# 이 시간 동안 갱신 없는 running 작업은 죽은 프로세스의 작업으로 보고 다시 처리 (업스트림 타임아웃보다 길게)
+DOC_JOB_STALE_SEC = float(os.getenv("DOC_JOB_STALE_SEC", "600"))
+
+# 문서 파싱 결과 캐시 (파일 해시 + 옵션 기준)
+doc_parse_cache = DiskLRUCache(DOC_PARSE_CACHE_DB, DOC_PARSE_CACHE_MAX_BYTES)
 
 # -------------------------
 # Text normalize utils
@@ -35,6 +60,11 @@ async def validate_request(request: Request) -> Dict[str, Any]:
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid file body.")
 
+    ctx = parse_upstage_headers(request)
+    ctx["file_bytes"] = file_bytes
+    return ctx
+
+def parse_upstage_headers(request: Request) -> Dict[str, Any]:
     raw = request.headers.get("python-body")
     if not raw:
         raise HTTPException(status_code=400, detail="missing header: python_body")
@@ -53,10 +83,27 @@ async def validate_request(request: Request) -> Dict[str, Any]:
 
     return {
         "payload": payload,
-        "file_bytes": file_bytes,
         "headers": upstage_headers,
     }
 
+# 본문을 읽지 않고 헤더만 검증 (스트리밍 업로드용)
+async def validate_stream_request(request: Request) -> Dict[str, Any]:
+    content_length = request.headers.get("content-length")
+    if content_length is not None:
+        try:
+            length = int(content_length)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="invalid content-length")
+        if length > DOC_PARSE_MAX_BYTES:
+            raise HTTPException(status_code=413, detail=f"file too large (max {DOC_PARSE_MAX_BYTES} bytes)")
+    else:
+        length = None
+
+    ctx = parse_upstage_headers(request)
+    ctx["content_length"] = length
+    ctx["request"] = request
+    return ctx
+
 def _normalize_value(value: Any) -> Any:
     if isinstance(value, str):
         lower = value.strip().lower()
@@ -89,20 +136,121 @@ async def doc_parse(ctx: Dict[str, Any] = Depends(validate_request)):
     file_bytes = ctx["file_bytes"]
     headers = ctx["headers"]
 
-    target_url = "https://api.upstage.ai/v1/document-digitization"
+    _, result = await run_doc_parse(file_bytes, payload, headers)
+    return result
+
+async def post_upstage(operation: str, **kwargs):
+    """Upstage POST 1회 (지연 시간/결과를 /metrics 에 기록)"""
+    started = time.perf_counter()
+    try:
+        response = await get_client("upstage").post(UPSTAGE_URL, **kwargs)
+    except Exception as e:
+        observe_upstream("upstage", operation, started, outcome_of(error=e))
+        raise
+    observe_upstream("upstage", operation, started, outcome_of(response))
+    return response
+
+async def run_doc_parse(file_bytes: bytes, payload: Dict[str, str], headers: Dict[str, str]) -> Tuple[bool, Any]:
+    """Upstage 문서 파싱 호출 (캐시 우선). (성공 여부, 응답 JSON) 반환"""
+    # 같은 파일 + 같은 옵션이면 저장된 결과 반환 (업스트림 호출 없음)
+    cache_key = doc_parse_cache_key(file_bytes, payload)
+    cached = await run_in_threadpool(doc_parse_cache.get, cache_key)
+    if cached is not None:
+        return True, cached
+
     files = {"document": file_bytes}
 
-    response = requests.post(target_url, headers=headers, files=files, data=payload)
+    response = await post_upstage("doc_parse", headers=headers, files=files, data=payload)
+    result = response.json()
+    if response.is_success:
+        await run_in_threadpool(doc_parse_cache.set, cache_key, result)
+    return response.is_success, result
+
+def doc_parse_cache_key(file_bytes: bytes, payload: Dict[str, str]) -> str:
+    """파일 내용 해시 + 정규화된 python-body 옵션으로 캐시 키 생성"""
+    options = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    digest = hashlib.sha256(file_bytes)
+    digest.update(b"\0")
+    digest.update(options.encode("utf-8"))
+    return digest.hexdigest()
+
+@router.get("/api/doc/parse/cache/stats")
+async def doc_parse_cache_stats():
+    return await run_in_threadpool(doc_parse_cache.stats)
+
+@router.post("/api/doc/parse/stream")
+async def doc_parse_stream(ctx: Dict[str, Any] = Depends(validate_stream_request)):
+    """업로드 본문을 메모리에 모으지 않고 Upstage multipart 요청으로 청크 단위 전달
+
+    파일명은 x-filename 헤더(없으면 upload), 크기 상한은 DOC_PARSE_MAX_BYTES.
+    """
+    request: Request = ctx["request"]
+    headers = dict(ctx["headers"])
+
+    content_type = request.headers.get("content-type") or "application/octet-stream"
+    filename = request.headers.get("x-filename") or "upload"
+    head, tail, boundary = build_multipart_frame(ctx["payload"], "document", filename, content_type)
+
+    headers["Content-Type"] = f"multipart/form-data; boundary={boundary}"
+    if ctx["content_length"] is not None:
+        headers["Content-Length"] = str(len(head) + ctx["content_length"] + len(tail))
+
+    body = stream_multipart(head, request.stream(), tail, DOC_PARSE_MAX_BYTES)
+    try:
+        response = await post_upstage("doc_parse_stream", headers=headers, content=body)
+    except BodyTooLarge as e:
+        raise HTTPException(status_code=413, detail=f"file too large (max {e.limit} bytes)")
     return response.json()
 
-# 정확도 검사
-def dl_ratio(a: str, b: str) -> float:
-    return difflib.SequenceMatcher(None, a, b).ratio()
-
-def normalize_value_text(s: str) -> str:
-    if not s:
-        return ""
-    return re.sub(r"\s+", " ", s).strip().lower()
+# 문서 파싱 비동기 작업 (제출 -> 폴링)
+doc_jobs = DocJobManager(
+    DOC_JOB_DB,
+    DOC_JOB_DIR,
+    handler=run_doc_parse,
+    workers=DOC_JOB_WORKERS,
+    upstream_limits={"upstage": DOC_JOB_UPSTAGE_CONCURRENCY},
+    fallback_authorization=os.getenv("UPSTAGE_AUTHORIZATION"),
+    stale_after_sec=DOC_JOB_STALE_SEC,
+)
+
+@router.post("/api/doc/jobs", status_code=202)
+async def submit_doc_job(ctx: Dict[str, Any] = Depends(validate_stream_request)):
+    """업로드 파일을 디스크에 저장하고 즉시 작업 id 반환 (결과는 /api/doc/jobs/{job_id} 로 조회)"""
+    request: Request = ctx["request"]
+    job_id = uuid.uuid4().hex
+    file_path = doc_jobs.new_file_path(job_id)
+
+    total = 0
+    try:
+        with open(file_path, "wb") as f:
+            async for chunk in request.stream():
+                total += len(chunk)
+                if total > DOC_PARSE_MAX_BYTES:
+                    raise HTTPException(status_code=413, detail=f"file too large (max {DOC_PARSE_MAX_BYTES} bytes)")
+                await run_in_threadpool(f.write, chunk)
+    except BaseException:
+        doc_jobs.remove_file(file_path)
+        raise
+
+    await doc_jobs.submit(file_path, ctx["payload"], ctx["headers"], upstream="upstage", job_id=job_id)
+    return {"jobId": job_id, "status": "queued"}
+
+@router.get("/api/doc/jobs/{job_id}")
+async def get_doc_job(job_id: str):
+    job = await doc_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="job not found")
+    job.pop("result")
+    return job
+
+@router.get("/api/doc/jobs/{job_id}/result")
+async def get_doc_job_result(job_id: str):
+    job = await doc_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="job not found")
+    if job["status"] not in ("done", "failed"):
+        raise HTTPException(status_code=409, detail=f"job is {job['status']}")
+    return job["result"] if job["status"] == "done" else job
 
 def to_str(v: Any) -> str:
     return v if isinstance(v, str) else ("" if v is None else str(v))
@@ -113,21 +261,30 @@ def to_float(v: Any, default: float) -> float:
     except Exception:
         return default
 
-def mock_product_options() -> Dict[str, Dict[str, Dict[str, str]]]:
-    return {
-        "시책": {
-            "Promotion2": {
-                "P2-CFX-5Y-PT5Y-75MK-OIL2Y": "CFX 5yrs( 동력전달계통5년75만km 보증, 엔진오일및필터2년)",
-                # ... 생략 ...
-            }
-        }
-    }
-
-@router.post("/api/similarity")
-async def match_value_by_similarity_single_return(
-    ctx: Union[Dict[str, Any], str] = Body(...),   # ✅ dict 또는 string 모두 허용
-) -> Dict[str, Any]:
-    # 0) payload 정규화: dict로 맞춘다
+def product_options():
+    """현재 카탈로그 스냅샷 (SQLite 카탈로그를 한 번 읽어 둔 불변 데이터), 적재 전이면 503"""
+    try:
+        return catalog_store.snapshot()
+    except CatalogNotReady as e:
+        raise HTTPException(status_code=503, detail=f"[Unavailable] {str(e)}", headers={"Retry-After": "1"})
+
+@router.post("/api/catalog/reload")
+async def reload_catalog(request: Request):
+    """카탈로그 DB 를 다시 읽어 스냅샷 교체 (x-admin-token 헤더 필요, CATALOG_ADMIN_TOKEN 미설정 시 비활성)"""
+    if not CATALOG_ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="catalog reload is disabled (CATALOG_ADMIN_TOKEN not set)")
+    if not hmac.compare_digest(request.headers.get("x-admin-token", "").encode(), CATALOG_ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="invalid admin token")
+    snapshot = await run_in_threadpool(catalog_store.reload)
+    return {"status": "reloaded", "version": snapshot.version, "entries": snapshot.entries}
+
+@router.get("/api/catalog/version")
+async def catalog_version():
+    snapshot = product_options()
+    return {"version": snapshot.version, "entries": snapshot.entries, "loadedAt": snapshot.loaded_at}
+
+def parse_similarity_body(ctx: Union[Dict[str, Any], str]) -> Dict[str, Any]:
+    # payload 정규화: dict로 맞춘다
     if isinstance(ctx, str):
         # 바디가 JSON 문자열이면 1회 더 파싱
         try:
@@ -145,13 +302,10 @@ async def match_value_by_similarity_single_return(
             payload = ctx
     else:
         raise HTTPException(status_code=422, detail="Body must be an object or a JSON string")
+    return payload
 
-    # 입력 파싱
-    object_name = to_str(payload.get("objectName")).strip()
-    field_name  = to_str(payload.get("fieldName")).strip()
-    threshold   = to_float(payload.get("threshold", 0.8), 0.8)
-
-    res: Dict[str, Any] = {
+def new_match_result(object_name: str, field_name: str) -> Dict[str, Any]:
+    return {
         "success": False,
         "objectName": object_name,
         "fieldName": field_name,
@@ -160,11 +314,40 @@ async def match_value_by_similarity_single_return(
         "message": None,
     }
 
+def fill_match_result(res: Dict[str, Any], index, matches: List[Tuple[int, float]], threshold: float, top_k: Any) -> Dict[str, Any]:
+    if matches:
+        best_idx, best_score = matches[0]
+        res["success"] = True
+        res["id"] = {"id": index.ids[best_idx], "value": index.values[best_idx], "score": float(best_score)}
+    else:
+        res["message"] = f"No value meets threshold {threshold}"
+
+    if top_k is not None:
+        res["candidates"] = [
+            {"id": index.ids[idx], "value": index.values[idx], "score": float(score)}
+            for idx, score in matches
+        ]
+    return res
+
+@router.post("/api/similarity")
+async def match_value_by_similarity_single_return(
+    ctx: Union[Dict[str, Any], str] = Body(...),   # ✅ dict 또는 string 모두 허용
+) -> Dict[str, Any]:
+    # 0) payload 정규화: dict로 맞춘다
+    payload = parse_similarity_body(ctx)
+
+    # 입력 파싱
+    object_name = to_str(payload.get("objectName")).strip()
+    field_name  = to_str(payload.get("fieldName")).strip()
+    threshold   = to_float(payload.get("threshold", 0.8), 0.8)
+    top_k       = payload.get("topK")
+
+    res = new_match_result(object_name, field_name)
+
     # catalog 접근
-    catalog = mock_product_options()
-    obj_block = catalog.get(object_name)
-    field_map = obj_block.get(field_name) if isinstance(obj_block, dict) else None
-    if (obj_block is None) or (field_map is None):
+    catalog = product_options()
+    field_map = catalog.field_map(object_name, field_name)
+    if field_map is None:
         res["message"] = "Invalid objectName or fieldName."
         return res
 
@@ -181,18 +364,72 @@ async def match_value_by_similarity_single_return(
 
     res["sourceValue"] = user_value
 
-    # 유사도 최상 1건
-    src = normalize_value_text(user_value)
-    best_id, best_val, best_score = None, None, -1.0
-    for id_, val in field_map.items():
-        s = dl_ratio(src, normalize_value_text(val))
-        if s > best_score:
-            best_id, best_val, best_score = id_, val, s
+    # 유사도 상위 건 (인덱스로 후보를 좁힌 뒤 dl_ratio 로 정확히 채점) - CPU 작업이라 스레드에서
+    k = int(to_float(top_k, 1)) if top_k is not None else 1
 
-    if best_id is not None and best_score >= threshold:
-        res["success"] = True
-        res["id"] = {"id": best_id, "value": best_val, "score": float(best_score)}
-    else:
-        res["message"] = f"No value meets threshold {threshold}"
+    def score():
+        index = get_matcher_index(object_name, field_name, catalog)
+        return index, index.search(normalize_value_text(user_value), threshold, k)
 
-    return res
\ No newline at end of file
+    index, matches = await run_in_threadpool(score)
+
+    return fill_match_result(res, index, matches, threshold, top_k)
+
+@router.post("/api/similarity/batch")
+async def match_values_by_similarity_batch(
+    ctx: Union[Dict[str, Any], str] = Body(...),
+) -> Dict[str, Any]:
+    """여러 (objectName, fieldName, value) 를 한 번에 채점. items[i] 결과는 단건 API 응답과 같은 형태.
+
+    body 예) {"threshold": 0.8, "topK": 3, "items": [{"objectName": "...", "fieldName": "...", "value": "..."}]}
+    item 별 threshold / topK 로 기본값을 덮어쓸 수 있다.
+    """
+    payload = parse_similarity_body(ctx)
+    items = payload.get("items")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=422, detail="Body must contain an 'items' array")
+    if len(items) > SIMILARITY_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=422, detail=f"Too many items (max {SIMILARITY_BATCH_MAX_ITEMS})")
+
+    default_threshold = to_float(payload.get("threshold", 0.8), 0.8)
+    default_top_k = payload.get("topK")
+
+    catalog = product_options()
+    results: List[Dict[str, Any]] = []
+    # (objectName, fieldName, threshold, topK) 별로 묶어 한 번에 채점
+    groups: Dict[Tuple[str, str, float, Any], List[Tuple[int, str]]] = {}
+
+    for pos, item in enumerate(items):
+        item = item if isinstance(item, dict) else {}
+        object_name = to_str(item.get("objectName")).strip()
+        field_name  = to_str(item.get("fieldName")).strip()
+        res = new_match_result(object_name, field_name)
+        results.append(res)
+
+        if catalog.field_map(object_name, field_name) is None:
+            res["message"] = "Invalid objectName or fieldName."
+            continue
+
+        user_value = item.get("value")
+        if not isinstance(user_value, str):
+            res["message"] = f"Request item does not contain a string value at items[{pos}]['value']."
+            continue
+
+        res["sourceValue"] = user_value
+        threshold = to_float(item.get("threshold", default_threshold), default_threshold)
+        top_k = item.get("topK", default_top_k)
+        k = int(to_float(top_k, 1)) if top_k is not None else None
+        groups.setdefault((object_name, field_name, threshold, k), []).append((pos, user_value))
+
+    def score_groups():
+        for (object_name, field_name, threshold, top_k), members in groups.items():
+            index = get_matcher_index(object_name, field_name, catalog)
+            k = top_k if top_k is not None else 1
+            all_matches = index.batch_search([normalize_value_text(v) for _, v in members], threshold, k)
+            for (pos, _), matches in zip(members, all_matches):
+                fill_match_result(results[pos], index, matches, threshold, top_k)
+
+    # numpy 채점과 dl_ratio 재채점은 CPU 작업이라 스레드에서 (이벤트 루프의 다른 요청을 막지 않도록)
+    await run_in_threadpool(score_groups)
+
+    return {"count": len(results), "results": results}
\ No newline at end of file
@@ -0,0 +1,115 @@
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from datetime import datetime, timedelta
+import httpx
+import os
+
+from app.utils.bulkapi import bulk_ingest, get_job_info, stream_job_results
+from app.services.bulkloads import bulk_loads
+from app.services.pipeline import iter_pages
+from app.routes.publicApiData import get_movie_data, movie_payload
+
+router = APIRouter()
+
+# 한 번에 백필할 수 있는 최대 일수
+BULK_BACKFILL_MAX_DAYS = int(os.environ.get("BULK_BACKFILL_MAX_DAYS", "366"))
+
+RESULT_KINDS = {
+    "successful": "successfulResults",
+    "failed": "failedResults",
+    "unprocessed": "unprocessedrecords",
+}
+
+
+def parse_date_range(start_dt: str, end_dt: str):
+    try:
+        start = datetime.strptime(start_dt or "", "%Y%m%d")
+        end = datetime.strptime(end_dt or "", "%Y%m%d")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="startDt/endDt 는 YYYYMMDD 형식이어야 합니다.")
+    if end < start:
+        raise HTTPException(status_code=400, detail="endDt 가 startDt 보다 앞입니다.")
+    days = (end - start).days + 1
+    if days > BULK_BACKFILL_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"기간은 최대 {BULK_BACKFILL_MAX_DAYS}일까지 가능합니다.")
+    return start, days
+
+
+async def movie_backfill_rows(start: datetime, days: int, prefetch: int):
+    """날짜별 박스오피스를 미리 몇 날짜씩 동시 조회하면서 Salesforce 행으로 바로 흘려보낸다"""
+    async def fetch_day(page: int):
+        target_dt = (start + timedelta(days=page)).strftime("%Y%m%d")
+        data = await get_movie_data(target_dt)
+        items = data.get("boxOfficeResult", {}).get("dailyBoxOfficeList", [])
+        # 빈 날짜에서 페이지 순회가 끝나지 않도록 하루를 한 항목으로 감싼다
+        return [items], page == days - 1
+
+    async for page in iter_pages(fetch_day, prefetch=prefetch, max_pages=days):
+        for items in page:
+            for item in items:
+                yield movie_payload(item)
+
+
+@router.post("/sf-bulk/movie-backfill", status_code=202)
+async def sf_bulk_movie_backfill(request: Request):
+    """기간별 박스오피스를 Bulk API 2.0 으로 적재 (body: {"startDt", "endDt", "prefetch"})
+
+    바로 loadId 를 돌려주고, 진행 상황은 /sf-bulk/loads/{load_id} 로 조회한다.
+    """
+    body = await request.json()
+    start, days = parse_date_range(body.get("startDt"), body.get("endDt"))
+    prefetch = min(max(int(body.get("prefetch") or 4), 1), 8)
+
+    async def run(on_update):
+        rows = movie_backfill_rows(start, days, prefetch)
+        jobs = await bulk_ingest("NewsData__c", rows, fields=list(movie_payload({}).keys()), on_update=on_update)
+        return {"jobs": len(jobs), "states": [job.get("state") for job in jobs]}
+
+    params = {"startDt": body.get("startDt"), "endDt": body.get("endDt"), "days": days}
+    load = bulk_loads.submit("movie-backfill", params, run)
+    return {"loadId": load["loadId"], "status": load["status"]}
+
+
+@router.get("/sf-bulk/loads/{load_id}")
+async def get_bulk_load(load_id: str):
+    load = bulk_loads.get(load_id)
+    if load is None:
+        raise HTTPException(status_code=404, detail="load not found")
+    return load
+
+
+@router.get("/sf-bulk/jobs/{job_id}")
+async def get_bulk_job(job_id: str):
+    """Salesforce 에서 Bulk 작업 상태를 직접 조회"""
+    try:
+        return await get_job_info(job_id)
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(status_code=e.response.status_code, detail=f"[Bulk API Error] {e.response.text}")
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"[Bulk API Error] {str(e)}")
+
+
+@router.get("/sf-bulk/jobs/{job_id}/results")
+async def get_bulk_job_results(job_id: str, kind: str = Query("failed")):
+    """작업 결과 CSV 스트리밍 (kind: successful | failed | unprocessed)"""
+    if kind not in RESULT_KINDS:
+        raise HTTPException(status_code=400, detail=f"kind 는 {', '.join(RESULT_KINDS)} 중 하나여야 합니다.")
+
+    chunks = stream_job_results(job_id, RESULT_KINDS[kind])
+    # 첫 청크를 미리 받아 업스트림 오류는 스트리밍 시작 전에 상태 코드로 돌려준다
+    try:
+        first = await chunks.__anext__()
+    except StopAsyncIteration:
+        first = b""
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(status_code=e.response.status_code, detail=f"[Bulk API Error] {e.response.status_code}")
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"[Bulk API Error] {str(e)}")
+
+    async def body():
+        yield first
+        async for chunk in chunks:
+            yield chunk
+
+    return StreamingResponse(body(), media_type="text/csv",
+                             headers={"Content-Disposition": f'attachment; filename="{job_id}-{kind}.csv"'})
@@ -1,7 +1,20 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.utils.commonutil import resilience_stats
+from app.services.warmup import warmup
 
 router = APIRouter()
 
 @router.api_route("/healthz", methods=["GET", "HEAD"])
 async def healthz():
     return {"status": "ok"}
+
+@router.api_route("/readyz", methods=["GET", "HEAD"])
+async def readyz():
+    """기동 warm-up(카탈로그/인덱스, 토큰, 커넥션 풀)이 끝나야 200, 그 전에는 503 (로드밸런서 트래픽 투입 기준)"""
+    return JSONResponse(warmup.status(), status_code=200 if warmup.ready else 503)
+
+@router.get("/healthz/upstreams")
+async def healthz_upstreams():
+    """업스트림 차단기 상태와 Salesforce API 사용률"""
+    return await resilience_stats()
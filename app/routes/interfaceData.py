@@ -1,30 +1,39 @@
-import requests
+import httpx
 from fastapi import APIRouter, Request, HTTPException
 from app.models.interfaceData import Interface_In
 from app.services.salesforce import create_interface
 from app.utils.commonutil import get_salesforce_token
+from app.utils.resilience import UpstreamUnavailable
 
 router = APIRouter()
 
+
+def unavailable(e: UpstreamUnavailable) -> HTTPException:
+    """차단기가 열렸거나 호출 예산이 바닥나면 500 대신 503 + Retry-After 로 응답해 클라이언트 재시도 시점을 알려준다"""
+    return HTTPException(status_code=503, detail=f"[Unavailable] {str(e)}",
+                         headers={"Retry-After": str(int(e.retry_after) + 1)})
+
 # ✅ Bearer 토큰 발급용 엔드포인트
 @router.get("/get-bearer-token")
-def get_bearer_token():
+async def get_bearer_token():
     try:
-        token_data = get_salesforce_token()
+        token_data = await get_salesforce_token()
         return {
             "access_token": token_data.get("API_KEY"),
             "instance_url": token_data.get("SFDC_URL"),
             "raw": token_data
         }
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         raise HTTPException(status_code=500, detail=f"[Token Error] Salesforce 인증 실패: {str(e)}")
 
 
 @router.post("/create-interfaceData")
-def post_interface_data(data: Interface_In):
+async def post_interface_data(data: Interface_In):
     try:
-        return create_interface(data)
-    except requests.exceptions.RequestException as e:
+        return await create_interface(data)
+    except UpstreamUnavailable as e:
+        raise unavailable(e)
+    except httpx.HTTPError as e:
         raise HTTPException(status_code=500, detail=f"[Create Error] InterfaceData 생성 실패: {str(e)}")
 
 
@@ -42,10 +51,16 @@ async def sf_interface_proxy(request: Request):
             last_name=body["last_name"],
             company=body["company"]
         )
-        result = create_interface(interface_in)
+        result = await create_interface(interface_in)
         return {"status": "created", "result": result}
 
-    except requests.exceptions.RequestException as e:
+    except HTTPException:
+        raise
+
+    except UpstreamUnavailable as e:
+        raise unavailable(e)
+
+    except httpx.HTTPError as e:
         raise HTTPException(status_code=500, detail=f"[Proxy Error] Salesforce API 오류: {str(e)}")
 
     except Exception as e:
@@ -1,8 +1,19 @@
-from fastapi import Request,APIRouter, HTTPException
-import requests
+from fastapi import Request,APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+import asyncio
+import httpx
 import os
+import time
 from datetime import datetime
-from app.utils.commonutil import send_to_salesforce
+from app.utils.commonutil import call_upstream, send_batch_to_salesforce, iter_batch_to_salesforce
+from app.utils.httpclient import get_client
+from app.utils.ttlcache import TTLCache, NO_EXPIRY
+from app.utils.singleflight import SingleFlight
+from app.utils.sfquota import INGEST, use_sf_caller
+from app.utils.jsonutil import FastJSONResponse, ndjson_line
+from app.services.seenindex import seen_index
+from app.services.pipeline import iter_pages, push_in_batches
+from starlette.concurrency import run_in_threadpool
 
 router = APIRouter()
 
@@ -16,60 +27,169 @@ NEWS_URL = os.environ.get("NEWS_URL")
 MOVIE_KEY = os.environ.get("MOVIE_KEY")
 MOVIE_URL = os.environ.get("MOVIE_URL")
 
+# 전체 수집(페이지 단위) 시 한 페이지 최대 크기 (네이버 뉴스 display 최대 100, start 최대 1000)
+NEWS_MAX_DISPLAY = 100
+NEWS_MAX_START = 1000
 
+# 업스트림 응답 캐시 (소스별 정책)
+# - 지하철: 실시간 도착 정보라 짧은 TTL
+# - 뉴스: 검색어별 TTL
+# - 영화: 지난 날짜(targetDt < 오늘)는 바뀌지 않으므로 만료 없음, 오늘 이후는 TTL
+subway_cache = TTLCache(maxsize=8, ttl=float(os.environ.get("SUBWAY_CACHE_TTL_SEC", "15")))
+news_cache = TTLCache(maxsize=256, ttl=float(os.environ.get("NEWS_CACHE_TTL_SEC", "300")))
+movie_cache = TTLCache(maxsize=1024, ttl=float(os.environ.get("MOVIE_CACHE_TTL_SEC", "600")))
 
-def get_subway_data():
+# 같은 URL + 파라미터로 동시에 들어온 업스트림 조회는 한 번만 수행
+upstream_flights = SingleFlight()
+
+
+async def fetch_upstream_json(upstream: str, url: str, params: dict = None, headers: dict = None):
+    """업스트림 GET 후 JSON 반환 (동시 중복 호출은 하나로 합침, 일시 장애는 백오프 재시도)"""
+    async def fetch():
+        response = await call_upstream(upstream, lambda: get_client(upstream).get(url, params=params, headers=headers),
+                                       operation="fetch")
+        print(f"🔍 응답 상태 코드: {response.status_code}")
+        return response.json()
+
+    key = (upstream, url, tuple(sorted((params or {}).items())))
+    return await upstream_flights.do(key, fetch)
+
+
+def to_proxy_result(outcome: dict) -> dict:
+    """전송 결과 1건을 success/error 응답 형태로 변환"""
+    if outcome["error"] is None:
+        return {"success": True, "result": outcome["result"]}
+    return {"success": False, "error": outcome["error"], "data": outcome["data"]}
+
+
+def to_proxy_results(outcomes: list):
+    """일괄 전송 결과를 레코드별 success/error 응답 형태로 변환"""
+    return [to_proxy_result(outcome) for outcome in outcomes]
+
+
+@use_sf_caller(INGEST)
+async def stream_proxy_results(sobject: str, records: list, source: str = None):
+    """(record_key, payload) 목록을 전송하며 결과를 NDJSON 으로 흘려보낸다 (?stream=true)
+
+    줄 형식:
+    - {"type": "start", "count", "skipped"}
+    - {"type": "record", "index", "success", "result" | "error", "data"}  (청크가 끝나는 순서대로, index 는 전송 대상 내 위치)
+    - {"type": "summary", "status", "count", "succeeded", "failed", "skipped"}  또는 중간 실패 시 {"type": "error", "error"}
+    결과 전체를 모으지 않으므로 메모리는 청크 크기만큼만 쓴다.
+    source 를 주면 seen-index 로 이미 보낸 레코드는 건너뛰고, 성공한 청크부터 바로 기록한다.
+    응답 본문은 라우트 함수가 끝난 뒤 돌기 때문에 호출자 태그는 데코레이터로 제너레이터에 다시 붙인다.
+    """
+    skipped = 0
+    try:
+        if source:
+            send_positions, skipped = await run_in_threadpool(seen_index.filter_new, source, records)
+            records = [records[pos] for pos in send_positions]
+        yield ndjson_line({"type": "start", "count": len(records), "skipped": skipped})
+
+        succeeded = failed = 0
+        async for start, outcomes in iter_batch_to_salesforce(sobject, [payload for _, payload in records]):
+            lines, sent = [], []
+            for offset, outcome in enumerate(outcomes):
+                if outcome["error"] is None:
+                    succeeded += 1
+                    sent.append(records[start + offset])
+                else:
+                    failed += 1
+                lines.append(ndjson_line({"type": "record", "index": start + offset, **to_proxy_result(outcome)}))
+            if source and sent:
+                await run_in_threadpool(seen_index.mark_sent, source, sent)
+            yield b"".join(lines)
+    except Exception as e:
+        # 이미 200 을 보낸 뒤라 상태 코드 대신 마지막 줄로 실패를 알린다
+        print("🔥 스트리밍 전송 실패:", e)
+        yield ndjson_line({"type": "error", "error": f"[Proxy Error] {str(e)}"})
+        return
+    yield ndjson_line({"type": "summary", "status": "success", "count": len(records),
+                       "succeeded": succeeded, "failed": failed, "skipped": skipped})
+
+
+def ndjson_response(lines) -> StreamingResponse:
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+
+
+async def get_subway_data(use_cache: bool = True):
     """서울시 지하철 실시간 도착 정보 조회"""
     try:
         url = f"{SUBWAY_URL}{SUBWAY_API_KEY}/json/realtimeStationArrival/0/5/"
-        response = requests.get(url)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
+        if use_cache:
+            cached = subway_cache.get(url)
+            if cached is not None:
+                return cached
+
+        data = await fetch_upstream_json("subway", url)
+        if "realtimeArrivalList" in data:
+            subway_cache.set(url, data)
+        return data
+    except httpx.HTTPError as e:
         raise HTTPException(status_code=500, detail=f"[Subway API Error] {str(e)}")
     
 
+def subway_payload(item: dict) -> dict:
+    # Salesforce 객체 필드에 맞게 매핑 필요
+    return {
+        "StationName__c": item.get("statnNm"),
+        "ArrivalMessage__c": item.get("arvlMsg2"),
+        "TrainLine__c": item.get("trainLineNm"),
+        "ArrivalTime__c": item.get("recptnDt")
+    }
+
+
+async def subway_records(use_cache: bool = True) -> list:
+    """지하철 도착 정보 조회 -> 전송할 (None, payload) 목록"""
+    # 실시간 도착 데이터 조회
+    subway_data = await get_subway_data(use_cache=use_cache)
+    print("Subway Data:", subway_data)
+    if "realtimeArrivalList" not in subway_data:
+        raise HTTPException(status_code=400, detail="지하철 도착 정보가 없습니다.")
+
+    # 필요한 데이터 추출
+    return [(None, subway_payload(item)) for item in subway_data["realtimeArrivalList"]]
+
+
+@use_sf_caller(INGEST)
+async def ingest_subway(use_cache: bool = True):
+    """지하철 도착 정보 조회 -> Salesforce 일괄 전송"""
+    payloads = [payload for _, payload in await subway_records(use_cache=use_cache)]
+
+    results = []
+    for outcome in await send_batch_to_salesforce("SubwayData__c", payloads):
+        if outcome["error"] is None:
+            results.append(outcome["result"])
+        else:
+            results.append({"error": outcome["error"], "data": outcome["data"]})
+
+    return {
+        "status": "success",
+        "count": len(results),
+        "results": results
+    }
+
+
 @router.post("/sf-subway-proxy")
-async def sf_subway_proxy():
+async def sf_subway_proxy(no_cache: bool = Query(False, alias="noCache"), stream: bool = Query(False)):
     try:
-        # 실시간 도착 데이터 조회
-        subway_data = get_subway_data()
-        print("Subway Data:", subway_data)
-        if "realtimeArrivalList" not in subway_data:
-            raise HTTPException(status_code=400, detail="지하철 도착 정보가 없습니다.")
-
-        # 필요한 데이터 추출 및 반복 전송
-        results = []
-        for item in subway_data["realtimeArrivalList"]:
-            # Salesforce 객체 필드에 맞게 매핑 필요
-            payload = {
-                "StationName__c": item.get("statnNm"),
-                "ArrivalMessage__c": item.get("arvlMsg2"),
-                "TrainLine__c": item.get("trainLineNm"),
-                "ArrivalTime__c": item.get("recptnDt")
-            }
-            try:
-                result = send_to_salesforce("sobjects/SubwayData__c", payload)
-                results.append(result)
-            except Exception as single_error:
-                results.append({"error": str(single_error), "data": payload})
-
-        return {
-            "status": "success",
-            "count": len(results),
-            "results": results
-        }
+        if stream:
+            return ndjson_response(stream_proxy_results("SubwayData__c", await subway_records(use_cache=not no_cache)))
+        return FastJSONResponse(await ingest_subway(use_cache=not no_cache))
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"[Proxy Error] 처리 중 오류 발생: {str(e)}")
     
-def get_news_data():
+async def get_news_data(query: str = "AI", use_cache: bool = True):
     """뉴스 API 호출"""
     try:
         if not all([NEWS_CLIENTID, NEWS_SECRET, NEWS_URL]):
             raise ValueError("환경변수 설정이 누락되었습니다.")
 
-        query = "AI"  # 혹은 프론트에서 받은 키워드 등으로 동적으로 구성
+        if use_cache:
+            cached = news_cache.get(query)
+            if cached is not None:
+                return cached
 
         headers = {
             "X-Naver-Client-Id": NEWS_CLIENTID,
@@ -77,115 +197,290 @@ def get_news_data():
         }
         print(f"🔍 요청 헤더: {headers}")
 
-        url = f"{NEWS_URL}?query={query}"
-        print(f"🔍 요청 URL: {url}")
+        url = NEWS_URL
+        print(f"🔍 요청 URL: {url}?query={query}")
 
-        response = requests.get(url, headers=headers)
-        print(f"🔍 응답 상태 코드: {response.status_code}")
-        response.raise_for_status()
-
-        return response.json()
+        data = await fetch_upstream_json("news", url, params={"query": query}, headers=headers)
+        if "items" in data:
+            news_cache.set(query, data)
+        return data
 
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         raise HTTPException(status_code=500, detail=f"[News API Error] 요청 실패: {str(e)}")
 
     except ValueError as ve:
         raise HTTPException(status_code=500, detail=f"[News API Error] 환경변수 오류: {str(ve)}")
     
-def get_movie_data(target_dt: str = None):
+async def get_movie_data(target_dt: str = None, use_cache: bool = True):
     """영화 API 호출"""
     try:
         if not all([MOVIE_KEY, MOVIE_URL]):
             raise ValueError("환경변수 설정이 누락되었습니다.")
 
+        today = datetime.now().strftime("%Y%m%d")
         if not target_dt:
-            target_dt = datetime.now().strftime("%Y%m%d")
+            target_dt = today
+
+        if use_cache:
+            cached = movie_cache.get(target_dt)
+            if cached is not None:
+                return cached
 
         url = f"{MOVIE_URL}?key={MOVIE_KEY}&targetDt={target_dt}"
         print(f"🔍 요청 URL: {url}")
 
-        response = requests.get(url)
-        print(f"🔍 응답 상태 코드: {response}")
-        response.raise_for_status()
-
-        return response.json()
+        data = await fetch_upstream_json("movie", url)
+        if "boxOfficeResult" in data:
+            # 지난 날짜 박스오피스는 확정 데이터
+            movie_cache.set(target_dt, data, ttl=NO_EXPIRY if target_dt < today else None)
+        return data
 
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         raise HTTPException(status_code=500, detail=f"[Movie API Error] 요청 실패: {str(e)}")
 
     except ValueError as ve:
         raise HTTPException(status_code=500, detail=f"[Movie API Error] 환경변수 오류: {str(ve)}")
 
+def news_payload(item: dict) -> dict:
+    return {
+        "Title__c": item.get("title", ""),
+        "Description__c": item.get("description", ""),
+        "Link__c": item.get("link", ""),
+        "PubDate__c": item.get("pubDate", "")
+    }
+
+
+def movie_payload(item: dict) -> dict:
+    return {
+        "Title__c": item.get("movieNm", ""),
+        "Rank__c": item.get("rank", ""),
+        "OpenDate__c": item.get("openDt", ""),
+        "AudienceCount__c": item.get("audiCnt", "")
+    }
+
+
+async def send_new_records(source: str, sobject: str, records: list):
+    """seen-index 에 없거나 내용이 바뀐 (record_key, payload) 만 전송. (전송 결과, 건너뛴 건수) 반환"""
+    send_positions, skipped = await run_in_threadpool(seen_index.filter_new, source, records)
+    to_send = [records[pos] for pos in send_positions]
+
+    outcomes = await send_batch_to_salesforce(sobject, [payload for _, payload in to_send])
+
+    sent = [record for record, outcome in zip(to_send, outcomes) if outcome["error"] is None]
+    await run_in_threadpool(seen_index.mark_sent, source, sent)
+    return outcomes, skipped
+
+
+async def news_records(query: str = "AI", use_cache: bool = True) -> list:
+    """뉴스 조회 -> 전송할 (기사 링크, payload) 목록"""
+    news_data = await get_news_data(query, use_cache=use_cache)
+    print("News Data:", news_data)
+    if "items" not in news_data:
+        raise HTTPException(status_code=400, detail="뉴스 정보 없음")
+
+    records = []
+    for item in news_data["items"]:
+        payload = news_payload(item)
+        print('payload',payload)
+        records.append((payload["Link__c"], payload))
+    return records
+
+
+@use_sf_caller(INGEST)
+async def ingest_news(query: str = "AI", use_cache: bool = True):
+    """뉴스 조회 -> Salesforce 일괄 전송"""
+    records = await news_records(query, use_cache=use_cache)
+    outcomes, skipped = await send_new_records("news", "NewsData__c", records)
+    results = to_proxy_results(outcomes)
+
+    return {
+        "status": "success",
+        "count": len(results),
+        "skipped": skipped,
+        "results": results
+    }
+
+
+async def movie_records(target_dt: str = None, use_cache: bool = True) -> list:
+    """일별 박스오피스 조회 -> 전송할 (영화명|날짜, payload) 목록"""
+    print("📅 요청된 날짜:", target_dt)
+    movie_data = await get_movie_data(target_dt, use_cache=use_cache)
+    print("🔍 받은 전체 영화 데이터:", movie_data)
+
+    box_office_list = movie_data.get("boxOfficeResult", {}).get("dailyBoxOfficeList", [])
+
+    if not box_office_list:
+        raise HTTPException(status_code=400, detail="영화 정보가 없습니다.")
+
+    target_dt = target_dt or datetime.now().strftime("%Y%m%d")
+    return [(f"{item.get('movieNm', '')}|{target_dt}", movie_payload(item)) for item in box_office_list]
+
+
+@use_sf_caller(INGEST)
+async def ingest_movie(target_dt: str = None, use_cache: bool = True):
+    """일별 박스오피스 조회 -> Salesforce 일괄 전송"""
+    records = await movie_records(target_dt, use_cache=use_cache)
+    outcomes, skipped = await send_new_records("movie", "NewsData__c", records)
+    results = to_proxy_results(outcomes)
+
+    return {
+        "status": "success",
+        "count": len(results),
+        "skipped": skipped,
+        "results": results
+    }
+
+
 @router.post("/sf-news-proxy")
-async def sf_news_proxy():
+async def sf_news_proxy(query: str = "AI", no_cache: bool = Query(False, alias="noCache"), stream: bool = Query(False)):
     try:
-        news_data = get_news_data()
-        print("News Data:", news_data)
-        if "items" not in news_data:
-            raise HTTPException(status_code=400, detail="뉴스 정보 없음")
-
-        results = []
-        for item in news_data["items"]:
-            payload = {
-                "Title__c": item.get("title", ""),
-                "Description__c": item.get("description", ""),
-                "Link__c": item.get("link", ""),
-                "PubDate__c": item.get("pubDate", "")
-            }
-            print('payload',payload)
-            try:
-                result = send_to_salesforce("sobjects/NewsData__c", payload)
-                results.append({"success": True, "result": result})
-            except Exception as single_error:
-                results.append({"success": False, "error": str(single_error), "data": payload})
-
-        return {
-            "status": "success",
-            "count": len(results),
-            "results": results
-        }
+        if stream:
+            records = await news_records(query, use_cache=not no_cache)
+            return ndjson_response(stream_proxy_results("NewsData__c", records, source="news"))
+        return FastJSONResponse(await ingest_news(query, use_cache=not no_cache))
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"[Proxy Error] {str(e)}")
     
 @router.post("/sf-movie-proxy")
-async def sf_movie_proxy(request: Request):  # ✅ 인스턴스를 인자로 받기
+async def sf_movie_proxy(request: Request, no_cache: bool = Query(False, alias="noCache"),  # ✅ 인스턴스를 인자로 받기
+                         stream: bool = Query(False)):
     body = await request.json()
     target_dt = body.get("targetDt")  # 예: '20240704'
+    no_cache = no_cache or bool(body.get("noCache"))
+    stream = stream or bool(body.get("stream"))
     try:
         print("📥 요청 본문:", body)
-
-        print("📅 요청된 날짜:", target_dt)
-        movie_data = get_movie_data(target_dt)
-        print("🔍 받은 전체 영화 데이터:", movie_data)
-
-        box_office_list = movie_data.get("boxOfficeResult", {}).get("dailyBoxOfficeList", [])
-
-        if not box_office_list:
-            raise HTTPException(status_code=400, detail="영화 정보가 없습니다.")
-
-        results = []
-        for item in box_office_list:
-
-            payload = {
-                "Title__c": item.get("movieNm", ""),
-                "Rank__c": item.get("rank", ""),
-                "OpenDate__c": item.get("openDt", ""),
-                "AudienceCount__c": item.get("audiCnt", "")
-            }
-            try:
-                result = send_to_salesforce("sobjects/NewsData__c", payload)
-                results.append({"success": True, "result": result})
-
-            except Exception as single_error:
-                results.append({"success": False, "error": str(single_error), "data": payload})
-
-        return {
-            "status": "success",
-            "count": len(results),
-            "results": results
-        }
+        if stream:
+            records = await movie_records(target_dt, use_cache=not no_cache)
+            return ndjson_response(stream_proxy_results("NewsData__c", records, source="movie"))
+        return FastJSONResponse(await ingest_movie(target_dt, use_cache=not no_cache))
 
     except Exception as e:
         print("🔥 전체 예외:", str(e))
         raise HTTPException(status_code=500, detail=f"[Proxy Error] {str(e)}")
+
+
+async def _timed(source: str, pipeline):
+    """파이프라인 실행 결과를 소스별 리포트 형태로 변환 (예외도 리포트에 담는다)"""
+    started = time.perf_counter()
+    report = {"source": source}
+    try:
+        result = await pipeline
+        results = result["results"]
+        failed = sum(1 for r in results if "error" in r)
+        report.update(status="success", count=result["count"], succeeded=len(results) - failed, failed=failed,
+                      skipped=result.get("skipped", 0))
+    except Exception as e:
+        detail = e.detail if isinstance(e, HTTPException) else str(e)
+        report.update(status="error", error=detail)
+    report["elapsedMs"] = round((time.perf_counter() - started) * 1000, 1)
+    return report
+
+
+async def ingest_all(target_dt: str = None, query: str = "AI", use_cache: bool = True):
+    """지하철/뉴스/영화 수집을 동시에 실행하고 소스별 리포트 반환
+
+    Salesforce 로 나가는 동시 호출 수는 commonutil 의 전역 한도(SF_MAX_CONCURRENCY)를 따른다.
+    """
+    started = time.perf_counter()
+    reports = await asyncio.gather(
+        _timed("subway", ingest_subway(use_cache=use_cache)),
+        _timed("news", ingest_news(query, use_cache=use_cache)),
+        _timed("movie", ingest_movie(target_dt, use_cache=use_cache)),
+    )
+    return {
+        "status": "success" if all(r["status"] == "success" for r in reports) else "partial",
+        "elapsedMs": round((time.perf_counter() - started) * 1000, 1),
+        "sources": {r.pop("source"): r for r in reports},
+    }
+
+
+@router.post("/sf-ingest-all")
+async def sf_ingest_all(request: Request, no_cache: bool = Query(False, alias="noCache")):
+    """세 공공데이터 수집을 한 번에 실행 (body: {"targetDt", "query", "noCache"} 모두 선택)"""
+    try:
+        body = await request.json() if await request.body() else {}
+    except ValueError:
+        raise HTTPException(status_code=400, detail="요청 본문이 올바른 JSON 이 아닙니다.")
+    if not isinstance(body, dict):
+        raise HTTPException(status_code=400, detail="요청 본문은 JSON 객체여야 합니다.")
+    for key in ("targetDt", "query"):
+        if body.get(key) is not None and not isinstance(body[key], str):
+            raise HTTPException(status_code=400, detail=f"{key} 는 문자열이어야 합니다.")
+    no_cache = no_cache or bool(body.get("noCache"))
+    return await ingest_all(body.get("targetDt"), body.get("query") or "AI", use_cache=not no_cache)
+
+
+async def fetch_subway_page(page: int, page_size: int):
+    """지하철 도착 정보 한 페이지 조회 (행 범위 start/end 는 0부터, end 포함)"""
+    start = page * page_size
+    url = f"{SUBWAY_URL}{SUBWAY_API_KEY}/json/realtimeStationArrival/{start}/{start + page_size - 1}/"
+    data = await fetch_upstream_json("subway", url)
+    items = data.get("realtimeArrivalList") or []
+    total = (data.get("errorMessage") or {}).get("total")
+    is_last = len(items) < page_size or (total is not None and start + page_size >= int(total))
+    return items, is_last
+
+
+async def fetch_news_page(page: int, page_size: int, query: str):
+    """뉴스 검색 한 페이지 조회 (start 는 1부터)"""
+    start = page * page_size + 1
+    headers = {
+        "X-Naver-Client-Id": NEWS_CLIENTID,
+        "X-Naver-Client-Secret": NEWS_SECRET
+    }
+    data = await fetch_upstream_json("news", NEWS_URL, params={"query": query, "display": page_size, "start": start}, headers=headers)
+    items = data.get("items") or []
+    total = int(data.get("total") or 0)
+    is_last = len(items) < page_size or start + page_size > total or start + page_size > NEWS_MAX_START
+    return items, is_last
+
+
+@router.post("/sf-subway-sync")
+@use_sf_caller(INGEST)
+async def sf_subway_sync(page_size: int = Query(100, alias="pageSize", ge=1, le=1000),
+                         max_pages: int = Query(None, alias="maxPages", ge=1),
+                         prefetch: int = Query(2, ge=1, le=8)):
+    """지하철 도착 정보 전체를 페이지 단위로 받아 배치가 찰 때마다 Salesforce 로 전송"""
+    started = time.perf_counter()
+    pages = iter_pages(lambda page: fetch_subway_page(page, page_size), prefetch=prefetch, max_pages=max_pages)
+    sink = lambda batch: send_batch_to_salesforce("SubwayData__c", batch)
+    try:
+        summary = await push_in_batches(pages, subway_payload, sink)
+    except (httpx.HTTPError, ValueError) as e:
+        raise HTTPException(status_code=500, detail=f"[Subway Sync Error] {str(e)}")
+    summary["elapsedMs"] = round((time.perf_counter() - started) * 1000, 1)
+    return {"status": "success", **summary}
+
+
+@router.post("/sf-news-sync")
+@use_sf_caller(INGEST)
+async def sf_news_sync(query: str = "AI",
+                       page_size: int = Query(NEWS_MAX_DISPLAY, alias="pageSize", ge=1, le=NEWS_MAX_DISPLAY),
+                       max_pages: int = Query(None, alias="maxPages", ge=1),
+                       prefetch: int = Query(2, ge=1, le=8)):
+    """뉴스 검색 결과 전체를 페이지 단위로 받아 새 기사만 배치 단위로 Salesforce 로 전송"""
+    if not all([NEWS_CLIENTID, NEWS_SECRET, NEWS_URL]):
+        raise HTTPException(status_code=500, detail="[News API Error] 환경변수 오류: 환경변수 설정이 누락되었습니다.")
+
+    started = time.perf_counter()
+    skipped = {"count": 0}
+
+    async def sink(batch):
+        outcomes, batch_skipped = await send_new_records("news", "NewsData__c", batch)
+        skipped["count"] += batch_skipped
+        return outcomes
+
+    def mapper(item):
+        payload = news_payload(item)
+        return payload["Link__c"], payload
+
+    pages = iter_pages(lambda page: fetch_news_page(page, page_size, query), prefetch=prefetch, max_pages=max_pages)
+    try:
+        summary = await push_in_batches(pages, mapper, sink)
+    except (httpx.HTTPError, ValueError) as e:
+        raise HTTPException(status_code=500, detail=f"[News Sync Error] {str(e)}")
+    summary["skipped"] = skipped["count"]
+    summary["elapsedMs"] = round((time.perf_counter() - started) * 1000, 1)
+    return {"status": "success", **summary}
@@ -0,0 +1,93 @@
+# app/services/bulkloads.py
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import asyncio
+import time
+import uuid
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# 상태 조회 응답에 담을 Bulk 작업 필드
+JOB_FIELDS = ("id", "object", "operation", "state", "numberRecordsProcessed", "numberRecordsFailed",
+              "errorMessage", "createdDate", "systemModstamp")
+
+
+class BulkLoadManager:
+    """Bulk API 적재를 백그라운드 Task 로 돌리고 진행 상태를 메모리에 보관
+
+    load 하나가 Bulk 작업 여러 개로 나뉠 수 있어 작업별 최신 정보를 jobs 에 모은다.
+    오래된 load 기록은 max_loads 개를 넘으면 완료된 것부터 버린다.
+    """
+
+    def __init__(self, max_loads: int = 100):
+        self.max_loads = max_loads
+        self._loads: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def submit(self, name: str, params: dict, run: Callable[[Callable[[dict], None]], Awaitable[Any]]) -> Dict[str, Any]:
+        """run(on_update) 코루틴을 백그라운드로 실행하고 load 기록 반환"""
+        load_id = uuid.uuid4().hex
+        load = {
+            "loadId": load_id, "name": name, "params": params, "status": QUEUED,
+            "createdAt": time.time(), "finishedAt": None, "jobs": {}, "summary": None, "error": None,
+        }
+        self._loads[load_id] = load
+        self._prune()
+
+        def on_update(job_info: dict):
+            job_id = job_info.get("id")
+            if job_id:
+                load["jobs"][job_id] = {k: job_info[k] for k in JOB_FIELDS if k in job_info}
+
+        task = asyncio.ensure_future(self._run(load, run, on_update))
+        self._tasks[load_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(load_id, None))
+        return load
+
+    async def _run(self, load: dict, run, on_update):
+        load["status"] = RUNNING
+        try:
+            load["summary"] = await run(on_update)
+            load["status"] = DONE
+        except asyncio.CancelledError:
+            load["status"] = FAILED
+            load["error"] = "cancelled"
+            raise
+        except Exception as e:
+            print(f"🔥 Bulk load {load['loadId']} 실패:", e)
+            load["status"] = FAILED
+            load["error"] = str(e)
+        finally:
+            load["finishedAt"] = time.time()
+
+    def _prune(self):
+        for load_id in list(self._loads):
+            if len(self._loads) <= self.max_loads:
+                break
+            if self._loads[load_id]["status"] in (DONE, FAILED):
+                del self._loads[load_id]
+
+    def get(self, load_id: str) -> Optional[Dict[str, Any]]:
+        load = self._loads.get(load_id)
+        if load is None:
+            return None
+        jobs = list(load["jobs"].values())
+        return {
+            **{k: v for k, v in load.items() if k != "jobs"},
+            "jobs": jobs,
+            "recordsProcessed": sum(int(j.get("numberRecordsProcessed") or 0) for j in jobs),
+            "recordsFailed": sum(int(j.get("numberRecordsFailed") or 0) for j in jobs),
+        }
+
+    async def stop(self):
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+bulk_loads = BulkLoadManager()
@@ -0,0 +1,200 @@
+# app/services/catalog.py
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple
+
+import os
+import sqlite3
+import threading
+import time
+
+from app.services.matcher import build_matcher_indexes, normalize_value_text
+
+CATALOG_DB = os.getenv("CATALOG_DB", "catalog.db")
+CATALOG_WATCH_INTERVAL_SEC = float(os.getenv("CATALOG_WATCH_INTERVAL_SEC", "5.0"))
+
+# DB 가 비어 있을 때 넣는 기본 옵션 (이전 mock_product_options 내용)
+SEED_OPTIONS: Dict[str, Dict[str, Dict[str, str]]] = {
+    "시책": {
+        "Promotion2": {
+            "P2-CFX-5Y-PT5Y-75MK-OIL2Y": "CFX 5yrs( 동력전달계통5년75만km 보증, 엔진오일및필터2년)",
+            # ... 생략 ...
+        }
+    }
+}
+
+
+class CatalogNotReady(Exception):
+    """최초 카탈로그 적재(기동 warm-up 또는 백그라운드)가 아직 끝나지 않았을 때"""
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """한 시점의 상품 옵션 카탈로그 (읽기 전용)
+
+    options[objectName][fieldName][id] = value, normalized[(objectName, fieldName)] = 정규화 값 튜플 (options 순서).
+    version 은 reload 마다 증가하므로 파생 캐시/인덱스는 이 값으로 재생성 여부를 판단한다.
+    """
+    version: int
+    options: Mapping[str, Mapping[str, Mapping[str, str]]]
+    normalized: Mapping[Tuple[str, str], Tuple[str, ...]]
+    source_stamp: Tuple[float, ...]
+    loaded_at: float
+
+    def field_map(self, object_name: str, field_name: str) -> Optional[Mapping[str, str]]:
+        obj_block = self.options.get(object_name)
+        return obj_block.get(field_name) if obj_block is not None else None
+
+    @property
+    def entries(self) -> int:
+        return sum(len(v) for v in self.normalized.values())
+
+
+class CatalogStore:
+    """SQLite 기반 카탈로그 저장소
+
+    기동 시 ensure_loaded() 로 한 번 읽어 불변 스냅샷으로 보관하고, reload() 로 새 스냅샷을 만든 뒤 참조만 교체한다.
+    처리 중인 요청은 이전 스냅샷을 그대로 쓰므로 reload 중에도 멈추지 않는다.
+    snapshot() 은 CATALOG_WATCH_INTERVAL_SEC 마다 DB 파일 변경을 확인해 백그라운드에서 reload 한다.
+    """
+
+    def __init__(self, path: str = CATALOG_DB, watch_interval_sec: float = CATALOG_WATCH_INTERVAL_SEC):
+        self.path = path
+        self.watch_interval_sec = watch_interval_sec
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._version = 0
+        self._lock = threading.Lock()
+        self._reloading = False
+        self._next_check = 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS product_option ("
+            "object_name TEXT NOT NULL, field_name TEXT NOT NULL, option_id TEXT NOT NULL, "
+            "value TEXT NOT NULL, sort_order INTEGER NOT NULL DEFAULT 0, "
+            "PRIMARY KEY (object_name, field_name, option_id))"
+        )
+        return conn
+
+    def _source_stamp(self) -> Tuple[float, ...]:
+        # WAL 모드에서는 체크포인트 전까지 본 파일이 바뀌지 않으므로 -wal 파일도 함께 본다
+        stamp = []
+        for path in (self.path, self.path + "-wal"):
+            try:
+                st = os.stat(path)
+                stamp.extend((st.st_mtime, st.st_size))
+            except OSError:
+                stamp.extend((0.0, 0))
+        return tuple(stamp)
+
+    def _seed_if_empty(self, conn: sqlite3.Connection):
+        if conn.execute("SELECT 1 FROM product_option LIMIT 1").fetchone():
+            return
+        rows = [
+            (obj, field, option_id, value, order)
+            for obj, fields in SEED_OPTIONS.items()
+            for field, values in fields.items()
+            for order, (option_id, value) in enumerate(values.items())
+        ]
+        with conn:
+            conn.executemany(
+                "INSERT INTO product_option (object_name, field_name, option_id, value, sort_order) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+
+    def _load(self) -> CatalogSnapshot:
+        conn = self._connect()
+        try:
+            self._seed_if_empty(conn)
+            rows = conn.execute(
+                "SELECT object_name, field_name, option_id, value FROM product_option "
+                "ORDER BY object_name, field_name, sort_order, rowid"
+            ).fetchall()
+        finally:
+            conn.close()
+        # 커넥션을 닫은 뒤(WAL 체크포인트 이후) 파일 상태를 기록해야 자기 자신의 읽기로 재로드되지 않는다
+        stamp = self._source_stamp()
+
+        options: Dict[str, Dict[str, Dict[str, str]]] = {}
+        for obj, field, option_id, value in rows:
+            options.setdefault(obj, {}).setdefault(field, {})[option_id] = value
+
+        normalized = {
+            (obj, field): tuple(normalize_value_text(v) for v in values.values())
+            for obj, fields in options.items()
+            for field, values in fields.items()
+        }
+        frozen = MappingProxyType({
+            obj: MappingProxyType({field: MappingProxyType(values) for field, values in fields.items()})
+            for obj, fields in options.items()
+        })
+
+        self._version += 1
+        return CatalogSnapshot(
+            version=self._version,
+            options=frozen,
+            normalized=MappingProxyType(normalized),
+            source_stamp=stamp,
+            loaded_at=time.time(),
+        )
+
+    def reload(self) -> CatalogSnapshot:
+        """DB 를 다시 읽어 스냅샷을 원자적으로 교체
+
+        유사도 인덱스까지 만든 뒤 교체하므로 새 스냅샷을 본 요청이 루프에서 인덱스를 만들지 않는다.
+        파일 읽기와 인덱스 생성이 무거우므로 이벤트 루프에서는 run_in_threadpool 로 호출한다.
+        """
+        with self._lock:
+            return self._reload_locked()
+
+    def ensure_loaded(self) -> CatalogSnapshot:
+        """스냅샷이 없을 때만 읽어 온다 (블로킹, 스레드에서 호출). 진행 중인 적재가 있으면 그 결과를 기다린다."""
+        with self._lock:
+            snapshot = self._snapshot
+            return snapshot if snapshot is not None else self._reload_locked()
+
+    def _reload_locked(self) -> CatalogSnapshot:
+        snapshot = self._load()
+        build_matcher_indexes(snapshot)
+        self._snapshot = snapshot
+        print(f"Catalog loaded: version={snapshot.version}, entries={snapshot.entries}")
+        return snapshot
+
+    def _reload_in_background(self):
+        # reload 중(락 보유)이어도 요청 경로가 기다리지 않도록 플래그만 확인
+        if self._reloading:
+            return
+        self._reloading = True
+        threading.Thread(target=self._safe_reload, daemon=True).start()
+
+    def _safe_reload(self):
+        try:
+            if self._snapshot is None:
+                self.ensure_loaded()
+            else:
+                self.reload()
+        except Exception as e:
+            print("Catalog reload failed:", e)
+        finally:
+            self._reloading = False
+
+    def snapshot(self) -> CatalogSnapshot:
+        """현재 스냅샷 (요청 경로용, 블로킹 없음)
+
+        아직 적재 전이면 백그라운드 적재를 시작하고 CatalogNotReady 를 던진다.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            self._reload_in_background()
+            raise CatalogNotReady("catalog is not loaded yet")
+
+        now = time.monotonic()
+        if self.watch_interval_sec > 0 and now >= self._next_check:
+            self._next_check = now + self.watch_interval_sec
+            if self._source_stamp() != snapshot.source_stamp:
+                self._reload_in_background()
+        return snapshot
+
+catalog_store = CatalogStore()
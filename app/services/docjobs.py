@@ -0,0 +1,296 @@
+# app/services/docjobs.py
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from starlette.concurrency import run_in_threadpool
+
+# 작업 처리 함수: (file_bytes, payload, headers) -> (성공 여부, 결과 JSON)
+JobHandler = Callable[[bytes, Dict[str, str], Dict[str, str]], Awaitable[Tuple[bool, Any]]]
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class DocJobManager:
+    """문서 파싱 비동기 작업 큐 (제출 -> 작업 id, 상태/결과 조회)
+
+    작업 상태는 SQLite, 업로드 파일은 job_dir 에 저장하므로 재시작 후에도 대기/진행 중 작업을 다시 처리한다.
+    workers 개의 asyncio 워커가 큐를 처리하고, 업스트림별 동시 호출 수는 upstream_limits 로 제한한다.
+    Authorization 헤더는 디스크에 남기지 않고 메모리에만 두며, 재시작 후에는 fallback_authorization 을 쓴다.
+    여러 프로세스(같은 노드)가 같은 DB 를 써도 작업은 조건부 UPDATE 로 한 곳만 가져간다.
+    작업마다 소유 프로세스(pid, 인스턴스 id)와 heartbeat 를 기록하고, 다른 프로세스의 작업은 소유 프로세스가
+    죽었거나 heartbeat 가 stale_after_sec 넘게 끊겼을 때만 가져간다 (살아 있는 워커가 방금 받은 작업을 뺏지 않도록).
+    SQLite 호출은 스레드풀에서 실행한다.
+    """
+
+    def __init__(self, db_path: str, job_dir: str, handler: JobHandler, workers: int = 4,
+                 upstream_limits: Optional[Dict[str, int]] = None, retention_sec: float = 86400.0,
+                 fallback_authorization: Optional[str] = None, stale_after_sec: float = 600.0):
+        self.db_path = db_path
+        self.job_dir = job_dir
+        self.handler = handler
+        self.workers = workers
+        self.upstream_limits = upstream_limits or {}
+        self.retention_sec = retention_sec
+        self.fallback_authorization = fallback_authorization
+        self.stale_after_sec = stale_after_sec
+        self.heartbeat_sec = max(1.0, stale_after_sec / 4)
+        # start() 에서 정한다 (fork 된 워커마다 달라야 하므로 생성 시점이 아니라 기동 시점)
+        self.owner_pid: Optional[int] = None
+        self.owner_id: Optional[str] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        # 스레드풀의 여러 스레드가 커넥션 하나를 나눠 쓰므로 트랜잭션 단위로 직렬화
+        self._db_lock = threading.Lock()
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks = []
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._credentials: Dict[str, str] = {}
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5.0, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS doc_job ("
+                "id TEXT PRIMARY KEY, status TEXT NOT NULL, upstream TEXT NOT NULL, payload TEXT NOT NULL, "
+                "file_path TEXT, result TEXT, error TEXT, attempts INTEGER NOT NULL DEFAULT 0, "
+                "created REAL NOT NULL, updated REAL NOT NULL, owner_pid INTEGER, owner_id TEXT, heartbeat REAL)"
+            )
+            # 소유자/heartbeat 컬럼이 없던 이전 DB 에 추가 (다른 프로세스가 먼저 추가했으면 무시)
+            columns = {r["name"] for r in conn.execute("PRAGMA table_info(doc_job)")}
+            for name, decl in (("owner_pid", "INTEGER"), ("owner_id", "TEXT"), ("heartbeat", "REAL")):
+                if name not in columns:
+                    try:
+                        conn.execute(f"ALTER TABLE doc_job ADD COLUMN {name} {decl}")
+                    except sqlite3.OperationalError as e:
+                        if "duplicate column" not in str(e):
+                            raise
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _execute(self, sql: str, params=()) -> sqlite3.Cursor:
+        with self._db_lock:
+            conn = self._connection()
+            cur = conn.execute(sql, params)
+            conn.commit()
+            return cur
+
+    def _fetch(self, sql: str, params=()) -> list:
+        with self._db_lock:
+            return self._connection().execute(sql, params).fetchall()
+
+    async def _update(self, job_id: str, **fields):
+        fields["updated"] = time.time()
+        columns = ", ".join(f"{k} = ?" for k in fields)
+        await run_in_threadpool(self._execute, f"UPDATE doc_job SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def _recoverable(self, row: sqlite3.Row, now: float) -> bool:
+        """이 프로세스가 실행해도 되는 작업인지 (자기 queued 작업, 또는 소유 프로세스가 죽었거나 heartbeat 가 끊긴 작업)"""
+        if row["owner_id"] == self.owner_id:
+            return row["status"] == QUEUED
+        return not _pid_alive(row["owner_pid"]) or _heartbeat(row) < now - self.stale_after_sec
+
+    async def _claim(self, row: sqlite3.Row) -> bool:
+        """읽어 둔 row 상태 그대로일 때만 이 프로세스 소유 running 으로 바꾼다. 그 사이 다른 곳이 바꿨으면 False"""
+        now = time.time()
+        cur = await run_in_threadpool(
+            self._execute,
+            "UPDATE doc_job SET status = ?, attempts = attempts + 1, owner_pid = ?, owner_id = ?, heartbeat = ?, updated = ? "
+            "WHERE id = ? AND status = ? AND attempts = ? AND owner_id IS ? AND heartbeat IS ?",
+            (RUNNING, self.owner_pid, self.owner_id, now, now,
+             row["id"], row["status"], row["attempts"], row["owner_id"], row["heartbeat"])
+        )
+        return cur.rowcount == 1
+
+    def _semaphore(self, upstream: str) -> asyncio.Semaphore:
+        sem = self._semaphores.get(upstream)
+        if sem is None:
+            sem = self._semaphores[upstream] = asyncio.Semaphore(self.upstream_limits.get(upstream, self.workers))
+        return sem
+
+    async def start(self):
+        """워커 기동 + 죽은 프로세스가 끝내지 못한 작업 재등록 + 보관 기간 지난 작업 정리
+
+        살아 있는 다른 워커의 작업은 가져오지 않고, 그 워커가 죽는 경우에 대비해 heartbeat 기한 뒤 다시 확인한다.
+        """
+        os.makedirs(self.job_dir, exist_ok=True)
+        self.owner_pid = os.getpid()
+        self.owner_id = f"{self.owner_pid}-{uuid.uuid4().hex[:12]}"
+        self._queue = asyncio.Queue()
+        await run_in_threadpool(self._execute, "DELETE FROM doc_job WHERE status IN (?, ?) AND updated < ?",
+                                (DONE, FAILED, time.time() - self.retention_sec))
+        pending = await run_in_threadpool(self._fetch, "SELECT * FROM doc_job WHERE status IN (?, ?) ORDER BY created",
+                                          (QUEUED, RUNNING))
+        now = time.time()
+        recovered = 0
+        for row in pending:
+            if self._recoverable(row, now):
+                self._queue.put_nowait(row["id"])
+                recovered += 1
+            else:
+                self._requeue_later(row["id"], _heartbeat(row) + self.stale_after_sec - now)
+        if pending:
+            print(f"DocJob recovered {recovered} job(s), {len(pending) - recovered} owned by live workers")
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._heartbeat_loop()))
+
+    async def _heartbeat_loop(self):
+        """이 프로세스 소유의 대기/진행 중 작업 heartbeat 갱신 (다른 워커가 살아 있는 작업으로 보도록)"""
+        while True:
+            await asyncio.sleep(self.heartbeat_sec)
+            try:
+                await run_in_threadpool(self._execute,
+                                        "UPDATE doc_job SET heartbeat = ? WHERE owner_id = ? AND status IN (?, ?)",
+                                        (time.time(), self.owner_id, QUEUED, RUNNING))
+            except Exception as e:
+                print("DocJob heartbeat error:", e)
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    async def submit(self, file_path: str, payload: Dict[str, str], headers: Dict[str, str],
+                     upstream: str = "upstage", job_id: Optional[str] = None) -> str:
+        """job_dir 에 저장된 파일로 작업 등록 후 즉시 작업 id 반환 (등록에 실패하면 파일을 지운다)"""
+        job_id = job_id or uuid.uuid4().hex
+        now = time.time()
+        try:
+            await run_in_threadpool(
+                self._execute,
+                "INSERT INTO doc_job (id, status, upstream, payload, file_path, created, updated, owner_pid, owner_id, "
+                "heartbeat) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, QUEUED, upstream, json.dumps(payload, ensure_ascii=False), file_path, now, now,
+                 self.owner_pid, self.owner_id, now)
+            )
+        except BaseException:
+            await run_in_threadpool(self.remove_file, file_path)
+            raise
+        if headers.get("Authorization"):
+            self._credentials[job_id] = headers["Authorization"]
+        self._queue.put_nowait(job_id)
+        return job_id
+
+    def new_file_path(self, job_id: str) -> str:
+        return os.path.join(self.job_dir, f"{job_id}.bin")
+
+    @staticmethod
+    def remove_file(path: Optional[str]):
+        """작업 파일 삭제 (업로드 저장 중 실패 등으로 등록하지 못한 파일 정리용, 없으면 무시)"""
+        if path:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    async def _row(self, job_id: str) -> Optional[sqlite3.Row]:
+        rows = await run_in_threadpool(self._fetch, "SELECT * FROM doc_job WHERE id = ?", (job_id,))
+        return rows[0] if rows else None
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = await self._row(job_id)
+        if row is None:
+            return None
+        return {
+            "jobId": row["id"],
+            "status": row["status"],
+            "attempts": row["attempts"],
+            "error": row["error"],
+            "createdAt": row["created"],
+            "updatedAt": row["updated"],
+            "result": json.loads(row["result"]) if row["result"] else None,
+        }
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print("DocJob error:", job_id, e)
+            finally:
+                self._queue.task_done()
+
+    def _requeue_later(self, job_id: str, delay: float):
+        asyncio.get_running_loop().call_later(max(1.0, delay), self._queue.put_nowait, job_id)
+
+    async def _run(self, job_id: str):
+        row = await self._row(job_id)
+        if row is None or row["status"] not in (QUEUED, RUNNING):
+            return
+        if not self._recoverable(row, time.time()):
+            # 살아 있는 다른 워커의 작업. 그 워커가 죽었을 때를 대비해 heartbeat 기한 뒤 다시 확인
+            self._requeue_later(job_id, _heartbeat(row) + self.stale_after_sec - time.time())
+            return
+        if not await self._claim(row):
+            # 그 사이 다른 프로세스가 가져감. 그 프로세스가 죽을 때를 대비해 나중에 다시 확인
+            self._requeue_later(job_id, self.stale_after_sec)
+            return
+
+        cancelled = False
+        try:
+            authorization = self._credentials.pop(job_id, None) or self.fallback_authorization
+            if not authorization:
+                await self._update(job_id, status=FAILED, error="credentials lost on restart; please resubmit")
+                return
+
+            file_bytes = await run_in_threadpool(_read_file, row["file_path"])
+            payload = json.loads(row["payload"])
+
+            async with self._semaphore(row["upstream"]):
+                ok, result = await self.handler(file_bytes, payload, {"Authorization": authorization})
+
+            if ok:
+                await self._update(job_id, status=DONE, result=json.dumps(result, ensure_ascii=False), error=None)
+            else:
+                await self._update(job_id, status=FAILED, result=json.dumps(result, ensure_ascii=False), error="upstream error")
+        except asyncio.CancelledError:
+            # 종료 중 취소: 파일을 남기고 queued 로 되돌려 재시작 후 바로 다시 처리 (종료 경로라 동기 호출)
+            cancelled = True
+            self._execute("UPDATE doc_job SET status = ?, updated = ? WHERE id = ? AND status = ?",
+                          (QUEUED, time.time(), job_id, RUNNING))
+            raise
+        except Exception as e:
+            await self._update(job_id, status=FAILED, error=str(e) or type(e).__name__)
+            raise
+        finally:
+            if not cancelled:
+                await run_in_threadpool(self.remove_file, row["file_path"])
+
+
+def _heartbeat(row: sqlite3.Row) -> float:
+    # heartbeat 컬럼이 생기기 전 작업은 마지막 갱신 시각 기준
+    return row["heartbeat"] if row["heartbeat"] is not None else row["updated"]
+
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # 다른 사용자의 프로세스로 존재함
+        return True
+    return True
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
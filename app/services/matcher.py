@@ -0,0 +1,202 @@
+# app/services/matcher.py
+from collections import Counter
+from typing import TYPE_CHECKING, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import difflib
+import re
+
+# numpy 는 채점할 때(인덱스 배열 생성 시) 처음 불러온다 (프로세스 기동 시간 단축)
+if TYPE_CHECKING:
+    import numpy as np
+
+# 배치 채점 시 한 번에 처리할 질의 수 (질의 수 x 카탈로그 크기 행렬 메모리 제한)
+BATCH_QUERY_CHUNK = 64
+
+
+# 정확도 검사
+def dl_ratio(a: str, b: str) -> float:
+    return difflib.SequenceMatcher(None, a, b).ratio()
+
+def normalize_value_text(s: str) -> str:
+    if not s:
+        return ""
+    return re.sub(r"\s+", " ", s).strip().lower()
+
+
+class MatcherIndex:
+    """옵션 카탈로그(id -> value) 한 필드에 대한 유사도 검색 인덱스
+
+    정규화 문자열과 문자 n-gram(n=1, 등장 횟수 포함) 역색인을 미리 만들어 둔다.
+    검색 시 역색인(numpy 배열)으로 후보별 공통 문자 수를 세고, 이로부터 SequenceMatcher.ratio 의 상한
+    2 * 공통문자수 / (len(a) + len(b)) 를 구한다. 상한이 높은 순서로 dl_ratio 를 계산하다가
+    상한이 현재 k번째 점수(또는 threshold) 아래로 내려가면 멈추므로 결과는 전체 선형 탐색과 같다.
+    """
+
+    def __init__(self, field_map: Mapping[str, str], norms: Optional[Sequence[str]] = None):
+        self.ids: List[str] = list(field_map.keys())
+        self.values: List[str] = list(field_map.values())
+        self.norms: List[str] = list(norms) if norms is not None else [normalize_value_text(v) for v in self.values]
+        self.lengths: List[int] = [len(n) for n in self.norms]
+
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        for idx, norm in enumerate(self.norms):
+            for ch, cnt in Counter(norm).items():
+                postings.setdefault(ch, []).append((idx, cnt))
+        self.postings = postings
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _upper_bounds(self, query: str, min_bound: float) -> List[Tuple[float, int]]:
+        """상한이 min_bound 이상인 (점수 상한, idx) 목록을 상한 내림차순으로 반환
+
+        질의에 있는 문자들의 posting 배열만 numpy 로 더하므로 파이썬 반복 횟수는 질의 길이에만 비례한다.
+        """
+        import numpy as np
+        arrays = self._posting_arrays()
+        overlap = np.zeros(len(self.ids), dtype=np.int32)
+        for ch, q_cnt in Counter(query).items():
+            posting = arrays.get(ch)
+            if posting is not None:
+                doc_idx, doc_cnt = posting
+                # 한 문자의 posting 안에서 문서 idx 는 중복되지 않으므로 fancy index 누적으로 충분
+                overlap[doc_idx] += np.minimum(doc_cnt, q_cnt)
+
+        denom = len(query) + self._length_array
+        # 빈 문자열끼리는 ratio 1.0
+        bound = np.divide(2.0 * overlap, denom, out=np.ones_like(denom), where=denom > 0)
+        return self._candidates(bound, min_bound)
+
+    @staticmethod
+    def _candidates(bound: "np.ndarray", min_bound: float) -> List[Tuple[float, int]]:
+        """상한 벡터에서 min_bound 이상인 후보를 상한 내림차순(동점은 카탈로그 순서)으로 반환"""
+        import numpy as np
+        cand = np.flatnonzero(bound >= min_bound)
+        cand = cand[np.lexsort((cand, -bound[cand]))]
+        return list(zip(bound[cand].tolist(), cand.tolist()))
+
+    def search(self, query_norm: str, threshold: float, top_k: int = 1) -> List[Tuple[int, float]]:
+        """threshold 이상인 상위 top_k 건을 (idx, score) 로 반환. 동점은 카탈로그 순서 우선."""
+        top_k = max(1, top_k)
+
+        if threshold <= 0:
+            # 모든 항목이 후보가 되므로 전체 탐색
+            scored = [(dl_ratio(query_norm, norm), idx) for idx, norm in enumerate(self.norms)]
+            scored.sort(key=lambda s: (-s[0], s[1]))
+            return [(idx, score) for score, idx in scored[:top_k]]
+
+        return self._rerank(query_norm, self._upper_bounds(query_norm, threshold), threshold, top_k)
+
+    def _rerank(self, query_norm: str, bounds, threshold: float, top_k: int) -> List[Tuple[int, float]]:
+        """상한 내림차순 후보를 dl_ratio 로 정확히 채점해 상위 top_k 건 선택"""
+        best: List[Tuple[float, int]] = []
+        floor = threshold
+        for bound, idx in bounds:
+            if bound < floor:
+                break
+            score = dl_ratio(query_norm, self.norms[idx])
+            if score < threshold:
+                continue
+            best.append((score, idx))
+            best.sort(key=lambda s: (-s[0], s[1]))
+            del best[top_k:]
+            if len(best) == top_k:
+                floor = best[-1][0]
+        return [(idx, score) for score, idx in best]
+
+    def _posting_arrays(self) -> Dict[str, Tuple["np.ndarray", "np.ndarray"]]:
+        """문자별 (문서 idx 배열, 등장 횟수 배열) - 채점용, 최초 사용 시 생성 (reload 시 미리 생성)"""
+        arrays = getattr(self, "_arrays", None)
+        if arrays is None:
+            import numpy as np
+            arrays = {
+                ch: (np.fromiter((i for i, _ in plist), dtype=np.int64, count=len(plist)),
+                     np.fromiter((c for _, c in plist), dtype=np.int32, count=len(plist)))
+                for ch, plist in self.postings.items()
+            }
+            self._arrays = arrays
+            self._length_array = np.asarray(self.lengths, dtype=np.float64)
+        return arrays
+
+    def batch_search(self, queries: List[str], threshold: float, top_k: int = 1) -> List[List[Tuple[int, float]]]:
+        """여러 질의를 한 번에 채점. 질의별 결과는 search() 와 동일하다.
+
+        질의 x 카탈로그 공통 문자 수 행렬을 문자 단위 posting 배열 연산으로 한꺼번에 채운 뒤
+        상한 행렬에서 질의별 후보를 뽑아 dl_ratio 로 재채점한다.
+        """
+        top_k = max(1, top_k)
+        if threshold <= 0 or not self.ids:
+            return [self.search(q, threshold, top_k) for q in queries]
+
+        import numpy as np
+        arrays = self._posting_arrays()
+        results: List[List[Tuple[int, float]]] = []
+        for start in range(0, len(queries), BATCH_QUERY_CHUNK):
+            chunk = queries[start:start + BATCH_QUERY_CHUNK]
+            overlap = np.zeros((len(chunk), len(self.ids)), dtype=np.int32)
+
+            # 문자별로 그 문자를 가진 질의들의 행에 min(질의 횟수, 문서 횟수) 누적
+            by_char: Dict[str, List[Tuple[int, int]]] = {}
+            for row, q in enumerate(chunk):
+                for ch, cnt in Counter(q).items():
+                    by_char.setdefault(ch, []).append((row, cnt))
+            for ch, entries in by_char.items():
+                posting = arrays.get(ch)
+                if posting is None:
+                    continue
+                doc_idx, doc_cnt = posting
+                rows = np.array([r for r, _ in entries], dtype=np.int64)
+                q_cnt = np.array([c for _, c in entries], dtype=np.int32)
+                overlap[np.ix_(rows, doc_idx)] += np.minimum(q_cnt[:, None], doc_cnt[None, :])
+
+            q_len = np.array([len(q) for q in chunk], dtype=np.float64)
+            denom = q_len[:, None] + self._length_array[None, :]
+            bound = np.divide(2.0 * overlap, denom, out=np.ones_like(denom), where=denom > 0)
+
+            for row, q in enumerate(chunk):
+                results.append(self._rerank(q, self._candidates(bound[row], threshold), threshold, top_k))
+        return results
+
+
+# 카탈로그 스냅샷 version 별 (objectName, fieldName) 인덱스 캐시 - 최근 2개 version 만 유지
+# (reload 직후에도 이전 스냅샷으로 처리 중인 요청이 인덱스를 다시 만들지 않도록)
+_indexes: Dict[int, Dict[Tuple[str, str], MatcherIndex]] = {}
+KEEP_INDEX_VERSIONS = 2
+
+
+def _install_indexes(version: int, indexes: Dict[Tuple[str, str], MatcherIndex]):
+    _indexes[version] = indexes
+    for old in sorted(list(_indexes))[:-KEEP_INDEX_VERSIONS]:
+        _indexes.pop(old, None)
+
+
+def _new_index(object_name: str, field_name: str, snapshot) -> MatcherIndex:
+    return MatcherIndex(snapshot.field_map(object_name, field_name), snapshot.normalized.get((object_name, field_name)))
+
+
+def get_matcher_index(object_name: str, field_name: str, snapshot) -> MatcherIndex:
+    """카탈로그 스냅샷(CatalogSnapshot)의 한 필드에 대한 인덱스 조회 (없으면 생성)"""
+    indexes = _indexes.get(snapshot.version)
+    if indexes is None:
+        indexes = {}
+        _install_indexes(snapshot.version, indexes)
+
+    key = (object_name, field_name)
+    index = indexes.get(key)
+    if index is None:
+        index = indexes[key] = _new_index(object_name, field_name, snapshot)
+    return index
+
+
+def build_matcher_indexes(snapshot) -> int:
+    """스냅샷의 모든 필드 인덱스(배치 채점용 배열 포함)를 미리 생성해 한 번에 교체, 만든 인덱스 수 반환
+
+    CPU 작업이므로 이벤트 루프가 아닌 스레드에서 호출한다 (CatalogStore.reload).
+    """
+    indexes: Dict[Tuple[str, str], MatcherIndex] = {}
+    for object_name, fields in snapshot.options.items():
+        for field_name in fields:
+            index = indexes[(object_name, field_name)] = _new_index(object_name, field_name, snapshot)
+            index._posting_arrays()
+    _install_indexes(snapshot.version, indexes)
+    return len(indexes)
@@ -0,0 +1,73 @@
+# app/services/pipeline.py
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import asyncio
+
+# 페이지 조회 함수: page 번호(0부터) -> (항목 목록, 마지막 페이지 여부)
+PageFetcher = Callable[[int], Awaitable[Tuple[List[Any], bool]]]
+
+
+async def iter_pages(fetch_page: PageFetcher, prefetch: int = 2, max_pages: Optional[int] = None) -> AsyncIterator[List[Any]]:
+    """업스트림 페이지를 순서대로 yield 하면서 다음 페이지를 최대 prefetch 개까지 미리 동시 조회
+
+    소비자가 다음 페이지를 요청할 때만 새 조회를 시작하므로 메모리에는 최대 prefetch 페이지만 머문다.
+    """
+    prefetch = max(1, prefetch)
+    pending: deque = deque()
+    next_page = 0
+    finished = False
+    try:
+        while True:
+            while not finished and len(pending) < prefetch and (max_pages is None or next_page < max_pages):
+                pending.append(asyncio.ensure_future(fetch_page(next_page)))
+                next_page += 1
+            if not pending:
+                return
+
+            items, is_last = await pending.popleft()
+            # 마지막이거나 빈 페이지면 미리 띄운 뒤쪽 페이지 조회는 취소
+            if is_last or not items:
+                finished = True
+                for task in pending:
+                    task.cancel()
+                pending.clear()
+            if items:
+                yield items
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def push_in_batches(pages: AsyncIterator[List[Any]], mapper: Callable[[Any], Any],
+                          sink: Callable[[List[Any]], Awaitable[List[Dict[str, Any]]]],
+                          batch_size: int = 200, max_error_samples: int = 20) -> Dict[str, Any]:
+    """페이지 항목을 매핑해 batch_size 만큼 찰 때마다 sink 로 전송 (sink 완료 전까지 다음 배치를 쌓지 않음)
+
+    sink 는 {"error": ...} 형태의 레코드별 결과를 돌려준다. 결과 전체를 모으지 않고 건수만 집계한다.
+    """
+    summary: Dict[str, Any] = {"pages": 0, "items": 0, "sent": 0, "succeeded": 0, "failed": 0, "errors": []}
+    batch: List[Any] = []
+
+    async def flush():
+        outcomes = await sink(batch)
+        summary["sent"] += len(outcomes)
+        for outcome in outcomes:
+            if outcome.get("error") is None:
+                summary["succeeded"] += 1
+            else:
+                summary["failed"] += 1
+                if len(summary["errors"]) < max_error_samples:
+                    summary["errors"].append(outcome["error"])
+        batch.clear()
+
+    async for items in pages:
+        summary["pages"] += 1
+        summary["items"] += len(items)
+        for item in items:
+            batch.append(mapper(item))
+            if len(batch) >= batch_size:
+                await flush()
+    if batch:
+        await flush()
+    return summary
@@ -1,14 +1,10 @@
 # app/services/interface_service.py
 
 from app.models.interfaceData import Interface_In
-from app.utils.commonutil import get_salesforce_token, sf_get, sf_post
+from app.utils.commonutil import sf_call_with_token, sf_post, validate_sobject_fields
 
-def create_interface(data: Interface_In):
+async def create_interface(data: Interface_In):
 
-    token_data = get_salesforce_token()
-
-    access_token = token_data["access_token"]
-    instance_url = token_data["instance_url"]
     # payload 구성
     payload = {
         "FirstName__c": data.first_name,
@@ -16,14 +12,12 @@ def create_interface(data: Interface_In):
         "Company__c": data.company
     }
 
-    # describe 테스트 (optional)
-    try:
-        res = sf_get("sobjects/InterfaceData__c/describe", access_token, instance_url)
-        print("Describe:", res.status_code)
-    except Exception as e:
-        print("Describe failed:", e)
+    # 캐시된 describe 로 필드명 사전 검증
+    await validate_sobject_fields("InterfaceData__c", payload)
 
     # POST 데이터 생성
-    res = sf_post("sobjects/InterfaceData__c", payload, access_token, instance_url)
+    res = await sf_call_with_token(
+        lambda access_token, instance_url: sf_post("sobjects/InterfaceData__c", payload, access_token, instance_url)
+    )
     print("res",res)
-    return res.json()
\ No newline at end of file
+    return res.json()
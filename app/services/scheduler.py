@@ -0,0 +1,65 @@
+# app/services/scheduler.py
+from typing import Awaitable, Callable, Optional
+
+import asyncio
+import time
+
+
+class PeriodicTask:
+    """프로세스 내 주기 실행기 (외부 cron 대체)
+
+    lock_path 를 주면 같은 노드의 여러 워커 중 파일 잠금을 잡은 한 프로세스만 실행한다.
+    """
+
+    def __init__(self, name: str, interval_sec: float, fn: Callable[[], Awaitable[object]],
+                 lock_path: Optional[str] = None):
+        self.name = name
+        self.interval_sec = interval_sec
+        self.fn = fn
+        self.lock_path = lock_path
+        self.last_run = None
+        self.last_result = None
+        self._lock_file = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _acquire_leader(self) -> bool:
+        if not self.lock_path:
+            return True
+        if self._lock_file is not None:
+            return True
+        import fcntl
+        f = open(self.lock_path, "a")
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+        self._lock_file = f
+        return True
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval_sec)
+            if not self._acquire_leader():
+                continue
+            started = time.time()
+            try:
+                self.last_result = await self.fn()
+                print(f"[{self.name}] 주기 실행 완료 ({time.time() - started:.1f}s)")
+            except Exception as e:
+                self.last_result = {"status": "error", "error": str(e)}
+                print(f"[{self.name}] 주기 실행 실패:", e)
+            self.last_run = started
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
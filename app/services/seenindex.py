@@ -0,0 +1,123 @@
+# app/services/seenindex.py
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+SEEN_INDEX_DB = os.getenv("SEEN_INDEX_DB", "seen_index.db")
+SEEN_INDEX_RETENTION_DAYS = float(os.getenv("SEEN_INDEX_RETENTION_DAYS", "30"))
+SEEN_INDEX_COMPACT_INTERVAL_SEC = float(os.getenv("SEEN_INDEX_COMPACT_INTERVAL_SEC", "21600"))
+
+
+def record_hash(payload: dict) -> str:
+    """레코드 내용 해시 (필드 순서와 무관)"""
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class SeenIndex:
+    """이미 Salesforce 에 넣은 레코드 기록 (증분 동기화용)
+
+    (source, record_key) 별로 마지막으로 보낸 내용 해시를 저장한다.
+    새 키이거나 해시가 달라진 레코드만 보내고, 전송 성공 후 mark_sent 로 기록한다.
+    retention 기간 동안 다시 보이지 않은 키는 compact() 에서 지운다.
+    """
+
+    def __init__(self, path: str = SEEN_INDEX_DB, retention_days: float = SEEN_INDEX_RETENTION_DAYS,
+                 compact_interval_sec: float = SEEN_INDEX_COMPACT_INTERVAL_SEC):
+        self.path = path
+        self.retention_sec = retention_days * 86400
+        self.compact_interval_sec = compact_interval_sec
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._next_compact = 0.0
+
+    def _connection(self) -> sqlite3.Connection:
+        # fork 된 워커는 부모의 커넥션을 쓰지 않고 새로 연다
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS seen_record ("
+                "source TEXT NOT NULL, record_key TEXT NOT NULL, content_hash TEXT NOT NULL, "
+                "last_seen REAL NOT NULL, PRIMARY KEY (source, record_key)) WITHOUT ROWID"
+            )
+            conn.commit()
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def filter_new(self, source: str, records: List[Tuple[str, dict]]) -> Tuple[List[int], int]:
+        """(record_key, payload) 목록 중 보내야 할 인덱스와 건너뛴 건수 반환
+
+        변경 없는 레코드도 last_seen 을 갱신해 compaction 대상에서 빠지게 한다.
+        """
+        now = time.time()
+        keys = [key for key, _ in records]
+        with self._lock:
+            conn = self._connection()
+            known: Dict[str, str] = {}
+            # SQLite 변수 개수 제한을 넘지 않도록 나눠서 조회
+            for start in range(0, len(keys), 500):
+                part = keys[start:start + 500]
+                marks = ",".join("?" * len(part))
+                known.update(conn.execute(
+                    f"SELECT record_key, content_hash FROM seen_record WHERE source = ? AND record_key IN ({marks})",
+                    (source, *part)
+                ).fetchall())
+
+            send, unchanged = [], []
+            seen_in_batch = set()
+            for pos, (key, payload) in enumerate(records):
+                if key in seen_in_batch:
+                    continue
+                seen_in_batch.add(key)
+                if known.get(key) == record_hash(payload):
+                    unchanged.append(key)
+                else:
+                    send.append(pos)
+
+            if unchanged:
+                conn.executemany("UPDATE seen_record SET last_seen = ? WHERE source = ? AND record_key = ?",
+                                 [(now, source, key) for key in unchanged])
+                conn.commit()
+        self._maybe_compact(now)
+        return send, len(records) - len(send)
+
+    def mark_sent(self, source: str, records: Iterable[Tuple[str, dict]]):
+        now = time.time()
+        rows = [(source, key, record_hash(payload), now) for key, payload in records]
+        if not rows:
+            return
+        with self._lock:
+            conn = self._connection()
+            conn.executemany(
+                "INSERT INTO seen_record (source, record_key, content_hash, last_seen) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(source, record_key) DO UPDATE SET content_hash = excluded.content_hash, last_seen = excluded.last_seen",
+                rows
+            )
+            conn.commit()
+
+    def _maybe_compact(self, now: float):
+        if now >= self._next_compact:
+            self._next_compact = now + self.compact_interval_sec
+            self.compact()
+
+    def compact(self) -> int:
+        """retention 기간 지난 키 삭제 후 파일 크기 정리"""
+        with self._lock:
+            conn = self._connection()
+            removed = conn.execute("DELETE FROM seen_record WHERE last_seen < ?",
+                                   (time.time() - self.retention_sec,)).rowcount
+            conn.commit()
+            if removed:
+                conn.execute("VACUUM")
+        return removed
+
+
+seen_index = SeenIndex()
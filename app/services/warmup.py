@@ -0,0 +1,87 @@
+# app/services/warmup.py
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import asyncio
+import os
+import time
+
+# 단계별 최대 소요 시간 (넘기면 실패로 기록하고 준비 완료 처리는 계속)
+WARMUP_STEP_TIMEOUT_SEC = float(os.getenv("WARMUP_STEP_TIMEOUT_SEC", "20"))
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class Warmup:
+    """기동 직후 첫 요청이 치를 비용(토큰 발급, TLS 연결, 카탈로그/인덱스 생성)을 미리 치르는 단계 실행기
+
+    add() 로 등록한 단계들을 백그라운드에서 동시에 실행한다.
+    required=True 인 단계가 모두 성공하고 전체가 끝나야 ready 가 된다.
+    업스트림 관련 단계처럼 required=False 인 단계는 실패해도 ready 를 막지 않는다 (상대가 죽어 있어도 서비스는 떠야 하므로).
+    """
+
+    def __init__(self, step_timeout_sec: float = WARMUP_STEP_TIMEOUT_SEC):
+        self.step_timeout_sec = step_timeout_sec
+        self._steps: List[Tuple[str, Callable[[], Awaitable[Any]], bool]] = []
+        self.steps: Dict[str, Dict[str, Any]] = {}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def add(self, name: str, fn: Callable[[], Awaitable[Any]], required: bool = False):
+        self._steps.append((name, fn, required))
+        self.steps[name] = {"status": PENDING, "required": required}
+
+    @property
+    def finished(self) -> bool:
+        return self.finished_at is not None
+
+    @property
+    def ready(self) -> bool:
+        return self.finished and all(s["status"] == DONE for s in self.steps.values() if s["required"])
+
+    async def _run_step(self, name: str, fn: Callable[[], Awaitable[Any]]):
+        step = self.steps[name]
+        step["status"] = RUNNING
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(fn(), timeout=self.step_timeout_sec)
+            step["status"] = DONE
+        except Exception as e:
+            step["status"] = FAILED
+            step["error"] = str(e) or type(e).__name__
+            print(f"⚠️ warm-up '{name}' 실패:", step["error"])
+        step["elapsedMs"] = round((time.perf_counter() - started) * 1000, 1)
+
+    async def run(self):
+        self.started_at = time.time()
+        started = time.perf_counter()
+        await asyncio.gather(*(self._run_step(name, fn) for name, fn, _ in self._steps))
+        self.finished_at = time.time()
+        print(f"Warm-up 완료 ({(time.perf_counter() - started) * 1000:.0f}ms, ready={self.ready})")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "status": "ready" if self.ready else ("failed" if self.finished else "warming"),
+            "startedAt": self.started_at,
+            "finishedAt": self.finished_at,
+            "steps": self.steps,
+        }
+
+
+warmup = Warmup()
@@ -0,0 +1,221 @@
+# app/utils/bulkapi.py
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, List, Optional, Union
+
+import asyncio
+import csv
+import io
+import os
+import time
+
+import httpx
+
+from app.utils.commonutil import SF_API_VERSION, call_upstream, sf_call_with_token, sf_send
+from app.utils.sfquota import BULK, use_sf_caller
+
+# Bulk API 2.0 업로드 한 건당 CSV 최대 크기 (Salesforce 제한 100MB, 여유를 둔 기본값)
+BULK_MAX_UPLOAD_BYTES = int(os.environ.get('BULK_MAX_UPLOAD_BYTES', str(90 * 1024 * 1024)))
+BULK_CSV_CHUNK_BYTES = 64 * 1024
+BULK_POLL_INITIAL_SEC = float(os.environ.get('BULK_POLL_INITIAL_SEC', '2'))
+BULK_POLL_MAX_SEC = float(os.environ.get('BULK_POLL_MAX_SEC', '30'))
+BULK_POLL_TIMEOUT_SEC = float(os.environ.get('BULK_POLL_TIMEOUT_SEC', '3600'))
+BULK_UPLOAD_TIMEOUT_SEC = float(os.environ.get('BULK_UPLOAD_TIMEOUT_SEC', '600'))
+
+TERMINAL_STATES = ("JobComplete", "Failed", "Aborted")
+
+Rows = Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]]
+
+
+def _ingest_url(instance_url: str, suffix: str = "") -> str:
+    return f"{instance_url}/services/data/{SF_API_VERSION}/jobs/ingest/{suffix}".rstrip("/")
+
+
+def _auth_headers(access_token: str, content_type: str = "application/json") -> Dict[str, str]:
+    return {"Authorization": access_token, "Content-Type": content_type, "Accept": "application/json"}
+
+
+async def _aiter_rows(rows: Rows) -> AsyncIterator[Dict[str, Any]]:
+    if hasattr(rows, "__aiter__"):
+        async for row in rows:
+            yield row
+    else:
+        for row in rows:
+            yield row
+
+
+class _RowFeeder:
+    """행 스트림을 업로드 크기 한도 단위로 끊어 CSV 바이트 청크로 내보낸다 (한 작업 = 한 업로드)"""
+
+    def __init__(self, rows: Rows, fields: Optional[List[str]]):
+        self._rows = _aiter_rows(rows)
+        self._pending: Optional[Dict[str, Any]] = None
+        self.fields = fields
+        self.exhausted = False
+        self.rows_total = 0
+
+    async def _next_row(self) -> Optional[Dict[str, Any]]:
+        if self._pending is not None:
+            row, self._pending = self._pending, None
+            return row
+        try:
+            return await self._rows.__anext__()
+        except StopAsyncIteration:
+            self.exhausted = True
+            return None
+
+    async def peek(self) -> bool:
+        """남은 행이 있는지 확인 (필드 목록이 없으면 첫 행 키로 정함)"""
+        if self._pending is None and not self.exhausted:
+            self._pending = await self._next_row()
+        if self._pending is not None and self.fields is None:
+            self.fields = list(self._pending.keys())
+        return self._pending is not None
+
+    async def csv_chunks(self, max_bytes: int) -> AsyncIterator[bytes]:
+        # 한도는 UTF-8 인코딩 후 바이트 기준 (한글은 글자당 3바이트라 글자 수로 세면 한도를 넘는다)
+        line = io.StringIO()
+        writer = csv.writer(line, lineterminator="\n")
+
+        def encode(values) -> bytes:
+            writer.writerow(values)
+            data = line.getvalue().encode("utf-8")
+            line.seek(0)
+            line.truncate()
+            return data
+
+        chunk = bytearray(encode(self.fields))
+        total = len(chunk)
+        rows = 0
+        while True:
+            row = await self._next_row()
+            if row is None:
+                break
+            data = encode(["" if row.get(f) is None else row.get(f) for f in self.fields])
+            if total + len(data) > max_bytes and rows > 0:
+                # 한도를 넘는 행은 다음 작업으로 넘긴다 (행 하나가 한도보다 크면 그 행만으로 한 작업)
+                self._pending = row
+                break
+            chunk += data
+            total += len(data)
+            rows += 1
+            self.rows_total += 1
+            if len(chunk) >= BULK_CSV_CHUNK_BYTES:
+                yield bytes(chunk)
+                chunk.clear()
+        if chunk:
+            yield bytes(chunk)
+
+
+async def create_ingest_job(sobject: str, operation: str = "insert", external_id_field: str = None) -> Dict[str, Any]:
+    body = {"object": sobject, "operation": operation, "contentType": "CSV", "lineEnding": "LF"}
+    if external_id_field:
+        body["externalIdFieldName"] = external_id_field
+
+    async def call(access_token, instance_url):
+        return await call_upstream("salesforce", lambda: sf_send(
+            "POST", _ingest_url(instance_url), json=body, headers=_auth_headers(access_token)), idempotent=False,
+            operation="bulk")
+    return (await sf_call_with_token(call)).json()
+
+
+class _OneShotBody:
+    """한 번만 보낼 수 있는 요청 본문 (보내기 시작했는지 기록)"""
+
+    def __init__(self, chunks: AsyncIterator[bytes]):
+        self._chunks = chunks
+        self.started = False
+
+    async def __aiter__(self):
+        self.started = True
+        async for chunk in self._chunks:
+            yield chunk
+
+
+async def upload_job_data(job_id: str, chunks: AsyncIterator[bytes]):
+    """CSV 를 메모리에 모으지 않고 스트리밍 업로드
+
+    스트림은 다시 보낼 수 없어 재시도하지 않는다 (max_attempts=1).
+    401 토큰 재발급 후 재시도도 본문을 보내기 전일 때만 가능하고, 이미 보냈으면 StreamConsumed 로 실패한다.
+    """
+    body = _OneShotBody(chunks)
+
+    async def call(access_token, instance_url):
+        if body.started:
+            raise httpx.StreamConsumed()
+        return await call_upstream("salesforce", lambda: sf_send(
+            "PUT", _ingest_url(instance_url, f"{job_id}/batches"), content=body,
+            headers=_auth_headers(access_token, "text/csv"), timeout=BULK_UPLOAD_TIMEOUT_SEC),
+            idempotent=False, operation="bulk_upload", max_attempts=1)
+    await sf_call_with_token(call)
+
+
+async def set_job_state(job_id: str, state: str) -> Dict[str, Any]:
+    async def call(access_token, instance_url):
+        # 같은 상태로 다시 바꾸는 요청이라 재시도해도 안전
+        return await call_upstream("salesforce", lambda: sf_send(
+            "PATCH", _ingest_url(instance_url, job_id), json={"state": state}, headers=_auth_headers(access_token)), operation="bulk")
+    return (await sf_call_with_token(call)).json()
+
+
+async def get_job_info(job_id: str) -> Dict[str, Any]:
+    async def call(access_token, instance_url):
+        return await call_upstream("salesforce", lambda: sf_send(
+            "GET", _ingest_url(instance_url, job_id), headers=_auth_headers(access_token)), operation="bulk")
+    return (await sf_call_with_token(call)).json()
+
+
+async def wait_for_job(job_id: str, timeout_sec: float = BULK_POLL_TIMEOUT_SEC, on_update=None) -> Dict[str, Any]:
+    """작업이 끝날 때까지 지수 백오프로 상태 조회"""
+    delay = BULK_POLL_INITIAL_SEC
+    deadline = time.monotonic() + timeout_sec
+    while True:
+        info = await get_job_info(job_id)
+        if on_update is not None:
+            on_update(info)
+        if info.get("state") in TERMINAL_STATES:
+            return info
+        if time.monotonic() + delay > deadline:
+            raise TimeoutError(f"bulk job {job_id} did not finish in {timeout_sec}s (state={info.get('state')})")
+        await asyncio.sleep(delay)
+        delay = min(delay * 1.5, BULK_POLL_MAX_SEC)
+
+
+async def stream_job_results(job_id: str, kind: str = "successfulResults") -> AsyncIterator[bytes]:
+    """결과 CSV(successfulResults / failedResults / unprocessedrecords) 스트리밍 조회"""
+    async def call(access_token, instance_url):
+        return await call_upstream("salesforce", lambda: sf_send(
+            "GET", _ingest_url(instance_url, f"{job_id}/{kind}/"), stream=True,
+            headers=_auth_headers(access_token)), operation="bulk_results")
+
+    res = await sf_call_with_token(call)
+    try:
+        async for chunk in res.aiter_bytes():
+            yield chunk
+    finally:
+        await res.aclose()
+
+
+@use_sf_caller(BULK)
+async def bulk_ingest(sobject: str, rows: Rows, fields: Optional[List[str]] = None, operation: str = "insert",
+                      external_id_field: str = None, on_update=None) -> List[Dict[str, Any]]:
+    """행 스트림을 Bulk API 2.0 ingest 작업으로 적재. 업로드 크기 한도를 넘으면 작업을 나눈다.
+
+    작업별 최종 정보(id, state, numberRecordsProcessed, numberRecordsFailed ...) 목록을 반환한다.
+    on_update(job_info) 는 작업 생성/상태 조회 때마다 호출된다.
+    """
+    feeder = _RowFeeder(rows, fields)
+    jobs = []
+    while await feeder.peek():
+        job = await create_ingest_job(sobject, operation, external_id_field)
+        if on_update is not None:
+            on_update(job)
+        try:
+            await upload_job_data(job["id"], feeder.csv_chunks(BULK_MAX_UPLOAD_BYTES))
+            await set_job_state(job["id"], "UploadComplete")
+        except Exception:
+            try:
+                await set_job_state(job["id"], "Aborted")
+            except Exception as abort_error:
+                print("Bulk job abort failed:", abort_error)
+            raise
+        jobs.append(await wait_for_job(job["id"], on_update=on_update))
+    return jobs
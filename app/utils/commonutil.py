@@ -1,7 +1,17 @@
 # app/utils/salesforce_utils.py
 from fastapi import APIRouter, HTTPException
+import asyncio
 import os
-import requests
+import time
+import httpx
+
+from app.utils.httpclient import get_client
+from app.utils.metrics import observe_upstream, outcome_of, upstream_requests, upstream_retries
+from app.utils.resilience import (
+    AdaptiveLimiter, CircuitBreaker, UpstreamUnavailable, backoff_delay, parse_limit_info, parse_retry_after
+)
+from app.utils.sfquota import sf_quota
+from starlette.concurrency import run_in_threadpool
 
 SF_CLIENT_ID = os.environ.get('SF_CLIENT_ID')
 SF_CLIENT_SECRET = os.environ.get('SF_CLIENT_SECRET')
@@ -10,16 +20,191 @@ SF_API_VERSION = os.environ.get('SF_API_VERSION')
 API_KEY = os.environ.get('API_KEY')
 SFDC_URL = os.environ.get('SFDC_URL')
 
+# 토큰 캐시 설정 (client_credentials 응답에는 expires_in 이 없는 경우가 많아 기본 TTL 사용)
+SF_TOKEN_TTL_SEC = float(os.environ.get('SF_TOKEN_TTL_SEC', '3600'))
+SF_TOKEN_REFRESH_MARGIN_SEC = float(os.environ.get('SF_TOKEN_REFRESH_MARGIN_SEC', '300'))
 
-def get_salesforce_token():
-    """Bearer 토큰 또는 OAuth2 방식으로 Salesforce 인증"""
+# describe 메타데이터 캐시 TTL (만료 후 If-Modified-Since 로 재검증)
+SF_DESCRIBE_TTL_SEC = float(os.environ.get('SF_DESCRIBE_TTL_SEC', '3600'))
+SF_DESCRIBE_ERROR_BACKOFF_SEC = float(os.environ.get('SF_DESCRIBE_ERROR_BACKOFF_SEC', '60'))
+
+# 모든 엔드포인트를 합친 Salesforce 동시 호출 수 한도 (프로세스 단위)
+SF_MAX_CONCURRENCY = int(os.environ.get('SF_MAX_CONCURRENCY', '10'))
+
+# sObject Collections 한 번에 보낼 수 있는 최대 레코드 수
+SF_COLLECTION_BATCH_SIZE = 200
+
+# 일시 장애 재시도 (지터 포함 지수 백오프, 총 시도 횟수 기준)
+SF_RETRY_MAX_ATTEMPTS = int(os.environ.get('SF_RETRY_MAX_ATTEMPTS', '3'))
+SF_RETRY_BASE_SEC = float(os.environ.get('SF_RETRY_BASE_SEC', '0.5'))
+SF_RETRY_MAX_SEC = float(os.environ.get('SF_RETRY_MAX_SEC', '8'))
+# 한 호출이 재시도로 기다릴 수 있는 총 시간 (Retry-After 가 이를 넘기면 기다리지 않고 바로 실패 응답)
+SF_RETRY_DEADLINE_SEC = float(os.environ.get('SF_RETRY_DEADLINE_SEC', '15'))
+
+# 업스트림별 차단기: 연속 실패 횟수 / 차단 유지 시간
+UPSTREAM_BREAKER_FAILURES = int(os.environ.get('UPSTREAM_BREAKER_FAILURES', '5'))
+UPSTREAM_BREAKER_RESET_SEC = float(os.environ.get('UPSTREAM_BREAKER_RESET_SEC', '30'))
+
+# Sforce-Limit-Info 사용률이 이 비율을 넘으면 동시 호출 수를 줄이기 시작해 한도 도달 시 최소값까지 낮춤
+SF_LIMIT_THROTTLE_START = float(os.environ.get('SF_LIMIT_THROTTLE_START', '0.8'))
+SF_LIMIT_MIN_CONCURRENCY = int(os.environ.get('SF_LIMIT_MIN_CONCURRENCY', '1'))
+
+RETRYABLE_STATUS = (429, 502, 503, 504)
+
+# 프로세스 전역 토큰 캐시 + 동시 갱신 방지용 락 (single-flight)
+_token_cache = {"data": None, "expires_at": 0.0}
+_token_lock = asyncio.Lock()
+_sf_slots = AdaptiveLimiter(SF_MAX_CONCURRENCY)
+_breakers = {}
+_sf_limit_usage = {"ratio": None, "updated_at": 0.0}
+
+# sObject 이름별 describe 캐시: {"data", "last_modified", "checked_at"}
+_describe_cache = {}
+_describe_locks = {}
+
+
+def get_breaker(upstream: str) -> CircuitBreaker:
+    breaker = _breakers.get(upstream)
+    if breaker is None:
+        breaker = _breakers[upstream] = CircuitBreaker(upstream, UPSTREAM_BREAKER_FAILURES, UPSTREAM_BREAKER_RESET_SEC)
+    return breaker
+
+
+def _limit_exceeded(res: httpx.Response) -> bool:
+    """Salesforce 가 API 한도 초과(REQUEST_LIMIT_EXCEEDED)로 거절한 응답인지"""
+    return res.status_code == 403 and "REQUEST_LIMIT_EXCEEDED" in res.text
+
+
+def _is_transient(res: httpx.Response) -> bool:
+    return res.status_code in RETRYABLE_STATUS or _limit_exceeded(res)
+
+
+def _rejected_unprocessed(res: httpx.Response) -> bool:
+    """처리 전에 거절된 응답 (비멱등 요청도 다시 보내도 안전)"""
+    return res.status_code in (429, 503) or _limit_exceeded(res)
 
-    if API_KEY:
-        return {
-            "access_token": API_KEY,
-            "instance_url": SFDC_URL
-        }
 
+async def call_upstream(upstream: str, send, idempotent: bool = True, operation: str = "request",
+                        max_attempts: int = None):
+    """send() 로 만든 요청을 차단기 + 재시도로 감싸 실행하고 raise_for_status 한 응답 반환
+
+    - 5xx(502/503/504), 429, REQUEST_LIMIT_EXCEEDED, 연결 오류는 장애로 보고 차단기에 기록
+    - 멱등 호출은 지터 포함 지수 백오프로 최대 SF_RETRY_MAX_ATTEMPTS 번까지 시도 (Retry-After 우선)
+    - 다음 시도까지 기다리면 SF_RETRY_DEADLINE_SEC 를 넘는 경우(긴 Retry-After 등)는 기다리지 않고 바로 실패
+      (대기 중에는 동시 호출 자리를 잡지 않는다 - sf_send 가 시도마다 잡고 놓는다)
+    - 비멱등 호출은 요청이 처리되지 않은 게 확실할 때(연결 실패, 429, 503, 한도 초과)만 재시도
+    - 차단기가 열려 있으면 호출 없이 CircuitOpenError
+    - 다시 보낼 수 없는 요청(스트리밍 업로드 등)은 max_attempts=1 로 재시도를 끈다
+    시도마다 지연 시간과 결과를 upstream/operation 라벨로 /metrics 에 기록한다.
+    """
+    breaker = get_breaker(upstream)
+    max_attempts = max_attempts or SF_RETRY_MAX_ATTEMPTS
+    deadline = time.monotonic() + SF_RETRY_DEADLINE_SEC
+    attempt = 0
+    while True:
+        try:
+            breaker.before_call()
+        except httpx.HTTPError:
+            upstream_requests.inc(upstream, operation, "circuit_open")
+            raise
+        started = time.perf_counter()
+        try:
+            res = await send()
+        except UpstreamUnavailable:
+            # 호출 예산 초과 등으로 보내지 않은 요청은 장애로 치지 않는다
+            breaker.cancel_call()
+            upstream_requests.inc(upstream, operation, "shed")
+            raise
+        except httpx.TransportError as e:
+            observe_upstream(upstream, operation, started, outcome_of(error=e))
+            breaker.record_failure()
+            safe = idempotent or isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))
+            delay = backoff_delay(attempt, SF_RETRY_BASE_SEC, SF_RETRY_MAX_SEC)
+            if not safe or attempt + 1 >= max_attempts or time.monotonic() + delay > deadline:
+                raise
+            reason = type(e).__name__
+        except BaseException:
+            # 취소(타임아웃, 클라이언트 끊김)나 예상 밖 예외는 결과를 모르므로 시험 호출 자리만 돌려준다
+            # (그대로 두면 half-open 에서 _probing 이 남아 차단기가 영영 닫히지 않는다)
+            breaker.cancel_call()
+            raise
+        else:
+            observe_upstream(upstream, operation, started, outcome_of(res))
+            if not _is_transient(res):
+                # 4xx 는 호출 쪽 문제라 업스트림 장애로 치지 않는다
+                breaker.record_success()
+                res.raise_for_status()
+                return res
+            breaker.record_failure()
+            # Retry-After 보다 일찍 다시 보내면 또 거절되므로 그대로 따르고, 마감을 넘기면 기다리지 않는다
+            delay = max(backoff_delay(attempt, SF_RETRY_BASE_SEC, SF_RETRY_MAX_SEC), parse_retry_after(res) or 0.0)
+            if (not (idempotent or _rejected_unprocessed(res)) or attempt + 1 >= max_attempts
+                    or time.monotonic() + delay > deadline):
+                res.raise_for_status()
+            reason = res.status_code
+        attempt += 1
+        upstream_retries.inc(upstream, operation)
+        print(f"🔁 {upstream} 재시도 {attempt}/{max_attempts - 1} ({reason}), {delay:.2f}s 후")
+        await asyncio.sleep(delay)
+
+
+def _observe_limit_info(res: httpx.Response):
+    """Sforce-Limit-Info 사용률에 맞춰 Salesforce 동시 호출 한도 조정"""
+    ratio = parse_limit_info(res.headers.get("Sforce-Limit-Info"))
+    if ratio is None:
+        if _limit_exceeded(res):
+            ratio = 1.0
+        else:
+            return
+    _sf_limit_usage["ratio"] = ratio
+    _sf_limit_usage["updated_at"] = time.time()
+
+    if ratio <= SF_LIMIT_THROTTLE_START:
+        limit = SF_MAX_CONCURRENCY
+    else:
+        headroom = max(0.0, 1.0 - ratio) / max(1e-9, 1.0 - SF_LIMIT_THROTTLE_START)
+        limit = SF_LIMIT_MIN_CONCURRENCY + round((SF_MAX_CONCURRENCY - SF_LIMIT_MIN_CONCURRENCY) * headroom)
+    if limit != _sf_slots.limit:
+        print(f"🚦 Salesforce API 사용률 {ratio:.1%}, 동시 호출 한도 {_sf_slots.limit} -> {limit}")
+        _sf_slots.set_limit(limit)
+
+
+async def sf_send(method: str, url: str, stream: bool = False, **kwargs) -> httpx.Response:
+    """Salesforce 호출 1회 (노드 호출 예산을 받고, 전역 동시 호출 한도 안에서 실행하고, 응답의 API 사용률 반영)
+
+    stream=True 면 성공 응답 본문을 읽지 않고 돌려준다 (호출 쪽에서 aiter_bytes 후 aclose).
+    실패 응답은 작으므로 바로 읽어 둔다 (한도 초과 판정, 오류 메시지, 커넥션 반납).
+    """
+    await sf_quota.acquire(org_ratio=_sf_limit_usage["ratio"])
+    client = get_client("salesforce")
+    async with _sf_slots:
+        if stream:
+            res = await client.send(client.build_request(method, url, **kwargs), stream=True)
+            if not res.is_success:
+                await res.aread()
+        else:
+            res = await client.request(method, url, **kwargs)
+    _observe_limit_info(res)
+    return res
+
+
+async def resilience_stats():
+    """차단기 상태와 Salesforce API 사용률/동시 호출 한도/호출자별 예산 사용량"""
+    stats = {
+        "breakers": {name: {"state": b.state, "failures": b.failures} for name, b in _breakers.items()},
+        "salesforce": {
+            "apiUsage": _sf_limit_usage["ratio"],
+            "concurrencyLimit": _sf_slots.limit,
+            "inFlight": _sf_slots.active,
+        },
+    }
+    # 공유 저장소 조회(SQLite + 스레드 락)는 루프를 막지 않도록 스레드에서
+    stats["quota"] = await run_in_threadpool(sf_quota.stats) if sf_quota.uses_store else sf_quota.stats()
+    return stats
+
+
+async def _fetch_salesforce_token():
+    """client_credentials 방식으로 새 토큰 발급"""
     url = f"{SF_LOGIN_URL}/services/oauth2/token"
 
     payload = {
@@ -28,11 +213,54 @@ def get_salesforce_token():
         "client_secret": SF_CLIENT_SECRET
     }
 
-    res = requests.post(url, data=payload)
-    res.raise_for_status()
+    res = await call_upstream("sf_login", lambda: get_client("sf_login").post(url, data=payload), operation="token")
     return res.json()
 
 
+def _token_is_fresh(now: float) -> bool:
+    return _token_cache["data"] is not None and now < _token_cache["expires_at"] - SF_TOKEN_REFRESH_MARGIN_SEC
+
+
+async def get_salesforce_token():
+    """Bearer 토큰 또는 OAuth2 방식으로 Salesforce 인증 (만료 전까지 캐시 재사용)"""
+
+    if API_KEY:
+        return {
+            "access_token": API_KEY,
+            "instance_url": SFDC_URL
+        }
+
+    if _token_is_fresh(time.monotonic()):
+        return _token_cache["data"]
+
+    # 동시에 여러 요청이 들어와도 갱신은 한 번만 수행
+    async with _token_lock:
+        if _token_is_fresh(time.monotonic()):
+            return _token_cache["data"]
+
+        token_data = await _fetch_salesforce_token()
+        ttl = float(token_data.get("expires_in") or SF_TOKEN_TTL_SEC)
+        _token_cache["data"] = token_data
+        _token_cache["expires_at"] = time.monotonic() + ttl
+        return token_data
+
+
+def invalidate_salesforce_token(stale_token: str = None):
+    """캐시된 토큰 폐기 (401 응답 시). 이미 다른 요청이 갱신했다면 그대로 둔다."""
+    cached = _token_cache["data"]
+    if cached is None:
+        return
+    if stale_token is not None and cached.get("access_token") != stale_token:
+        return
+    _token_cache["data"] = None
+    _token_cache["expires_at"] = 0.0
+
+
+def is_unauthorized(e: Exception) -> bool:
+    response = getattr(e, "response", None)
+    return response is not None and response.status_code == 401
+
+
 def get_headers(access_token: str):
     return {
         "Authorization": access_token,
@@ -40,35 +268,181 @@ def get_headers(access_token: str):
     }
 
 
-def sf_get(path: str, access_token: str, instance_url: str):
+async def sf_get(path: str, access_token: str, instance_url: str, extra_headers: dict = None):
     """GET 요청"""
     url = f"{instance_url}/services/data/{SF_API_VERSION}/{path.lstrip('/')}"
     print("url", url)
 
     headers = get_headers(access_token)
-    res = requests.get(url, headers=headers)
-    res.raise_for_status()
-    return res
+    if extra_headers:
+        headers.update(extra_headers)
+    return await call_upstream("salesforce", lambda: sf_send("GET", url, headers=headers), operation="sf_get")
 
 
-def sf_post(path: str, payload: dict, access_token: str, instance_url: str):
+async def sf_post(path: str, payload: dict, access_token: str, instance_url: str):
     """POST 요청"""
     url = f"{instance_url}/services/data/{SF_API_VERSION}/{path.lstrip('/')}"
     headers = get_headers(access_token)
-    res = requests.post(url, json=payload, headers=headers)
-    res.raise_for_status()
-    return res
+    return await call_upstream("salesforce", lambda: sf_send("POST", url, json=payload, headers=headers), idempotent=False,
+                               operation="sf_post")
 
-def send_to_salesforce(path: str, payload: dict):
-    """Salesforce에 POST 요청을 보내는 공통 함수"""   
+
+async def sf_call_with_token(call):
+    """토큰을 주입해 호출하고, 401이면 토큰을 폐기 후 1회 재시도"""
+    token_data = await get_salesforce_token()
     try:
-        token_data = get_salesforce_token()
-        access_token = token_data["access_token"]
-        instance_url = token_data["instance_url"]
+        return await call(token_data["access_token"], token_data["instance_url"])
+    except httpx.HTTPStatusError as e:
+        if not is_unauthorized(e):
+            raise
+        invalidate_salesforce_token(token_data["access_token"])
+        token_data = await get_salesforce_token()
+        return await call(token_data["access_token"], token_data["instance_url"])
+
 
+async def send_to_salesforce(path: str, payload: dict):
+    """Salesforce에 POST 요청을 보내는 공통 함수"""   
+    try:
         # 내부 Salesforce POST 유틸 사용
-        response = sf_post(path, payload, access_token, instance_url)
+        response = await sf_call_with_token(
+            lambda access_token, instance_url: sf_post(path, payload, access_token, instance_url)
+        )
         return response.json()
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         raise HTTPException(status_code=500, detail=f"[Salesforce API Error] {str(e)}")
-    
\ No newline at end of file
+
+
+def _stale_describe(entry: dict):
+    """재검증 실패 시 이전 캐시를 쓰고, SF_DESCRIBE_ERROR_BACKOFF_SEC 뒤에 다시 재검증 (장애 중 매 요청 describe 방지)"""
+    backoff = min(SF_DESCRIBE_ERROR_BACKOFF_SEC, SF_DESCRIBE_TTL_SEC)
+    entry["checked_at"] = time.monotonic() - SF_DESCRIBE_TTL_SEC + backoff
+    return entry["data"]
+
+
+async def describe_sobject(sobject: str):
+    """sObject describe 결과 조회 (TTL 동안 캐시, 만료 시 If-Modified-Since 로 재검증)"""
+    entry = _describe_cache.get(sobject)
+    if entry and time.monotonic() - entry["checked_at"] < SF_DESCRIBE_TTL_SEC:
+        return entry["data"]
+
+    lock = _describe_locks.setdefault(sobject, asyncio.Lock())
+    async with lock:
+        entry = _describe_cache.get(sobject)
+        if entry and time.monotonic() - entry["checked_at"] < SF_DESCRIBE_TTL_SEC:
+            return entry["data"]
+
+        extra_headers = {}
+        if entry and entry["last_modified"]:
+            extra_headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            res = await sf_call_with_token(
+                lambda access_token, instance_url: sf_get(f"sobjects/{sobject}/describe", access_token, instance_url, extra_headers)
+            )
+        except httpx.HTTPStatusError as e:
+            # 304 Not Modified 도 raise_for_status 에서 예외가 되므로 여기서 재검증 성공으로 처리
+            if e.response.status_code == 304 and entry:
+                entry["checked_at"] = time.monotonic()
+                return entry["data"]
+            if entry:
+                return _stale_describe(entry)
+            raise
+        except httpx.HTTPError:
+            if entry:
+                return _stale_describe(entry)
+            raise
+
+        data = res.json()
+        _describe_cache[sobject] = {
+            "data": data,
+            "fields": frozenset(f["name"] for f in data.get("fields", [])),
+            "last_modified": res.headers.get("Last-Modified"),
+            "checked_at": time.monotonic(),
+        }
+        return data
+
+
+async def validate_sobject_fields(sobject: str, payload: dict):
+    """캐시된 describe 필드 목록으로 payload 필드명을 사전 검증 (describe 조회 실패 시 검증 생략)"""
+    try:
+        await describe_sobject(sobject)
+    except httpx.HTTPError as e:
+        print("Describe failed:", e)
+        return
+
+    fields = _describe_cache[sobject]["fields"]
+    unknown = [k for k in payload if k != "attributes" and k not in fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"[Validation Error] {sobject}에 없는 필드: {', '.join(unknown)}")
+
+
+def _collection_error_message(item: dict) -> str:
+    errors = item.get("errors") or []
+    return "; ".join(f"{e.get('statusCode')}: {e.get('message')}" for e in errors) or "unknown error"
+
+
+async def _send_collection_chunk(sobject: str, chunk: list):
+    body = {
+        "allOrNone": False,
+        "records": [{"attributes": {"type": sobject}, **payload} for payload in chunk]
+    }
+    try:
+        response = await sf_call_with_token(
+            lambda access_token, instance_url: sf_post("composite/sobjects", body, access_token, instance_url)
+        )
+        items = response.json()
+    except httpx.HTTPError as e:
+        # 요청 자체가 실패하면 청크 전체를 실패로 기록
+        return [{"data": payload, "result": None, "error": f"[Salesforce API Error] {str(e)}"} for payload in chunk]
+    except ValueError:
+        items = None
+
+    if not isinstance(items, list):
+        items = []
+    if len(items) != len(chunk):
+        print(f"Collection response size mismatch: sent {len(chunk)}, got {len(items)}")
+
+    outcomes = []
+    for pos, payload in enumerate(chunk):
+        item = items[pos] if pos < len(items) else None
+        if not isinstance(item, dict):
+            # 응답에 대응하는 결과가 없는 레코드도 빠뜨리지 않고 실패로 기록
+            outcomes.append({"data": payload, "result": None,
+                             "error": f"[Salesforce API Error] no result for record {pos} in collection response "
+                                      f"(sent {len(chunk)}, got {len(items)})"})
+        elif item.get("success"):
+            outcomes.append({"data": payload, "result": item, "error": None})
+        else:
+            outcomes.append({"data": payload, "result": None, "error": _collection_error_message(item)})
+    return outcomes
+
+
+async def send_batch_to_salesforce(sobject: str, payloads: list):
+    """sObject Collections(composite/sobjects)로 최대 200건씩 묶어 생성
+
+    레코드 순서대로 {"data", "result", "error"} 리스트를 반환한다.
+    성공 시 result 에 Salesforce 응답({"id", "success", "errors"}), 실패 시 error 에 메시지.
+    청크는 동시에 보내되 전체 동시 호출 수는 SF_MAX_CONCURRENCY 로 제한된다.
+    """
+    chunks = [payloads[start:start + SF_COLLECTION_BATCH_SIZE]
+              for start in range(0, len(payloads), SF_COLLECTION_BATCH_SIZE)]
+    chunk_outcomes = await asyncio.gather(*(_send_collection_chunk(sobject, chunk) for chunk in chunks))
+    return [outcome for outcomes in chunk_outcomes for outcome in outcomes]
+
+
+async def iter_batch_to_salesforce(sobject: str, payloads: list):
+    """send_batch_to_salesforce 와 같지만 청크가 끝나는 순서대로 (청크 시작 위치, 레코드별 결과 목록) 을 yield
+
+    소비자가 중간에 멈추면(클라이언트 연결 끊김 등) 아직 끝나지 않은 청크 전송은 취소한다.
+    """
+    async def send(start: int, chunk: list):
+        return start, await _send_collection_chunk(sobject, chunk)
+
+    tasks = [asyncio.ensure_future(send(start, payloads[start:start + SF_COLLECTION_BATCH_SIZE]))
+             for start in range(0, len(payloads), SF_COLLECTION_BATCH_SIZE)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,55 @@
+# app/utils/httpclient.py
+import os
+import httpx
+
+TIMEOUT_SEC = float(os.getenv("TIMEOUT_SEC", "5.0"))
+UPSTAGE_TIMEOUT_SEC = float(os.getenv("UPSTAGE_TIMEOUT_SEC", "120.0"))
+
+# 업스트림 호스트별 커넥션 풀 / 타임아웃 설정
+UPSTREAMS = {
+    "sf_login": {"max_connections": 5, "max_keepalive": 2, "timeout": TIMEOUT_SEC},
+    "salesforce": {"max_connections": 50, "max_keepalive": 20, "timeout": TIMEOUT_SEC},
+    "subway": {"max_connections": 10, "max_keepalive": 5, "timeout": TIMEOUT_SEC},
+    "news": {"max_connections": 10, "max_keepalive": 5, "timeout": TIMEOUT_SEC},
+    "movie": {"max_connections": 10, "max_keepalive": 5, "timeout": TIMEOUT_SEC},
+    "upstage": {"max_connections": 10, "max_keepalive": 5, "timeout": UPSTAGE_TIMEOUT_SEC},
+}
+
+# 프로세스 전역 클라이언트 (lifespan 에서 열고 닫음)
+_clients = {}
+
+
+def _build_client(name: str) -> httpx.AsyncClient:
+    conf = UPSTREAMS[name]
+    limits = httpx.Limits(
+        max_connections=conf["max_connections"],
+        max_keepalive_connections=conf["max_keepalive"],
+    )
+    timeout = httpx.Timeout(conf["timeout"], connect=min(conf["timeout"], TIMEOUT_SEC))
+    return httpx.AsyncClient(limits=limits, timeout=timeout)
+
+
+def get_client(name: str) -> httpx.AsyncClient:
+    """업스트림 이름으로 공유 AsyncClient 조회 (lifespan 밖에서 호출되면 지연 생성)"""
+    client = _clients.get(name)
+    if client is None or client.is_closed:
+        client = _build_client(name)
+        _clients[name] = client
+    return client
+
+
+async def open_clients():
+    for name in UPSTREAMS:
+        get_client(name)
+
+
+async def close_clients():
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        await client.aclose()
+
+
+async def warm_client(name: str, url: str):
+    """url 호스트로 미리 연결(DNS/TCP/TLS)을 맺어 풀에 남겨 둔다 (응답 상태는 보지 않음)"""
+    await get_client(name).head(httpx.URL(url).join("/"))
@@ -0,0 +1,35 @@
+# app/utils/jsonutil.py
+from typing import Any
+
+import json
+
+from fastapi.responses import JSONResponse
+
+# orjson 이 있으면 쓰고, 없으면 표준 json 으로 (선택 의존성)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    """JSON bytes 직렬화 (UTF-8, 공백 없음)"""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def ndjson_line(content: Any) -> bytes:
+    """NDJSON 한 줄"""
+    return dumps(content) + b"\n"
+
+
+class FastJSONResponse(JSONResponse):
+    """orjson 으로 렌더링하는 JSONResponse (앱 기본 응답 클래스)
+
+    라우트가 이 클래스를 직접 반환하면 FastAPI 의 jsonable_encoder 변환도 건너뛰므로
+    이미 JSON 호환(dict/list/str/숫자)인 큰 결과에 쓴다.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
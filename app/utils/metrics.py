@@ -0,0 +1,199 @@
+# app/utils/metrics.py
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+import glob
+import json
+import math
+import os
+import time
+
+# 워커별 스냅샷을 모을 디렉터리 (여러 uvicorn 워커일 때 /metrics 가 전체 합계를 보여주도록)
+METRICS_DIR = os.getenv("METRICS_DIR")
+METRICS_FLUSH_SEC = float(os.getenv("METRICS_FLUSH_SEC", "5"))
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Labels = Tuple[str, ...]
+
+_registry: List["_Metric"] = []
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.series: Dict[Labels, object] = {}
+        _registry.append(self)
+
+
+class Counter(_Metric):
+    """단조 증가 카운터 (이벤트 루프 스레드에서만 갱신하므로 락 없이 dict 에 누적)"""
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        self.series[labels] = self.series.get(labels, 0.0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        self.series[labels] = self.series.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0):
+        self.series[labels] = self.series.get(labels, 0.0) - amount
+
+    def set(self, value: float, *labels: str):
+        self.series[labels] = value
+
+
+class Histogram(_Metric):
+    """버킷별 개수(비누적) + 합계 + 건수. 누적 합은 출력할 때만 계산한다"""
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels: str):
+        entry = self.series.get(labels)
+        if entry is None:
+            entry = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+
+# --- 앱 공통 지표 ---
+http_requests = Counter("http_requests_total", "HTTP requests by route and status", ("method", "route", "status"))
+http_latency = Histogram("http_request_duration_seconds", "HTTP request latency", ("method", "route"))
+http_in_flight = Gauge("http_requests_in_flight", "HTTP requests currently being served")
+rate_limit_rejects = Counter("rate_limit_rejections_total", "Requests rejected by RateLimitMiddleware", ("scope",))
+rate_limit_store_errors = Counter("rate_limit_store_errors_total", "Shared rate-limit store failures (request let through)", ())
+upstream_latency = Histogram("upstream_request_duration_seconds", "Upstream call latency per attempt",
+                             ("upstream", "operation"))
+upstream_requests = Counter("upstream_requests_total", "Upstream call attempts by outcome",
+                            ("upstream", "operation", "outcome"))
+upstream_retries = Counter("upstream_retries_total", "Upstream call retries", ("upstream", "operation"))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_str(names, values, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _fmt(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def snapshot() -> dict:
+    """현재 워커의 지표를 JSON 으로 직렬화 가능한 형태로"""
+    return {
+        m.name: {"series": [[list(labels), value] for labels, value in m.series.items()]}
+        for m in _registry
+    }
+
+
+def _merge(snapshots: List[dict]) -> Dict[str, Dict[Labels, object]]:
+    merged: Dict[str, Dict[Labels, object]] = {m.name: {} for m in _registry}
+    for snap in snapshots:
+        for m in _registry:
+            target = merged[m.name]
+            for labels, value in snap.get(m.name, {}).get("series", []):
+                labels = tuple(labels)
+                if m.kind != "histogram":
+                    target[labels] = target.get(labels, 0.0) + value
+                    continue
+                entry = target.get(labels)
+                if entry is None:
+                    entry = target[labels] = [[0] * (len(m.buckets) + 1), 0.0, 0]
+                # 버킷 구성이 바뀐 옛 스냅샷은 건너뛴다
+                if len(value[0]) != len(entry[0]):
+                    continue
+                entry[0] = [a + b for a, b in zip(entry[0], value[0])]
+                entry[1] += value[1]
+                entry[2] += value[2]
+    return merged
+
+
+def _snapshot_path() -> str:
+    return os.path.join(METRICS_DIR, f"metrics-{os.getpid()}.json")
+
+
+def flush():
+    """METRICS_DIR 에 현재 워커 스냅샷 저장 (임시 파일 후 교체)"""
+    if not METRICS_DIR:
+        return
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    path = _snapshot_path()
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(snapshot(), f)
+    os.replace(tmp, path)
+
+
+def _collect() -> Dict[str, Dict[Labels, object]]:
+    if not METRICS_DIR:
+        return {m.name: m.series for m in _registry}
+
+    flush()
+    snaps = []
+    gauge_names = {m.name for m in _registry if m.kind == "gauge"}
+    stale_before = time.time() - METRICS_FLUSH_SEC * 3
+    for path in glob.glob(os.path.join(METRICS_DIR, "metrics-*.json")):
+        try:
+            with open(path) as f:
+                snap = json.load(f)
+            # 종료된 워커의 카운터는 계속 합산하되, 게이지는 최근에 갱신된 것만 반영
+            if os.path.getmtime(path) < stale_before:
+                snap = {k: v for k, v in snap.items() if k not in gauge_names}
+            snaps.append(snap)
+        except (OSError, ValueError):
+            continue
+    return _merge(snaps)
+
+
+def render() -> str:
+    """Prometheus text exposition format (0.0.4)"""
+    collected = _collect()
+    lines = []
+    for m in _registry:
+        lines.append(f"# HELP {m.name} {m.help}")
+        lines.append(f"# TYPE {m.name} {m.kind}")
+        for labels, value in sorted(collected.get(m.name, {}).items()):
+            if m.kind != "histogram":
+                lines.append(f"{m.name}{_label_str(m.labelnames, labels)} {_fmt(value)}")
+                continue
+            counts, total, count = value
+            cumulative = 0
+            for bound, n in zip(m.buckets + (math.inf,), counts):
+                cumulative += n
+                lines.append(f"{m.name}_bucket{_label_str(m.labelnames, labels, ('le', _fmt(bound)))} {cumulative}")
+            lines.append(f"{m.name}_sum{_label_str(m.labelnames, labels)} {_fmt(total)}")
+            lines.append(f"{m.name}_count{_label_str(m.labelnames, labels)} {count}")
+    return "\n".join(lines) + "\n"
+
+
+def outcome_of(res=None, error: Exception = None) -> str:
+    """업스트림 호출 결과 라벨: 2xx/4xx/5xx 또는 예외 종류"""
+    if res is not None:
+        return f"{res.status_code // 100}xx"
+    return type(error).__name__ if error is not None else "unknown"
+
+
+def observe_upstream(upstream: str, operation: str, started: float, outcome: str):
+    """업스트림 1회 호출의 지연 시간(perf_counter 기준 started 부터)과 결과 기록"""
+    upstream_latency.observe(time.perf_counter() - started, upstream, operation)
+    upstream_requests.inc(upstream, operation, outcome)
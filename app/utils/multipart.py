@@ -0,0 +1,49 @@
+# app/utils/multipart.py
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+import secrets
+
+
+class BodyTooLarge(Exception):
+    """스트리밍 중 업로드 크기가 상한을 넘었을 때"""
+
+    def __init__(self, limit: int):
+        super().__init__(f"request body exceeds {limit} bytes")
+        self.limit = limit
+
+
+def _quote(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\r", " ").replace("\n", " ")
+
+
+def build_multipart_frame(fields: Dict[str, str], file_field: str, filename: str,
+                          content_type: str, boundary: Optional[str] = None) -> Tuple[bytes, bytes, str]:
+    """파일 본문 앞뒤에 붙일 multipart/form-data 조각 (head, tail, boundary) 생성
+
+    일반 필드를 먼저 쓰고 마지막 파트를 파일로 두어, 파일 본문은 head 와 tail 사이에 그대로 흘려보낼 수 있다.
+    """
+    boundary = boundary or secrets.token_hex(16)
+    head = bytearray()
+    for name, value in fields.items():
+        head += f'--{boundary}\r\nContent-Disposition: form-data; name="{_quote(name)}"\r\n\r\n'.encode()
+        head += value.encode("utf-8") + b"\r\n"
+    head += (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{_quote(file_field)}"; filename="{_quote(filename)}"\r\n'
+        f"Content-Type: {content_type}\r\n\r\n"
+    ).encode()
+    tail = f"\r\n--{boundary}--\r\n".encode()
+    return bytes(head), tail, boundary
+
+
+async def stream_multipart(head: bytes, body: AsyncIterator[bytes], tail: bytes, max_bytes: int) -> AsyncIterator[bytes]:
+    """수신 본문을 청크 단위로 multipart 본문에 끼워 넘긴다 (소비자가 당겨 갈 때만 읽으므로 backpressure 유지)"""
+    yield head
+    total = 0
+    async for chunk in body:
+        if not chunk:
+            continue
+        total += len(chunk)
+        if total > max_bytes:
+            raise BodyTooLarge(max_bytes)
+        yield chunk
+    yield tail
@@ -0,0 +1,150 @@
+# app/utils/resilience.py
+from collections import deque
+from typing import Optional
+
+import asyncio
+import random
+import re
+import time
+
+import httpx
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """지수 백오프 + full jitter (attempt 는 0부터)"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def parse_retry_after(response: httpx.Response) -> Optional[float]:
+    """Retry-After 헤더(초 단위)만 해석, 없거나 날짜 형식이면 None"""
+    value = response.headers.get("Retry-After")
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+_LIMIT_INFO_RE = re.compile(r"api-usage=(\d+)/(\d+)")
+
+
+def parse_limit_info(value: Optional[str]) -> Optional[float]:
+    """Sforce-Limit-Info 헤더("api-usage=18/5000")에서 조직 API 사용률(0~1) 추출"""
+    match = _LIMIT_INFO_RE.search(value or "")
+    if not match or int(match.group(2)) <= 0:
+        return None
+    return int(match.group(1)) / int(match.group(2))
+
+
+class UpstreamUnavailable(httpx.TransportError):
+    """업스트림을 호출하지 않고 바로 실패 (retry_after 초 뒤 재시도 가능)
+
+    기존 httpx.HTTPError 처리 경로(레코드별 실패 기록 등)를 그대로 타도록 TransportError 를 상속한다.
+    """
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(UpstreamUnavailable):
+    """차단기가 열려 있어 호출하지 않음"""
+
+    def __init__(self, upstream: str, retry_after: float):
+        super().__init__(f"{upstream} circuit is open (retry after {retry_after:.0f}s)", retry_after)
+        self.upstream = upstream
+
+
+class CircuitBreaker:
+    """연속 실패가 failure_threshold 번 쌓이면 reset_timeout 동안 호출 차단
+
+    차단 시간이 지나면 호출 하나만 시험으로 통과시키고(half-open), 성공하면 닫고 실패하면 다시 연다.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    def before_call(self):
+        if self.state == CLOSED:
+            return
+        now = time.monotonic()
+        if self.state == OPEN:
+            remaining = self.opened_at + self.reset_timeout - now
+            if remaining > 0:
+                raise CircuitOpenError(self.name, remaining)
+            self.state = HALF_OPEN
+            self._probing = False
+        if self._probing:
+            raise CircuitOpenError(self.name, self.reset_timeout)
+        self._probing = True
+
+    def cancel_call(self):
+        """before_call 뒤 실제로 호출하지 않은 경우 (시험 호출 자리를 돌려준다)"""
+        if self.state == HALF_OPEN:
+            self._probing = False
+
+    def record_success(self):
+        self.state = CLOSED
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                print(f"⛔ {self.name} circuit open ({self.failures} consecutive failures)")
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            self._probing = False
+
+
+class AdaptiveLimiter:
+    """실행 중에도 한도를 바꿀 수 있는 동시 실행 제한 (async with 로 사용)
+
+    한도를 낮추면 이미 실행 중인 호출은 그대로 두고 새 호출만 대기시킨다.
+    """
+
+    def __init__(self, limit: int):
+        self.max_limit = limit
+        self.limit = limit
+        self.active = 0
+        self._waiters: deque = deque()
+
+    def set_limit(self, limit: int):
+        self.limit = max(1, min(limit, self.max_limit))
+        self._wake()
+
+    def _wake(self):
+        free = self.limit - self.active
+        while free > 0 and self._waiters:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                fut.set_result(None)
+                free -= 1
+
+    async def __aenter__(self):
+        while self.active >= self.limit:
+            fut = asyncio.get_running_loop().create_future()
+            self._waiters.append(fut)
+            try:
+                await fut
+            except asyncio.CancelledError:
+                # 깨워진 직후 취소되면 받은 자리를 다음 대기자에게 넘긴다
+                if fut.done() and not fut.cancelled():
+                    self._wake()
+                raise
+        self.active += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.active -= 1
+        self._wake()
@@ -0,0 +1,226 @@
+# app/utils/sfquota.py
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+import asyncio
+import functools
+import inspect
+import os
+import random
+import sqlite3
+import threading
+import time
+
+from starlette.concurrency import run_in_threadpool
+
+from app.utils.metrics import Counter
+from app.utils.resilience import UpstreamUnavailable
+
+# 노드 공유 사용량 파일 (같은 노드의 모든 워커가 함께 기록)
+SF_QUOTA_DB = os.getenv("SF_QUOTA_DB", "sf_quota.db")
+# 조직 API 할당량 기준 (0 이면 로컬 집계로는 막지 않고 Sforce-Limit-Info 사용률만 본다)
+SF_QUOTA_WINDOW_SEC = int(os.getenv("SF_QUOTA_WINDOW_SEC", "86400"))
+SF_QUOTA_LIMIT = int(os.getenv("SF_QUOTA_LIMIT", "0"))
+# 노드 전체 분당 호출 한도 (0 이면 없음)
+SF_QUOTA_PER_MIN = int(os.getenv("SF_QUOTA_PER_MIN", "0"))
+# 호출자별 예산: 전체 사용률이 이 비율에 닿으면 그 호출자부터 막는다 (낮을수록 먼저 밀려남)
+SF_QUOTA_BUDGETS = os.getenv("SF_QUOTA_BUDGETS", "interactive=1.0,ingest=0.8,bulk=0.7")
+# 분당 한도에 걸린 저우선 호출자가 다음 분을 기다릴 수 있는 최대 시간
+SF_QUOTA_MAX_WAIT_SEC = float(os.getenv("SF_QUOTA_MAX_WAIT_SEC", "60"))
+
+INTERACTIVE = "interactive"
+INGEST = "ingest"
+BULK = "bulk"
+
+# 현재 작업이 어느 호출자 몫으로 Salesforce 를 부르는지 (기본은 사용자 요청)
+sf_caller: ContextVar[str] = ContextVar("sf_caller", default=INTERACTIVE)
+
+quota_calls = Counter("sf_quota_calls_total", "Salesforce calls admitted by the quota manager", ("caller",))
+quota_rejects = Counter("sf_quota_rejections_total", "Salesforce calls shed by the quota manager", ("caller", "window"))
+quota_waits = Counter("sf_quota_waits_total", "Salesforce calls queued for the next minute", ("caller",))
+
+
+def parse_budgets(raw: str) -> Dict[str, float]:
+    budgets = {}
+    for item in filter(None, (raw or "").split(",")):
+        name, _, value = item.partition("=")
+        budgets[name.strip()] = float(value)
+    return budgets
+
+
+def use_sf_caller(caller: str):
+    """데코레이터: 감싼 코루틴(또는 async 제너레이터) 안의 Salesforce 호출을 caller 몫으로 집계 (안에서 만든 Task 에도 이어짐)"""
+    def decorator(fn):
+        if inspect.isasyncgenfunction(fn):
+            # StreamingResponse 본문처럼 라우트 함수가 끝난 뒤 도는 제너레이터용
+            @functools.wraps(fn)
+            async def gen_wrapper(*args, **kwargs):
+                token = sf_caller.set(caller)
+                try:
+                    async for item in fn(*args, **kwargs):
+                        yield item
+                finally:
+                    try:
+                        sf_caller.reset(token)
+                    except ValueError:
+                        # GC 등으로 다른 컨텍스트에서 닫힌 경우 (그 컨텍스트는 복사본이라 되돌릴 필요 없음)
+                        pass
+            return gen_wrapper
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            token = sf_caller.set(caller)
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                sf_caller.reset(token)
+        return wrapper
+    return decorator
+
+
+class QuotaExceededError(UpstreamUnavailable):
+    """호출자 예산을 넘어 Salesforce 호출을 하지 않음"""
+
+    def __init__(self, caller: str, window: str, retry_after: float):
+        super().__init__(f"Salesforce API budget for '{caller}' exhausted ({window} window)", retry_after)
+        self.caller = caller
+        self.window = window
+
+
+class SalesforceQuota:
+    """노드 단위 Salesforce 호출 예산 관리 (로컬 SQLite WAL 파일 공유)
+
+    분 단위 버킷에 호출자별 호출 수를 쌓아 window_sec 동안의 합계(롤링)와 이번 분의 합계를 본다.
+    전체 사용률(로컬 합계 / limit 와 Sforce-Limit-Info 의 조직 사용률 중 큰 값)이 호출자 예산 비율에 닿으면 막는다.
+    예산이 1 미만인 호출자는 분당 한도에 걸리면 다음 분까지 기다리고(최대 max_wait_sec), 일 한도는 바로 거절한다.
+    limit / per_minute 가 둘 다 0 이면 DB 를 만들지도 쓰지도 않고 조직 사용률만 본다.
+    DB 작업은 스레드풀에서 실행하고, DB 오류 시에는 호출을 막지 않는다 (fail-open).
+    """
+
+    def __init__(self, path: str = SF_QUOTA_DB, limit: int = SF_QUOTA_LIMIT, window_sec: int = SF_QUOTA_WINDOW_SEC,
+                 per_minute: int = SF_QUOTA_PER_MIN, budgets: Optional[Dict[str, float]] = None,
+                 max_wait_sec: float = SF_QUOTA_MAX_WAIT_SEC, busy_timeout_sec: float = 0.5):
+        self.path = path
+        self.limit = limit
+        self.window_buckets = max(1, window_sec // 60)
+        self.per_minute = per_minute
+        self.budgets = budgets if budgets is not None else parse_budgets(SF_QUOTA_BUDGETS)
+        self.max_wait_sec = max_wait_sec
+        self.busy_timeout_sec = busy_timeout_sec
+        self._conn = None
+        self._pid = None
+        self._next_prune = 0.0
+        # 스레드풀의 여러 스레드가 커넥션 하나를 나눠 쓰므로 트랜잭션 단위로 직렬화
+        self._lock = threading.Lock()
+
+    @property
+    def uses_store(self) -> bool:
+        return self.limit > 0 or self.per_minute > 0
+
+    def _connection(self) -> sqlite3.Connection:
+        # fork 된 워커는 부모의 커넥션을 쓰지 않고 새로 연다
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout_sec, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sf_quota_usage ("
+                "bucket INTEGER NOT NULL, caller TEXT NOT NULL, calls INTEGER NOT NULL, "
+                "PRIMARY KEY (bucket, caller)) WITHOUT ROWID"
+            )
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def budget(self, caller: str) -> float:
+        return self.budgets.get(caller, self.budgets.get(INGEST, 1.0))
+
+    def try_take(self, caller: str, now: float, org_ratio: Optional[float] = None) -> Tuple[bool, Optional[str], float]:
+        """호출 1건 예약 시도. (허용 여부, 걸린 창 "window"/"minute", 재시도까지 초)"""
+        budget = self.budget(caller)
+        if org_ratio is not None and org_ratio >= budget:
+            return False, "window", 60.0
+        if not self.uses_store:
+            return True, None, 0.0
+        with self._lock:
+            return self._take_locked(caller, budget, now)
+
+    def _take_locked(self, caller: str, budget: float, now: float) -> Tuple[bool, Optional[str], float]:
+        minute = int(now // 60)
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if self.limit > 0:
+                used = conn.execute("SELECT COALESCE(SUM(calls), 0) FROM sf_quota_usage WHERE bucket > ?",
+                                    (minute - self.window_buckets,)).fetchone()[0]
+                if used / self.limit >= budget:
+                    conn.execute("ROLLBACK")
+                    return False, "window", 60.0
+            if self.per_minute > 0:
+                used = conn.execute("SELECT COALESCE(SUM(calls), 0) FROM sf_quota_usage WHERE bucket = ?",
+                                    (minute,)).fetchone()[0]
+                if used >= self.per_minute * budget:
+                    conn.execute("ROLLBACK")
+                    return False, "minute", 60.0 - now % 60
+            conn.execute(
+                "INSERT INTO sf_quota_usage (bucket, caller, calls) VALUES (?, ?, 1) "
+                "ON CONFLICT(bucket, caller) DO UPDATE SET calls = calls + 1",
+                (minute, caller)
+            )
+            if now >= self._next_prune:
+                self._next_prune = now + 600
+                conn.execute("DELETE FROM sf_quota_usage WHERE bucket <= ?", (minute - self.window_buckets,))
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        return True, None, 0.0
+
+    async def acquire(self, caller: Optional[str] = None, org_ratio: Optional[float] = None):
+        """caller 몫으로 호출 1건을 받는다. 못 받으면 QuotaExceededError"""
+        caller = caller or sf_caller.get()
+        deadline = time.time() + self.max_wait_sec
+        while True:
+            now = time.time()
+            try:
+                if self.uses_store:
+                    allowed, window, retry_after = await run_in_threadpool(self.try_take, caller, now, org_ratio)
+                else:
+                    allowed, window, retry_after = self.try_take(caller, now, org_ratio)
+            except sqlite3.Error as e:
+                print("SF quota store error (fail-open):", e)
+                allowed, window, retry_after = True, None, 0.0
+            if allowed:
+                quota_calls.inc(caller)
+                return
+            # 분당 한도는 곧 풀리므로 저우선 호출자는 잠깐 기다린다
+            if window == "minute" and self.budget(caller) < 1.0 and now + retry_after <= deadline:
+                quota_waits.inc(caller)
+                await asyncio.sleep(retry_after + random.uniform(0, 1.0))
+                continue
+            quota_rejects.inc(caller, window)
+            raise QuotaExceededError(caller, window, retry_after)
+
+    def stats(self, now: Optional[float] = None) -> Dict[str, object]:
+        now = time.time() if now is None else now
+        minute = int(now // 60)
+        window, this_minute = {}, {}
+        if self.uses_store:
+            try:
+                with self._lock:
+                    conn = self._connection()
+                    window = dict(conn.execute(
+                        "SELECT caller, SUM(calls) FROM sf_quota_usage WHERE bucket > ? GROUP BY caller",
+                        (minute - self.window_buckets,)).fetchall())
+                    this_minute = dict(conn.execute(
+                        "SELECT caller, SUM(calls) FROM sf_quota_usage WHERE bucket = ? GROUP BY caller", (minute,)).fetchall())
+            except sqlite3.Error as e:
+                return {"error": str(e)}
+        return {
+            "limit": self.limit, "perMinute": self.per_minute, "budgets": self.budgets,
+            "windowCalls": window, "minuteCalls": this_minute,
+        }
+
+
+sf_quota = SalesforceQuota()
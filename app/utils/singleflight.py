@@ -0,0 +1,34 @@
+# app/utils/singleflight.py
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+import asyncio
+
+
+class SingleFlight:
+    """같은 키로 동시에 들어온 호출을 하나로 합친다
+
+    처음 호출한 쪽이 작업을 시작하고, 끝나기 전에 들어온 같은 키 호출은 그 결과(또는 예외)를 함께 기다린다.
+    작업이 끝나면 바로 키를 지우므로 결과를 캐시하지 않는다.
+    작업은 별도 Task 로 돌기 때문에 먼저 호출한 요청이 취소돼도 나머지 대기자는 영향을 받지 않는다.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # 대기자가 모두 취소된 경우에도 "exception was never retrieved" 경고가 나지 않도록
+        if not task.cancelled():
+            task.exception()
+
+    def __len__(self) -> int:
+        return len(self._inflight)
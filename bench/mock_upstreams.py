@@ -0,0 +1,179 @@
+# bench/mock_upstreams.py
+"""벤치마크용 로컬 업스트림 대역 서버
+
+Salesforce(로그인/REST), 서울 지하철, 네이버 뉴스, KOBIS 박스오피스, Upstage 를 경로 prefix 로 나눠 한 프로세스에서 흉내낸다.
+
+    /sf       Salesforce (SF_LOGIN_URL, SFDC_URL, 토큰의 instance_url)
+    /subway/  SUBWAY_URL
+    /news     NEWS_URL
+    /movie    MOVIE_URL
+    /upstage  UPSTAGE_URL
+
+업스트림별 지연(latency_ms + 0~jitter_ms)과 오류율(error_rate)은 --config JSON 으로 준다.
+    python -m bench.mock_upstreams --port 9100 --config '{"salesforce": {"latency_ms": 80, "error_rate": 0.01}}'
+"""
+from typing import Dict
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+UPSTREAMS = ("salesforce", "subway", "news", "movie", "upstage")
+DEFAULT_PROFILE = {"latency_ms": 20.0, "jitter_ms": 10.0, "error_rate": 0.0}
+
+SF_FIELDS = ["Id", "Name", "FirstName__c", "LastName__c", "Company__c",
+             "Title__c", "Description__c", "Link__c", "PubDate__c",
+             "Rank__c", "OpenDate__c", "AudienceCount__c"]
+
+_ids = itertools.count(1)
+_api_calls = itertools.count(1)
+profiles: Dict[str, dict] = {name: dict(DEFAULT_PROFILE) for name in UPSTREAMS}
+
+
+async def _simulate(upstream: str):
+    """지연을 준 뒤 오류율에 걸리면 오류 응답 반환"""
+    profile = profiles[upstream]
+    delay = profile["latency_ms"] + random.uniform(0, profile["jitter_ms"])
+    if delay > 0:
+        await asyncio.sleep(delay / 1000)
+    if random.random() < profile["error_rate"]:
+        if upstream == "salesforce":
+            return JSONResponse([{"errorCode": "SERVER_UNAVAILABLE", "message": "mock outage"}],
+                                status_code=503, headers={"Retry-After": "0"})
+        return JSONResponse({"error": "mock outage"}, status_code=500)
+    return None
+
+
+def _sf_headers() -> Dict[str, str]:
+    return {"Sforce-Limit-Info": f"api-usage={next(_api_calls) % 1000000}/5000000"}
+
+
+async def sf_token(request: Request):
+    error = await _simulate("salesforce")
+    if error:
+        return error
+    base = str(request.base_url).rstrip("/")
+    return JSONResponse({"access_token": "bench-token", "instance_url": f"{base}/sf", "token_type": "Bearer"})
+
+
+async def sf_describe(request: Request):
+    error = await _simulate("salesforce")
+    if error:
+        return error
+    sobject = request.path_params["sobject"]
+    return JSONResponse({"name": sobject, "fields": [{"name": n} for n in SF_FIELDS]},
+                        headers={**_sf_headers(), "Last-Modified": "Wed, 01 Jan 2025 00:00:00 GMT"})
+
+
+async def sf_create(request: Request):
+    error = await _simulate("salesforce")
+    if error:
+        return error
+    await request.body()
+    return JSONResponse({"id": f"a0B{next(_ids):015d}", "success": True, "errors": []},
+                        status_code=201, headers=_sf_headers())
+
+
+async def sf_collection(request: Request):
+    error = await _simulate("salesforce")
+    if error:
+        return error
+    records = json.loads(await request.body()).get("records", [])
+    return JSONResponse([{"id": f"a0B{next(_ids):015d}", "success": True, "errors": []} for _ in records],
+                        headers=_sf_headers())
+
+
+async def subway(request: Request):
+    error = await _simulate("subway")
+    if error:
+        return error
+    start, end = int(request.path_params["start"]), int(request.path_params["end"])
+    total = 200
+    rows = [
+        {"subwayId": "1002", "statnNm": f"역{i}", "trainLineNm": "성수행 - 내선", "arvlMsg2": f"{i % 5}분 후",
+         "recptnDt": f"2025-01-01 00:00:{i % 60:02d}"}
+        for i in range(start, min(end + 1, total))
+    ]
+    return JSONResponse({"errorMessage": {"status": 200, "total": total}, "realtimeArrivalList": rows})
+
+
+async def news(request: Request):
+    error = await _simulate("news")
+    if error:
+        return error
+    display = int(request.query_params.get("display", "10"))
+    start = int(request.query_params.get("start", "1"))
+    # 매번 다른 링크를 줘서 seen-index 에 걸리지 않고 전송 경로까지 측정되게 한다
+    items = [
+        {"title": f"기사 {n}", "description": "mock", "link": f"https://news.mock/{n}",
+         "pubDate": "Wed, 01 Jan 2025 00:00:00 +0900"}
+        for n in (next(_ids) for _ in range(display))
+    ]
+    return JSONResponse({"total": 1000, "start": start, "display": display, "items": items})
+
+
+async def movie(request: Request):
+    error = await _simulate("movie")
+    if error:
+        return error
+    target_dt = request.query_params.get("targetDt", "")
+    rows = [
+        {"rank": str(i), "movieNm": f"영화 {target_dt}-{i}-{next(_ids)}", "openDt": "2025-01-01", "audiCnt": str(1000 * i)}
+        for i in range(1, 11)
+    ]
+    return JSONResponse({"boxOfficeResult": {"boxofficeType": "일별 박스오피스", "dailyBoxOfficeList": rows}})
+
+
+async def upstage(request: Request):
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+    error = await _simulate("upstage")
+    if error:
+        return error
+    return JSONResponse({"api": "mock", "model": "document-parse", "usage": {"pages": 1},
+                         "content": {"text": f"parsed {size} bytes"}})
+
+
+async def healthz(request: Request):
+    return Response("ok")
+
+
+app = Starlette(routes=[
+    Route("/healthz", healthz),
+    Route("/sf/services/oauth2/token", sf_token, methods=["POST"]),
+    Route("/sf/services/data/{version}/sobjects/{sobject}/describe", sf_describe),
+    Route("/sf/services/data/{version}/sobjects/{sobject}", sf_create, methods=["POST"]),
+    Route("/sf/services/data/{version}/composite/sobjects", sf_collection, methods=["POST"]),
+    Route("/subway/{key}/json/realtimeStationArrival/{start:int}/{end:int}/", subway),
+    Route("/news", news),
+    Route("/movie", movie),
+    Route("/upstage", upstage, methods=["POST"]),
+])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="local stand-in upstreams for benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--config", default="{}", help='JSON {"<upstream>": {"latency_ms", "jitter_ms", "error_rate"}}')
+    args = parser.parse_args()
+
+    for name, overrides in json.loads(args.config).items():
+        if name not in profiles:
+            raise SystemExit(f"unknown upstream: {name} (one of {', '.join(UPSTREAMS)})")
+        profiles[name].update(overrides)
+    print("mock upstream profiles:", json.dumps(profiles))
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+# bench/replay.py
+"""기록된 요청(JSONL) 재생
+
+RequestRecorderMiddleware(REQUEST_RECORD_PATH)로 남긴 파일을 실행 중인 앱에 다시 보내고,
+기록 당시 지연과 재생 지연을 경로별로 비교한다.
+
+    python -m bench.replay traffic.jsonl --target http://127.0.0.1:8000                   # 원래 간격 그대로
+    python -m bench.replay traffic.jsonl --target http://127.0.0.1:8000 --speed 4         # 4배 빠르게
+    python -m bench.replay traffic.jsonl --target http://127.0.0.1:8000 --mode closed --concurrency 16
+
+method / path 가 없는 줄(다른 용도의 JSONL 등)은 건너뛴다.
+기록에서 빠진 인증 헤더는 --header "authorization: Bearer ..." 로 채운다.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from bench.run import percentile
+
+# 경로 안의 id 류 조각은 묶어서 집계 (/api/doc/jobs/3f2a... -> /api/doc/jobs/{id})
+_ID_SEGMENT_RE = re.compile(r"^(\d+|[0-9a-fA-F]{16,}|[0-9a-fA-F-]{32,36})$")
+
+
+def route_key(method: str, path: str) -> str:
+    parts = ["{id}" if _ID_SEGMENT_RE.match(p) else p for p in path.split("/")]
+    return f"{method} {'/'.join(parts)}"
+
+
+def load_records(path: str) -> Tuple[List[dict], int]:
+    """(재생할 기록 목록 ts 순, 건너뛴 줄 수)"""
+    records, skipped = [], 0
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                skipped += 1
+                continue
+            if not isinstance(record, dict) or not record.get("method") or not record.get("path"):
+                skipped += 1
+                continue
+            records.append(record)
+    records.sort(key=lambda r: r.get("ts") or 0.0)
+    return records, skipped
+
+
+def request_body(record: dict) -> Optional[bytes]:
+    if "body" in record:
+        return record["body"].encode("utf-8")
+    if "bodySize" in record:
+        # JSON 이 아니거나 큰 본문은 내용 대신 크기만 기록되므로 같은 크기의 임의 바이트로 부하 모양만 재현
+        return os.urandom(int(record["bodySize"]))
+    return None
+
+
+class Replayer:
+    def __init__(self, client: httpx.AsyncClient, extra_headers: Dict[str, str]):
+        self.client = client
+        self.extra_headers = extra_headers
+        self.results: List[Dict[str, Any]] = []
+
+    async def send(self, record: dict, lag: float = 0.0):
+        url = record["path"] + (f"?{record['query']}" if record.get("query") else "")
+        headers = {**(record.get("headers") or {}), **self.extra_headers}
+        started = time.perf_counter()
+        try:
+            res = await self.client.request(record["method"], url, headers=headers, content=request_body(record))
+            status = res.status_code
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        self.results.append({
+            "key": route_key(record["method"], record["path"]),
+            "recordedMs": record.get("durationMs"),
+            "recordedStatus": record.get("status"),
+            "replayMs": (time.perf_counter() - started) * 1000,
+            "status": status,
+            "lagMs": lag * 1000,
+        })
+
+
+async def replay_original(replayer: Replayer, records: List[dict], speed: float, max_inflight: int):
+    """기록된 요청 간격을 speed 배로 줄여(늘려) 그대로 재현 (open loop)"""
+    slots = asyncio.Semaphore(max_inflight)
+    t0 = records[0].get("ts") or 0.0
+    started = time.perf_counter()
+    tasks = []
+
+    async def fire(record, due):
+        async with slots:
+            await replayer.send(record, lag=max(0.0, time.perf_counter() - due))
+
+    for record in records:
+        due = started + ((record.get("ts") or t0) - t0) / speed
+        delay = due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.ensure_future(fire(record, due)))
+    await asyncio.gather(*tasks)
+
+
+async def replay_closed(replayer: Replayer, records: List[dict], concurrency: int):
+    """concurrency 개 워커가 순서대로 꺼내 가며 쉬지 않고 전송 (closed loop)"""
+    position = iter(records)
+
+    async def worker():
+        for record in position:
+            await replayer.send(record)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+def _stats(values: List[float]) -> Dict[str, float]:
+    values = sorted(v for v in values if v is not None)
+    return {p: round(percentile(values, q), 2) for p, q in (("p50", 50), ("p95", 95), ("p99", 99))}
+
+
+def _delta(old: float, new: float) -> Optional[float]:
+    return round((new - old) / old * 100, 1) if old else None
+
+
+def summarize(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    groups: Dict[str, List[dict]] = {}
+    for r in results:
+        groups.setdefault(r["key"], []).append(r)
+    groups["ALL"] = results
+
+    routes = {}
+    for key, items in groups.items():
+        recorded = _stats([r["recordedMs"] for r in items])
+        replayed = _stats([r["replayMs"] for r in items])
+        routes[key] = {
+            "count": len(items),
+            "statusMismatches": sum(1 for r in items if r["recordedStatus"] is not None and r["status"] != r["recordedStatus"]),
+            "recordedMs": recorded,
+            "replayMs": replayed,
+            "deltaPct": {p: _delta(recorded[p], replayed[p]) for p in recorded},
+        }
+    return {"routes": routes, "scheduleLagMs": _stats([r["lagMs"] for r in results])}
+
+
+def print_summary(summary: Dict[str, Any]):
+    print(f"{'route':<44}{'n':>6}{'mism':>6}{'rec p50':>10}{'p50':>9}{'Δp50%':>8}{'rec p99':>10}{'p99':>9}{'Δp99%':>8}")
+    for key, r in sorted(summary["routes"].items(), key=lambda kv: (kv[0] == "ALL", kv[0])):
+        print(f"{key[:43]:<44}{r['count']:>6}{r['statusMismatches']:>6}"
+              f"{r['recordedMs']['p50']:>10}{r['replayMs']['p50']:>9}{str(r['deltaPct']['p50']):>8}"
+              f"{r['recordedMs']['p99']:>10}{r['replayMs']['p99']:>9}{str(r['deltaPct']['p99']):>8}")
+    print(f"schedule lag ms: {summary['scheduleLagMs']}")
+
+
+def parse_headers(values: List[str]) -> Dict[str, str]:
+    headers = {}
+    for value in values or []:
+        name, _, content = value.partition(":")
+        headers[name.strip().lower()] = content.strip()
+    return headers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="replay recorded requests against a running instance")
+    parser.add_argument("file", help="JSONL written by RequestRecorderMiddleware")
+    parser.add_argument("--target", required=True, help="base URL, e.g. http://127.0.0.1:8000")
+    parser.add_argument("--mode", choices=("original", "closed"), default="original")
+    parser.add_argument("--speed", type=float, default=1.0, help="original mode: time compression factor")
+    parser.add_argument("--max-inflight", type=int, default=256, help="original mode: cap on concurrent requests")
+    parser.add_argument("--concurrency", type=int, default=8, help="closed mode: number of workers")
+    parser.add_argument("--loops", type=int, default=1, help="replay the file this many times")
+    parser.add_argument("--limit", type=int, help="only replay the first N records")
+    parser.add_argument("--header", action="append", help='extra header, e.g. "authorization: Bearer ..."')
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--out", help="write the summary JSON here")
+    args = parser.parse_args()
+
+    records, skipped = load_records(args.file)
+    if args.limit:
+        records = records[:args.limit]
+    print(f"{len(records)} records to replay, {skipped} lines skipped")
+    if not records:
+        return
+
+    async def run():
+        limits = httpx.Limits(max_connections=max(args.concurrency, args.max_inflight))
+        async with httpx.AsyncClient(base_url=args.target, timeout=args.timeout, limits=limits) as client:
+            replayer = Replayer(client, parse_headers(args.header))
+            started = time.perf_counter()
+            for _ in range(args.loops):
+                if args.mode == "original":
+                    await replay_original(replayer, records, args.speed, args.max_inflight)
+                else:
+                    await replay_closed(replayer, records, args.concurrency)
+            return replayer.results, time.perf_counter() - started
+
+    results, elapsed = asyncio.run(run())
+    summary = summarize(results)
+    summary.update({
+        "file": args.file, "target": args.target, "mode": args.mode, "speed": args.speed,
+        "concurrency": args.concurrency, "loops": args.loops, "skippedLines": skipped,
+        "elapsedSec": round(elapsed, 3), "rps": round(len(results) / elapsed, 1) if elapsed else 0.0,
+    })
+    print_summary(summary)
+    print(f"{len(results)} requests in {elapsed:.1f}s ({summary['rps']} rps)")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        print(f"summary written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,362 @@
+# bench/run.py
+"""엔드포인트 부하 벤치마크
+
+로컬 업스트림 대역 서버(bench.mock_upstreams)와 앱(uvicorn)을 띄우고, 시나리오별로 동시 요청 수를 바꿔 가며
+p50/p95/p99 지연과 초당 처리량(RPS)을 측정해 JSON 파일로 남긴다.
+
+    python -m bench.run --concurrency 1,8,32 --duration 10
+    python -m bench.run --scenarios similarity,doc-parse --latency-ms 50 --error-rate 0.01 --out bench/results/base.json
+    python -m bench.run --compare bench/results/base.json bench/results/new.json
+
+앱 쪽 DB 파일(catalog / seen-index / 문서 캐시 등)은 실행마다 새 임시 디렉터리에 만든다.
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "bench", "results")
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+CATALOG_OBJECT = "BenchProduct"
+CATALOG_FIELD = "Option__c"
+
+Request = Tuple[str, str, Dict[str, Any]]  # (method, path, httpx 요청 kwargs)
+
+
+def _today() -> str:
+    return datetime.now().strftime("%Y%m%d")
+
+
+def _catalog_value(i: int) -> str:
+    return f"옵션 {i % 97} 패키지 {i} ({['기본', '고급', '프리미엄'][i % 3]}, {i % 12 + 1}년 보증)"
+
+
+def _doc_request(size: int, cache_hit: bool) -> Callable[[], Request]:
+    fixed = os.urandom(size)
+
+    def build():
+        # 기본은 매번 다른 파일을 보내 디스크 캐시 대신 업스트림 호출 경로를 잰다
+        body = fixed if cache_hit else os.urandom(size)
+        headers = {"python-body": json.dumps({"model": "document-parse", "ocr": "auto"}),
+                   "authorization": "Bearer bench"}
+        return "POST", "/api/doc/parse", {"content": body, "headers": headers}
+    return build
+
+
+def build_scenarios(args) -> Dict[str, Callable[[], Request]]:
+    """시나리오 이름 -> 요청 생성 함수"""
+    return {
+        "create-interfaceData": lambda: ("POST", "/create-interfaceData", {"json": {
+            "first_name": "Bench", "last_name": f"User{random.randrange(10 ** 6)}", "company": "Mock Inc."}}),
+        "subway-proxy": lambda: ("POST", "/sf-subway-proxy", {"params": {"noCache": str(not args.use_cache).lower()}}),
+        "news-proxy": lambda: ("POST", "/sf-news-proxy", {"params": {
+            "query": "AI", "noCache": str(not args.use_cache).lower()}}),
+        "movie-proxy": lambda: ("POST", "/sf-movie-proxy", {"json": {"targetDt": _today(), "noCache": not args.use_cache}}),
+        # /api/similarity 는 payload[objectName][fieldName] 에서 원본 값을 읽는다
+        "similarity": lambda: ("POST", "/api/similarity", {"json": {
+            "objectName": CATALOG_OBJECT, "fieldName": CATALOG_FIELD, "threshold": 0.6,
+            CATALOG_OBJECT: {CATALOG_FIELD: _catalog_value(random.randrange(args.catalog_size)).replace("패키지", "pkg")}}}),
+        "doc-parse": _doc_request(args.doc_bytes, args.doc_cache_hit),
+    }
+
+
+def status_key(res: httpx.Response) -> str:
+    """집계용 상태 키. 2xx 라도 본문이 {"success": false} 면 실패로 따로 센다 (입력 오류로 조기 반환된 요청 구분)"""
+    key = str(res.status_code)
+    if res.is_success and res.headers.get("content-type", "").startswith("application/json"):
+        try:
+            body = res.json()
+        except ValueError:
+            return key
+        if isinstance(body, dict) and body.get("success") is False:
+            return f"{key}-unsuccessful"
+    return key
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """nearest-rank 백분위수"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, min(len(sorted_values), math.ceil(pct / 100 * len(sorted_values))))
+    return sorted_values[rank - 1]
+
+
+async def run_level(client: httpx.AsyncClient, make_request: Callable[[], Request], concurrency: int,
+                    duration: float, warmup: int) -> Dict[str, Any]:
+    """concurrency 개 워커가 duration 초 동안 요청을 연달아 보내고 지연/상태를 집계"""
+    for _ in range(warmup):
+        method, path, kwargs = make_request()
+        try:
+            await client.request(method, path, **kwargs)
+        except httpx.HTTPError:
+            pass
+
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            method, path, kwargs = make_request()
+            started = time.perf_counter()
+            try:
+                res = await client.request(method, path, **kwargs)
+                key = status_key(res)
+            except httpx.HTTPError as e:
+                key = type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            statuses[key] = statuses.get(key, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    ok = sum(n for key, n in statuses.items() if key.isdigit() and 200 <= int(key) < 300)
+    ms = lambda v: round(v * 1000, 2)
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": len(latencies) - ok,
+        "elapsedSec": round(elapsed, 3),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "latencyMs": {
+            "p50": ms(percentile(latencies, 50)),
+            "p95": ms(percentile(latencies, 95)),
+            "p99": ms(percentile(latencies, 99)),
+            "max": ms(latencies[-1]) if latencies else 0.0,
+            "mean": ms(sum(latencies) / len(latencies)) if latencies else 0.0,
+        },
+        "statusCounts": statuses,
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_ready(url: str, proc: subprocess.Popen, timeout: float = 30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f"process exited early ({proc.returncode}): {' '.join(proc.args)}")
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise SystemExit(f"timed out waiting for {url}")
+
+
+def mock_profiles(args) -> Dict[str, dict]:
+    """--latency-ms 등 기본값에 업스트림별 덮어쓰기(--upstream-latency salesforce=80,news=10)를 반영"""
+    from bench.mock_upstreams import UPSTREAMS
+    profiles = {name: {"latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms, "error_rate": args.error_rate}
+                for name in UPSTREAMS}
+    for option, key in ((args.upstream_latency, "latency_ms"), (args.upstream_error_rate, "error_rate")):
+        for item in filter(None, (option or "").split(",")):
+            name, value = item.split("=", 1)
+            if name not in profiles:
+                raise SystemExit(f"unknown upstream: {name} (one of {', '.join(UPSTREAMS)})")
+            profiles[name][key] = float(value)
+    return profiles
+
+
+def seed_catalog(path: str, size: int):
+    from app.services.catalog import CatalogStore
+    conn = CatalogStore(path)._connect()
+    with conn:
+        conn.executemany(
+            "INSERT INTO product_option (object_name, field_name, option_id, value, sort_order) VALUES (?, ?, ?, ?, ?)",
+            [(CATALOG_OBJECT, CATALOG_FIELD, f"OPT-{i:06d}", _catalog_value(i), i) for i in range(size)]
+        )
+    conn.close()
+
+
+def app_env(mock_url: str, workdir: str, args) -> Dict[str, str]:
+    env = dict(os.environ)
+    for key in ("API_KEY", "METRICS_DIR", "RATE_LIMIT_DB"):
+        env.pop(key, None)
+    env.update({
+        "SF_LOGIN_URL": f"{mock_url}/sf",
+        "SFDC_URL": f"{mock_url}/sf",
+        "SF_API_VERSION": "v58.0",
+        "SF_CLIENT_ID": "bench",
+        "SF_CLIENT_SECRET": "bench",
+        "SUBWAY_URL": f"{mock_url}/subway/",
+        "SUBWAY_API_KEY": "bench",
+        "NEWS_URL": f"{mock_url}/news",
+        "NEWS_CLIENTID": "bench",
+        "NEWS_SECRET": "bench",
+        "MOVIE_URL": f"{mock_url}/movie",
+        "MOVIE_KEY": "bench",
+        "UPSTAGE_URL": f"{mock_url}/upstage",
+        "CATALOG_DB": os.path.join(workdir, "catalog.db"),
+        "SEEN_INDEX_DB": os.path.join(workdir, "seen_index.db"),
+        "DOC_PARSE_CACHE_DB": os.path.join(workdir, "docparse_cache.db"),
+        "DOC_JOB_DB": os.path.join(workdir, "docjobs.db"),
+        "DOC_JOB_DIR": os.path.join(workdir, "docjobs"),
+        "INGEST_INTERVAL_SEC": "0",
+        "INGEST_LOCK_FILE": os.path.join(workdir, "ingest.lock"),
+        # 벤치마크 클라이언트 하나가 모든 요청을 보내므로 IP 단위 한도는 사실상 끈다
+        "RATE_LIMIT_MAX_REQUESTS": str(10 ** 9),
+    })
+    return env
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(results: List[Dict[str, Any]]):
+    print(f"{'scenario':<22}{'conc':>6}{'reqs':>8}{'err':>6}{'rps':>10}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for r in results:
+        lat = r["latencyMs"]
+        print(f"{r['scenario']:<22}{r['concurrency']:>6}{r['requests']:>8}{r['errors']:>6}{r['rps']:>10}"
+              f"{lat['p50']:>9}{lat['p95']:>9}{lat['p99']:>9}")
+
+
+def compare(base_path: str, new_path: str):
+    """두 결과 파일의 같은 (시나리오, 동시성) 행을 나란히 비교"""
+    with open(base_path) as f:
+        base = {(r["scenario"], r["concurrency"]): r for r in json.load(f)["results"]}
+    with open(new_path) as f:
+        new = json.load(f)["results"]
+    print(f"{'scenario':<22}{'conc':>6}{'rps':>18}{'p50 ms':>20}{'p99 ms':>20}")
+    for r in new:
+        b = base.get((r["scenario"], r["concurrency"]))
+        if b is None:
+            continue
+        pair = lambda old, cur: f"{old}->{cur} ({(cur - old) / old * 100 if old else 0:+.0f}%)"
+        print(f"{r['scenario']:<22}{r['concurrency']:>6}{pair(b['rps'], r['rps']):>18}"
+              f"{pair(b['latencyMs']['p50'], r['latencyMs']['p50']):>20}"
+              f"{pair(b['latencyMs']['p99'], r['latencyMs']['p99']):>20}")
+
+
+async def drive(base_url: str, scenarios: Dict[str, Callable[[], Request]], names: List[str],
+                levels: List[int], args) -> List[Dict[str, Any]]:
+    results = []
+    limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.timeout) as client:
+        for name in names:
+            for level in levels:
+                result = {"scenario": name, **await run_level(client, scenarios[name], level, args.duration, args.warmup)}
+                print_table([result])
+                results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark the API against local mock upstreams")
+    parser.add_argument("--scenarios", default="all", help="comma separated, or 'all'")
+    parser.add_argument("--concurrency", default="1,8,32", help="comma separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per (scenario, concurrency)")
+    parser.add_argument("--warmup", type=int, default=5, help="untimed requests before each level")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the app")
+    parser.add_argument("--app-url", help="benchmark an already running app instead of starting one")
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--upstream-latency", help="per upstream override, e.g. salesforce=80,news=10")
+    parser.add_argument("--upstream-error-rate", help="per upstream override, e.g. salesforce=0.05")
+    parser.add_argument("--use-cache", action="store_true", help="let the proxies serve upstream data from cache")
+    parser.add_argument("--catalog-size", type=int, default=5000)
+    parser.add_argument("--doc-bytes", type=int, default=64 * 1024)
+    parser.add_argument("--doc-cache-hit", action="store_true", help="send the same document every time")
+    parser.add_argument("--out", help="result JSON path (default bench/results/bench-<timestamp>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="compare two result files and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    scenarios = build_scenarios(args)
+    names = list(scenarios) if args.scenarios == "all" else args.scenarios.split(",")
+    unknown = [n for n in names if n not in scenarios]
+    if unknown:
+        raise SystemExit(f"unknown scenario: {', '.join(unknown)} (one of {', '.join(scenarios)})")
+    levels = [int(c) for c in args.concurrency.split(",")]
+
+    profiles = mock_profiles(args)
+    procs: List[subprocess.Popen] = []
+    log = None
+    workdir = tempfile.mkdtemp(prefix="sideprj-bench-")
+    try:
+        base_url = args.app_url
+        if base_url is None:
+            mock_port, app_port = free_port(), free_port()
+            mock_url = f"http://127.0.0.1:{mock_port}"
+            log = open(os.path.join(workdir, "app.log"), "w")
+            procs.append(subprocess.Popen(
+                [sys.executable, "-m", "bench.mock_upstreams", "--port", str(mock_port), "--config", json.dumps(profiles)],
+                cwd=ROOT, stdout=log, stderr=subprocess.STDOUT))
+            wait_ready(f"{mock_url}/healthz", procs[-1])
+
+            seed_catalog(os.path.join(workdir, "catalog.db"), args.catalog_size)
+            procs.append(subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(app_port),
+                 "--workers", str(args.workers), "--log-level", "warning", "--no-access-log"],
+                cwd=ROOT, env=app_env(mock_url, workdir, args), stdout=log, stderr=subprocess.STDOUT))
+            base_url = f"http://127.0.0.1:{app_port}"
+            wait_ready(f"{base_url}/readyz", procs[-1])
+            print(f"app {base_url}, mock upstreams {mock_url}, logs {log.name}")
+
+        started_at = datetime.now()
+        results = asyncio.run(drive(base_url, scenarios, names, levels, args))
+    finally:
+        for proc in reversed(procs):
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        if log is not None:
+            log.close()
+
+    report = {
+        "startedAt": started_at.isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": sys.version.split()[0],
+        "config": {
+            "appUrl": args.app_url, "workers": args.workers, "duration": args.duration, "warmup": args.warmup,
+            "concurrency": levels, "useCache": args.use_cache, "catalogSize": args.catalog_size,
+            "docBytes": args.doc_bytes, "docCacheHit": args.doc_cache_hit,
+            "upstreams": None if args.app_url else profiles,
+        },
+        "results": results,
+    }
+    out = args.out or os.path.join(RESULTS_DIR, f"bench-{started_at:%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print()
+    print_table(results)
+    print(f"\nresults written to {out}")
+
+
+if __name__ == "__main__":
+    main()
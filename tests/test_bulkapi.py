@@ -0,0 +1,135 @@
+# tests/test_bulkapi.py
+import asyncio
+import csv
+import io
+import re
+
+import httpx
+import pytest
+
+from app.utils import bulkapi, commonutil, httpclient
+
+INSTANCE_URL = "http://sf.test"
+JOB_RE = re.compile(r"/services/data/v58\.0/jobs/ingest(?:/(?P<id>[^/]+))?(?:/(?P<sub>[^/]+))?/?$")
+
+
+class FakeBulkApi:
+    """Bulk API 2.0 ingest 작업 흐름만 흉내 내는 로컬 Salesforce"""
+
+    def __init__(self):
+        self.jobs = {}
+        self.calls = []
+        self.fail_results_once = False
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        match = JOB_RE.search(request.url.path)
+        assert match, request.url
+        job_id, sub = match.group("id"), match.group("sub")
+        self.calls.append((request.method, sub or ("job" if job_id else "jobs")))
+
+        if request.method == "POST" and job_id is None:
+            job_id = f"750{len(self.jobs):03d}"
+            self.jobs[job_id] = {"id": job_id, "state": "Open", "csv": b"", "polls": 0}
+            return httpx.Response(200, json={"id": job_id, "state": "Open"})
+
+        job = self.jobs[job_id]
+        if request.method == "PUT" and sub == "batches":
+            job["csv"] = request.read()
+            return httpx.Response(201)
+        if request.method == "PATCH":
+            job["state"] = httpx.Response(200, content=request.read()).json()["state"]
+            return httpx.Response(200, json={"id": job_id, "state": job["state"]})
+        if request.method == "GET" and sub is None:
+            job["polls"] += 1
+            if job["state"] in ("UploadComplete", "InProgress"):
+                job["state"] = "InProgress" if job["polls"] == 1 else "JobComplete"
+            return httpx.Response(200, json={"id": job_id, "state": job["state"],
+                                             "numberRecordsProcessed": len(self.rows(job_id)),
+                                             "numberRecordsFailed": 0})
+        if request.method == "GET" and sub == "successfulResults":
+            if self.fail_results_once:
+                self.fail_results_once = False
+                return httpx.Response(401, json=[{"errorCode": "INVALID_SESSION_ID"}])
+            return httpx.Response(200, content=self.results_csv(job_id), headers={"Content-Type": "text/csv"})
+        return httpx.Response(404)
+
+    def rows(self, job_id: str):
+        return list(csv.DictReader(io.StringIO(self.jobs[job_id]["csv"].decode("utf-8"))))
+
+    def results_csv(self, job_id: str) -> bytes:
+        rows = self.rows(job_id)
+        out = io.StringIO()
+        writer = csv.writer(out, lineterminator="\n")
+        writer.writerow(["sf__Id", "sf__Created", *(rows[0].keys() if rows else [])])
+        for i, row in enumerate(rows):
+            writer.writerow([f"a0{i}", "true", *row.values()])
+        return out.getvalue().encode("utf-8")
+
+
+@pytest.fixture
+def fake_sf(monkeypatch):
+    fake = FakeBulkApi()
+    monkeypatch.setattr(commonutil, "API_KEY", "Bearer test")
+    monkeypatch.setattr(commonutil, "SFDC_URL", INSTANCE_URL)
+    monkeypatch.setattr(bulkapi, "SF_API_VERSION", "v58.0")
+    monkeypatch.setattr(bulkapi, "BULK_POLL_INITIAL_SEC", 0.01)
+    monkeypatch.setitem(httpclient._clients, "salesforce", httpx.AsyncClient(transport=httpx.MockTransport(fake)))
+    return fake
+
+
+def movie_rows(count: int):
+    return [{"Title__c": f"범죄도시 {i} 편 - 극장판", "Rank__c": i % 10 + 1, "TargetDate__c": "20240704"}
+            for i in range(count)]
+
+
+def test_bulk_ingest_round_trip(fake_sf):
+    rows = movie_rows(5)
+
+    async def scenario():
+        jobs = await bulkapi.bulk_ingest("MovieData__c", rows)
+        results = b"".join([chunk async for chunk in bulkapi.stream_job_results(jobs[0]["id"])])
+        return jobs, results
+
+    jobs, results = asyncio.run(scenario())
+
+    assert [job["state"] for job in jobs] == ["JobComplete"]
+    assert jobs[0]["numberRecordsProcessed"] == 5
+    assert fake_sf.calls == [("POST", "jobs"), ("PUT", "batches"), ("PATCH", "job"), ("GET", "job"), ("GET", "job"),
+                             ("GET", "successfulResults")]
+    uploaded = fake_sf.rows(jobs[0]["id"])
+    assert [r["Title__c"] for r in uploaded] == [r["Title__c"] for r in rows]
+    assert results.decode("utf-8").splitlines()[1].startswith("a00,true,범죄도시 0 편")
+
+
+def test_bulk_ingest_splits_jobs_at_byte_cap(fake_sf, monkeypatch):
+    monkeypatch.setattr(bulkapi, "BULK_MAX_UPLOAD_BYTES", 2000)
+    rows = movie_rows(200)
+
+    jobs = asyncio.run(bulkapi.bulk_ingest("MovieData__c", rows))
+
+    assert len(jobs) > 1
+    assert all(len(job["csv"]) <= 2000 for job in fake_sf.jobs.values())
+    uploaded = [r["Title__c"] for job_id in fake_sf.jobs for r in fake_sf.rows(job_id)]
+    assert uploaded == [r["Title__c"] for r in rows]
+
+
+def test_row_larger_than_cap_gets_its_own_job(fake_sf, monkeypatch):
+    monkeypatch.setattr(bulkapi, "BULK_MAX_UPLOAD_BYTES", 100)
+    rows = [{"Title__c": "가" * 80}, {"Title__c": "짧음"}]
+
+    jobs = asyncio.run(bulkapi.bulk_ingest("MovieData__c", rows))
+
+    assert len(jobs) == 2
+    assert [len(fake_sf.rows(job["id"])) for job in jobs] == [1, 1]
+
+
+def test_stream_job_results_retries_after_401(fake_sf):
+    asyncio.run(bulkapi.bulk_ingest("MovieData__c", movie_rows(2)))
+    job_id = next(iter(fake_sf.jobs))
+    fake_sf.fail_results_once = True
+
+    async def scenario():
+        return b"".join([chunk async for chunk in bulkapi.stream_job_results(job_id)])
+
+    assert asyncio.run(scenario()).decode("utf-8").count("\n") == 3
+    assert fake_sf.calls[-2:] == [("GET", "successfulResults"), ("GET", "successfulResults")]
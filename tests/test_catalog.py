@@ -0,0 +1,47 @@
+# tests/test_catalog.py
+import time
+
+import pytest
+
+from app.services import matcher
+from app.services.catalog import CatalogNotReady, CatalogStore
+
+
+def test_reload_builds_indexes_before_swapping_snapshot(tmp_path, monkeypatch):
+    built = []
+    original = matcher._new_index
+    monkeypatch.setattr(matcher, "_new_index", lambda *args: built.append(args[:2]) or original(*args))
+    store = CatalogStore(str(tmp_path / "catalog.db"), watch_interval_sec=0)
+
+    first = store.reload()
+    fields = [(obj, field) for obj, fields in first.options.items() for field in fields]
+    assert sorted(built) == sorted(fields)
+
+    # 요청 경로에서는 새로 만들지 않고 reload 가 만든 인덱스를 그대로 쓴다
+    for obj, field in fields:
+        matcher.get_matcher_index(obj, field, store.snapshot())
+    assert len(built) == len(fields)
+
+    # 이전 스냅샷으로 처리 중인 요청도 인덱스를 다시 만들지 않는다 (최근 2개 version 유지)
+    second = store.reload()
+    for obj, field in fields:
+        assert matcher.get_matcher_index(obj, field, first) is not matcher.get_matcher_index(obj, field, second)
+    assert len(built) == 2 * len(fields)
+
+
+def test_snapshot_before_first_load_does_not_block(tmp_path, monkeypatch):
+    store = CatalogStore(str(tmp_path / "catalog.db"), watch_interval_sec=0)
+    loads = []
+    original = store._load
+    monkeypatch.setattr(store, "_load", lambda: loads.append(1) or original())
+
+    with pytest.raises(CatalogNotReady):
+        store.snapshot()
+    # 요청 경로는 백그라운드 적재만 시작했고, warm-up 쪽 ensure_loaded 는 그 결과를 기다려 같은 스냅샷을 쓴다
+    loaded = store.ensure_loaded()
+    deadline = time.monotonic() + 5
+    while store._reloading and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert store.snapshot() is loaded
+    assert len(loads) == 1
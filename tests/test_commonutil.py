@@ -0,0 +1,146 @@
+# tests/test_commonutil.py
+import asyncio
+
+import httpx
+import pytest
+
+from app.utils import commonutil
+
+
+def fake_collection_response(monkeypatch, **response_kwargs):
+    async def fake_call(fn):
+        return httpx.Response(200, request=httpx.Request("POST", "http://sf.test"), **response_kwargs)
+
+    monkeypatch.setattr(commonutil, "sf_call_with_token", fake_call)
+
+
+@pytest.mark.parametrize("response_kwargs", [
+    {"json": [{"id": "a00", "success": True, "errors": []}]},
+    {"json": {"message": "unexpected"}},
+    {"content": b"<html>maintenance</html>"},
+])
+def test_collection_chunk_reports_records_without_results(monkeypatch, response_kwargs):
+    fake_collection_response(monkeypatch, **response_kwargs)
+    chunk = [{"Name": "a"}, {"Name": "b"}, {"Name": "c"}]
+
+    outcomes = asyncio.run(commonutil._send_collection_chunk("Account", chunk))
+
+    assert [o["data"] for o in outcomes] == chunk
+    matched = 1 if isinstance(response_kwargs.get("json"), list) else 0
+    assert all(o["error"] is None for o in outcomes[:matched])
+    assert all(o["result"] is None and "no result" in o["error"] for o in outcomes[matched:])
+
+
+def test_collection_chunk_maps_results_in_order(monkeypatch):
+    fake_collection_response(monkeypatch, json=[
+        {"id": "a00", "success": True, "errors": []},
+        {"id": None, "success": False, "errors": [{"statusCode": "REQUIRED_FIELD_MISSING", "message": "Name"}]},
+    ])
+
+    outcomes = asyncio.run(commonutil._send_collection_chunk("Account", [{"Name": "a"}, {}]))
+
+    assert outcomes[0]["result"]["id"] == "a00" and outcomes[0]["error"] is None
+    assert outcomes[1]["error"] == "REQUIRED_FIELD_MISSING: Name"
+
+
+class FakeSalesforceAuth:
+    """토큰 발급(sf_login)과 REST 호출(salesforce)을 흉내 냄. revoked 에 든 토큰은 401"""
+
+    def __init__(self):
+        self.issued = 0
+        self.revoked = set()
+        self.revoke_all = False
+        self.rest_calls = []
+
+    async def login(self, request: httpx.Request) -> httpx.Response:
+        self.issued += 1
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"access_token": f"tok{self.issued}", "instance_url": "http://sf.test"})
+
+    def rest(self, request: httpx.Request) -> httpx.Response:
+        token = request.headers["Authorization"]
+        self.rest_calls.append(token)
+        if self.revoke_all or token in self.revoked:
+            return httpx.Response(401, json=[{"errorCode": "INVALID_SESSION_ID"}])
+        return httpx.Response(200, json={"ok": token})
+
+
+@pytest.fixture
+def fake_auth(monkeypatch):
+    from app.utils import httpclient
+    fake = FakeSalesforceAuth()
+    monkeypatch.setattr(commonutil, "API_KEY", None)
+    monkeypatch.setattr(commonutil, "SF_LOGIN_URL", "http://login.test")
+    monkeypatch.setattr(commonutil, "SF_API_VERSION", "v58.0")
+    monkeypatch.setattr(commonutil, "_token_lock", asyncio.Lock())
+    monkeypatch.setitem(commonutil._token_cache, "data", None)
+    monkeypatch.setitem(commonutil._token_cache, "expires_at", 0.0)
+    monkeypatch.setitem(httpclient._clients, "sf_login", httpx.AsyncClient(transport=httpx.MockTransport(fake.login)))
+    monkeypatch.setitem(httpclient._clients, "salesforce", httpx.AsyncClient(transport=httpx.MockTransport(fake.rest)))
+    return fake
+
+
+def sf_get_limits():
+    return commonutil.sf_call_with_token(
+        lambda access_token, instance_url: commonutil.sf_get("limits", access_token, instance_url)
+    )
+
+
+def test_concurrent_callers_fetch_token_once(fake_auth):
+    async def scenario():
+        return await asyncio.gather(*(commonutil.get_salesforce_token() for _ in range(20)))
+
+    tokens = asyncio.run(scenario())
+
+    assert fake_auth.issued == 1
+    assert {t["access_token"] for t in tokens} == {"tok1"}
+
+
+def test_token_refreshed_within_expiry_margin(fake_auth, monkeypatch):
+    monkeypatch.setattr(commonutil, "SF_TOKEN_REFRESH_MARGIN_SEC", 300)
+
+    async def scenario():
+        first = await commonutil.get_salesforce_token()
+        cached = await commonutil.get_salesforce_token()
+        # 만료까지 margin 보다 적게 남으면 만료 전이라도 새로 받는다
+        commonutil._token_cache["expires_at"] = commonutil.time.monotonic() + 299
+        refreshed = await commonutil.get_salesforce_token()
+        return first, cached, refreshed
+
+    first, cached, refreshed = asyncio.run(scenario())
+
+    assert (first["access_token"], cached["access_token"], refreshed["access_token"]) == ("tok1", "tok1", "tok2")
+    assert fake_auth.issued == 2
+
+
+def test_unauthorized_invalidates_token_and_retries_once(fake_auth):
+    fake_auth.revoked.add("tok1")
+
+    res = asyncio.run(sf_get_limits())
+
+    assert res.json() == {"ok": "tok2"}
+    assert fake_auth.rest_calls == ["tok1", "tok2"]
+    assert fake_auth.issued == 2
+
+
+def test_unauthorized_retry_is_not_repeated(fake_auth):
+    fake_auth.revoke_all = True
+
+    with pytest.raises(httpx.HTTPStatusError) as e:
+        asyncio.run(sf_get_limits())
+
+    assert e.value.response.status_code == 401
+    assert fake_auth.rest_calls == ["tok1", "tok2"]
+    assert fake_auth.issued == 2
+
+
+def test_concurrent_unauthorized_callers_share_one_refresh(fake_auth):
+    async def scenario():
+        await commonutil.get_salesforce_token()
+        fake_auth.revoked.add("tok1")
+        return await asyncio.gather(*(sf_get_limits() for _ in range(10)))
+
+    results = asyncio.run(scenario())
+
+    assert [r.json() for r in results] == [{"ok": "tok2"}] * 10
+    assert fake_auth.issued == 2
@@ -0,0 +1,81 @@
+# tests/test_docjobs.py
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from app.services.docjobs import DocJobManager, DONE, QUEUED
+
+
+def dead_pid() -> int:
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    return proc.pid
+
+
+def test_startup_recovery_skips_jobs_of_live_workers(tmp_path):
+    db_path, job_dir = str(tmp_path / "jobs.db"), str(tmp_path / "jobs")
+    handled = []
+
+    async def handler(file_bytes, payload, headers):
+        handled.append(payload["name"])
+        return True, {"ok": payload["name"]}
+
+    async def scenario():
+        # 다른 워커 역할: 작업만 받고 아직 처리하지 않은 상태 (workers=0)
+        owner = DocJobManager(db_path, job_dir, handler, workers=0, stale_after_sec=60)
+        await owner.start()
+        ids = {}
+        for name in ("live", "dead", "stale", "legacy"):
+            path = owner.new_file_path(name)
+            with open(path, "wb") as f:
+                f.write(name.encode())
+            ids[name] = await owner.submit(path, {"name": name}, {"Authorization": "Bearer x"}, job_id=name)
+        owner._execute("UPDATE doc_job SET owner_pid = ? WHERE id = 'dead'", (dead_pid(),))
+        owner._execute("UPDATE doc_job SET heartbeat = ? WHERE id = 'stale'", (time.time() - 120,))
+        owner._execute("UPDATE doc_job SET owner_pid = NULL, owner_id = NULL, heartbeat = NULL WHERE id = 'legacy'")
+
+        recovering = DocJobManager(db_path, job_dir, handler, workers=2, stale_after_sec=60,
+                                   fallback_authorization="Bearer fallback")
+        await recovering.start()
+        await recovering._queue.join()
+        jobs = {name: await recovering.get(job_id) for name, job_id in ids.items()}
+        await recovering.stop()
+        await owner.stop()
+        return jobs
+
+    jobs = asyncio.run(scenario())
+
+    assert sorted(handled) == ["dead", "legacy", "stale"]
+    assert jobs["live"]["status"] == QUEUED
+    assert all(jobs[name]["status"] == DONE for name in ("dead", "stale", "legacy"))
+    assert os.listdir(job_dir) == ["live.bin"]
+
+
+def test_submit_removes_file_when_registration_fails(tmp_path, monkeypatch):
+    async def handler(file_bytes, payload, headers):
+        return True, {}
+
+    def broken_execute(sql, params=()):
+        raise OSError("disk I/O error")
+
+    async def scenario():
+        manager = DocJobManager(str(tmp_path / "jobs.db"), str(tmp_path / "jobs"), handler, workers=0)
+        await manager.start()
+        path = manager.new_file_path("job")
+        with open(path, "wb") as f:
+            f.write(b"x")
+        monkeypatch.setattr(manager, "_execute", broken_execute)
+        try:
+            await manager.submit(path, {}, {}, job_id="job")
+        finally:
+            monkeypatch.undo()
+            await manager.stop()
+        return path
+
+    with pytest.raises(OSError):
+        asyncio.run(scenario())
+    assert os.listdir(str(tmp_path / "jobs")) == []
@@ -0,0 +1,47 @@
+# tests/test_matcher.py
+import pytest
+
+from app.services.matcher import MatcherIndex, dl_ratio, normalize_value_text
+
+CATALOG = {
+    "P1": "CFX 5yrs( 동력전달계통5년75만km 보증, 엔진오일및필터2년)",
+    "P2": "CFX 5yrs(동력전달계통 5년 75만km 보증, 엔진오일 및 필터 2년)",
+    "P3": "cfx 5YRS ( 동력전달계통5년75만km보증 , 엔진오일및필터2년 )",
+    "P4": "CFX 3yrs( 동력전달계통3년50만km 보증)",
+    "M1": "범죄도시 4",
+    "M2": "범죄도시4",
+    "M3": "범죄 도시   4",
+    "M4": "범죄도시 3",
+    "M5": "베테랑2",
+    "M6": "베테랑 2 (IMAX)",
+    "A1": "Apple",
+    "A2": "apple!",
+    "A3": "  A p p l e  ",
+    "A4": "Pineapple",
+    "E1": "",
+    "E2": "   ",
+    "D1": "범죄도시 4",  # 완전 중복 - 동점은 카탈로그 순서
+}
+
+QUERIES = [
+    "범죄도시4", "범죄 도시 4편", "베테랑", "CFX 5yrs 동력전달계통 5년 보증", "cfx5yrs(동력전달계통5년75만km보증,엔진오일및필터2년)",
+    "apple", "APPLE?", "pine apple", "", "   ", "완전히 다른 값", "4",
+]
+
+
+def brute_force(index: MatcherIndex, query: str, threshold: float, top_k: int):
+    scored = [(dl_ratio(query, norm), idx) for idx, norm in enumerate(index.norms)]
+    scored = [s for s in scored if s[0] >= threshold]
+    scored.sort(key=lambda s: (-s[0], s[1]))
+    return [(idx, score) for score, idx in scored[:top_k]]
+
+
+@pytest.mark.parametrize("threshold", [0.0, 0.3, 0.6, 0.8, 0.9, 1.0])
+@pytest.mark.parametrize("top_k", [1, 3, 50])
+def test_search_matches_linear_scan(threshold, top_k):
+    index = MatcherIndex(CATALOG)
+    queries = [normalize_value_text(q) for q in QUERIES]
+    expected = [brute_force(index, q, threshold, top_k) for q in queries]
+
+    assert [index.search(q, threshold, top_k) for q in queries] == expected
+    assert index.batch_search(queries, threshold, top_k) == expected
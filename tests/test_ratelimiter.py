@@ -0,0 +1,131 @@
+# tests/test_ratelimiter.py
+import asyncio
+import sqlite3
+import time
+
+import pytest
+
+from app.interseptor.ratelimiter import MemoryBucketStore, RateLimitMiddleware, SQLiteBucketStore
+from app.utils.metrics import rate_limit_store_errors
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def call(middleware, path: str, client_ip: str = "10.0.0.1"):
+    """미들웨어를 ASGI 로 직접 호출해 (상태 코드, 헤더 dict) 반환"""
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": path, "headers": [], "client": (client_ip, 50000)}
+    asyncio.run(middleware(scope, receive, send))
+    start = sent[0]
+    return start["status"], {k.decode(): v.decode() for k, v in start["headers"]}
+
+
+def make_limiter(clock, **kwargs):
+    return RateLimitMiddleware(ok_app, store=MemoryBucketStore(), clock=clock, **kwargs)
+
+
+def test_rejects_with_retry_after_and_refills():
+    clock = FakeClock()
+    limiter = make_limiter(clock, max_requests=2, window_sec=60)
+
+    assert [call(limiter, "/api/x")[0] for _ in range(2)] == [200, 200]
+    status, headers = call(limiter, "/api/x")
+    assert status == 429
+    # 30초에 토큰 1개씩 채워지므로 다음 토큰까지 30초
+    assert headers["retry-after"] == "30"
+
+    # 다른 IP 는 따로 센다
+    assert call(limiter, "/api/x", client_ip="10.0.0.2")[0] == 200
+
+    clock.now += 29
+    assert call(limiter, "/api/x")[0] == 429
+    clock.now += 1
+    assert call(limiter, "/api/x")[0] == 200
+
+
+def test_longest_route_prefix_wins():
+    clock = FakeClock()
+    limiter = make_limiter(clock, max_requests=100, window_sec=60,
+                           route_limits={"/api/doc": (3, 60), "/api/doc/parse": (1, 60)})
+
+    assert [call(limiter, "/api/doc/parse/stream")[0] for _ in range(2)] == [200, 429]
+    # /api/doc 버킷은 /api/doc/parse 와 별개
+    assert [call(limiter, "/api/doc/jobs")[0] for _ in range(4)] == [200, 200, 200, 429]
+    assert call(limiter, "/api/other")[0] == 200
+
+
+def test_exempt_paths_are_never_limited():
+    clock = FakeClock()
+    limiter = make_limiter(clock, max_requests=1, window_sec=60, exempt_paths=("/metrics",))
+
+    assert [call(limiter, "/metrics")[0] for _ in range(5)] == [200] * 5
+    assert [call(limiter, "/api/x")[0] for _ in range(2)] == [200, 429]
+
+
+def test_idle_buckets_are_evicted():
+    clock = FakeClock()
+    store = MemoryBucketStore()
+    limiter = RateLimitMiddleware(ok_app, max_requests=5, window_sec=60, route_limits={"/api/doc": (1, 120)},
+                                  evict_interval_sec=10, store=store, clock=clock)
+
+    call(limiter, "/api/x", client_ip="10.0.0.1")
+    call(limiter, "/api/doc/jobs", client_ip="10.0.0.2")
+    assert set(store.buckets) == {("10.0.0.1", "*"), ("10.0.0.2", "/api/doc")}
+
+    # 가장 긴 창(120초)만큼 요청이 없던 키만 정리 대상
+    clock.now += 100
+    call(limiter, "/api/x", client_ip="10.0.0.3")
+    assert set(store.buckets) == {("10.0.0.1", "*"), ("10.0.0.2", "/api/doc"), ("10.0.0.3", "*")}
+
+    clock.now += 30
+    call(limiter, "/api/x", client_ip="10.0.0.4")
+    assert set(store.buckets) == {("10.0.0.3", "*"), ("10.0.0.4", "*")}
+
+
+def test_sqlite_stores_on_one_file_share_one_budget(tmp_path):
+    path = str(tmp_path / "ratelimit.db")
+    workers = [SQLiteBucketStore(path), SQLiteBucketStore(path)]
+
+    results = [workers[i % 2].take(("10.0.0.1", "*"), 3, 3 / 60, 1000.0) for i in range(4)]
+
+    assert [allowed for allowed, _ in results] == [True, True, True, False]
+    assert results[-1][1] == pytest.approx(20.0)
+
+
+def test_sqlite_store_fails_open_when_file_is_locked(tmp_path):
+    path = str(tmp_path / "ratelimit.db")
+    store = SQLiteBucketStore(path)
+    assert store.take(("10.0.0.1", "*"), 1, 1 / 60, 1000.0) == (True, 0.0)
+
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    try:
+        errors_before = rate_limit_store_errors.series.get((), 0.0)
+        started = time.perf_counter()
+        # 버킷은 비었지만 잠금을 못 잡으므로 통과시키고 오류만 센다
+        assert store.take(("10.0.0.1", "*"), 1, 1 / 60, 1000.0) == (True, 0.0)
+        assert time.perf_counter() - started < 0.5
+        assert rate_limit_store_errors.series.get((), 0.0) == errors_before + 1
+    finally:
+        other.execute("ROLLBACK")
+        other.close()
+
+    assert store.take(("10.0.0.1", "*"), 1, 1 / 60, 1000.0)[0] is False
@@ -0,0 +1,50 @@
+# tests/test_recorder.py
+import asyncio
+import json
+
+import httpx
+
+from app.interseptor.recorder import RequestRecorderMiddleware, mask_query
+
+
+async def echo_app(scope, receive, send):
+    while (await receive()).get("more_body"):
+        pass
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def record_requests(tmp_path, requests):
+    path = tmp_path / "traffic.jsonl"
+    recorder = RequestRecorderMiddleware(echo_app, str(path))
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=recorder), base_url="http://app") as client:
+            for kwargs in requests:
+                await client.request(**kwargs)
+
+    asyncio.run(scenario())
+    recorder.writer.close()
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_mask_query_keeps_other_params_as_is():
+    assert mask_query("q=%EB%B2%94%EC%A3%84&access_token=abc&api-key=x&page=2") == \
+        "q=%EB%B2%94%EC%A3%84&access_token=***&api-key=***&page=2"
+    assert mask_query("flag&Client%5FSecret=s") == "flag&Client%5FSecret=***"
+    assert mask_query("") == ""
+
+
+def test_recorder_masks_secrets_and_drops_non_json_bodies(tmp_path):
+    records = record_requests(tmp_path, [
+        {"method": "POST", "url": "/api/x?token=t1&name=a", "json": {"name": "a", "password": "p", "items": [{"apiKey": "k"}]}},
+        {"method": "POST", "url": "/api/form", "data": {"password": "p"}},
+        {"method": "POST", "url": "/api/upload", "files": {"file": ("a.pdf", b"%PDF-1.4 secret")}},
+        {"method": "POST", "url": "/api/bad", "content": b"{password: p", "headers": {"Content-Type": "application/json"}},
+    ])
+
+    assert records[0]["query"] == "token=***&name=a"
+    assert json.loads(records[0]["body"]) == {"name": "a", "password": "***", "items": [{"apiKey": "***"}]}
+    for record in records[1:]:
+        assert "body" not in record and "bodyB64" not in record
+        assert record["bodySize"] > 0
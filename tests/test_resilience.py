@@ -0,0 +1,131 @@
+# tests/test_resilience.py
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.utils import commonutil
+from app.utils.resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+def half_open_breaker(name: str) -> CircuitBreaker:
+    """reset_timeout 이 0 이라 다음 before_call 이 곧바로 시험 호출이 되는 열린 차단기"""
+    breaker = CircuitBreaker(name, failure_threshold=1, reset_timeout=0.0)
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    commonutil._breakers[name] = breaker
+    return breaker
+
+
+def ok_response() -> httpx.Response:
+    return httpx.Response(200, request=httpx.Request("GET", "http://upstream/"))
+
+
+def test_breaker_allows_single_probe():
+    breaker = half_open_breaker("probe-single")
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_cancelled_probe_releases_breaker():
+    breaker = half_open_breaker("probe-cancel")
+
+    async def scenario():
+        started = asyncio.Event()
+
+        async def slow_send():
+            started.set()
+            await asyncio.sleep(10)
+
+        task = asyncio.ensure_future(commonutil.call_upstream("probe-cancel", slow_send))
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert breaker._probing is False
+
+        async def send():
+            return ok_response()
+
+        return await commonutil.call_upstream("probe-cancel", send)
+
+    res = asyncio.run(scenario())
+    assert res.status_code == 200
+    assert breaker.state == CLOSED
+
+
+def test_unexpected_error_in_probe_releases_breaker():
+    breaker = half_open_breaker("probe-error")
+
+    async def scenario():
+        async def broken_send():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            await commonutil.call_upstream("probe-error", broken_send)
+
+        async def send():
+            return ok_response()
+
+        return await commonutil.call_upstream("probe-error", send)
+
+    assert asyncio.run(scenario()).status_code == 200
+    assert breaker.state == CLOSED
+
+
+def sf_client(monkeypatch, handler):
+    from app.utils import httpclient
+    monkeypatch.setitem(httpclient._clients, "salesforce", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(commonutil, "SF_RETRY_BASE_SEC", 0.0)
+
+
+def test_retry_wait_does_not_hold_salesforce_slot(monkeypatch):
+    in_flight = []
+
+    def handler(request):
+        in_flight.append(commonutil._sf_slots.active)
+        if len(in_flight) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0.2"})
+        return httpx.Response(200, json={"ok": True})
+
+    sf_client(monkeypatch, handler)
+
+    async def scenario():
+        task = asyncio.ensure_future(commonutil.call_upstream(
+            "sf-slot-test", lambda: commonutil.sf_send("GET", "http://sf.test/x"), operation="test"))
+        while not in_flight:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+        waiting = commonutil._sf_slots.active
+        return waiting, await task
+
+    waiting, res = asyncio.run(scenario())
+
+    assert waiting == 0
+    assert in_flight == [1, 1]
+    assert res.json() == {"ok": True}
+
+
+def test_retry_after_past_deadline_fails_without_waiting(monkeypatch):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(429, headers={"Retry-After": "60"})
+
+    sf_client(monkeypatch, handler)
+    monkeypatch.setattr(commonutil, "SF_RETRY_DEADLINE_SEC", 5.0)
+
+    started = time.perf_counter()
+    with pytest.raises(httpx.HTTPStatusError) as e:
+        asyncio.run(commonutil.call_upstream(
+            "sf-deadline-test", lambda: commonutil.sf_send("GET", "http://sf.test/x"), operation="test"))
+
+    assert e.value.response.status_code == 429
+    assert len(calls) == 1
+    assert time.perf_counter() - started < 1.0
@@ -0,0 +1,30 @@
+# tests/test_sfquota.py
+import asyncio
+
+from app.utils.sfquota import INGEST, INTERACTIVE, sf_caller, use_sf_caller
+
+
+@use_sf_caller(INGEST)
+async def tagged_lines(count: int):
+    for i in range(count):
+        await asyncio.sleep(0)
+        yield i, sf_caller.get()
+
+
+def test_use_sf_caller_scopes_async_generators():
+    async def scenario():
+        seen = []
+        async for _, caller in tagged_lines(3):
+            seen.append(caller)
+        after_full = sf_caller.get()
+
+        # 소비자가 중간에 멈춰도(클라이언트 연결 끊김) 닫힐 때 원래 값으로 돌아온다
+        lines = tagged_lines(3)
+        await lines.__anext__()
+        await lines.aclose()
+        return seen, after_full, sf_caller.get()
+
+    seen, after_full, after_close = asyncio.run(scenario())
+    assert seen == [INGEST] * 3
+    assert after_full == INTERACTIVE
+    assert after_close == INTERACTIVE